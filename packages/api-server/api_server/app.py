@@ -12,17 +12,19 @@ import socketio
 from fastapi import HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from rx.scheduler.eventloop import AsyncIOThreadSafeScheduler
 from tortoise import Tortoise
 
 from api_server.types import is_coroutine
 
 from . import routes
-from .app_config import AppConfig, load_config
+from .app_config import AppConfig, app_config_file, load_config
 from .authenticator import JwtAuthenticator, StubAuthenticator
 from .base_app import BaseApp
 from .dependencies import rmf_repo as rmf_repo_dep
-from .fast_io import FastIO
+from .fast_io import FastIO, SioJson
 from .gateway import RmfGateway
+from .logger import QueueLogging
 from .models import (
     DispenserHealth,
     DispenserState,
@@ -37,7 +39,27 @@ from .models import (
 )
 from .models import tortoise_models as ttm
 from .repositories import StaticFilesRepository
-from .rmf_io import HealthWatchdog, RmfBookKeeper, RmfEvents
+from .rmf_io import (
+    HealthWatchdog,
+    RmfBookKeeper,
+    RmfBusPublisher,
+    RmfBusSubscriber,
+    RmfEvents,
+    RmfIngest,
+    RmfRecorder,
+    RmfStateStore,
+)
+from .single_flight import SingleFlight
+
+
+class AppRole:
+    # does everything in one process
+    STANDALONE = "standalone"
+    # receives the events from rmf, writes them to the database and publishes them on
+    # the bus, it does not serve clients.
+    INGESTION = "ingestion"
+    # serves clients with the events from the bus, many workers can run at once.
+    WORKER = "worker"
 
 
 class App(FastIO, BaseApp):
@@ -48,13 +70,14 @@ class App(FastIO, BaseApp):
         rmf_gateway_fc: Callable[
             [RmfEvents, StaticFilesRepository], RmfGateway
         ] = RmfGateway,
+        role: str = AppRole.STANDALONE,
     ):
-        self.app_config = app_config or load_config(
-            os.environ.get(
-                "RMF_API_SERVER_CONFIG",
-                f"{os.path.dirname(__file__)}/default_config.py",
-            )
-        )
+        """
+        :param role: One of `AppRole`, the ingestion and worker roles communicate
+            through the bus at `bus_path` in the config.
+        """
+        self.app_config = app_config or load_config(app_config_file())
+        self.role = role
 
         self.loop: asyncio.AbstractEventLoop
         logger = logging.getLogger("app")
@@ -77,13 +100,15 @@ class App(FastIO, BaseApp):
             logger.warning("authentication is disabled")
 
         sio = socketio.AsyncServer(
-            async_mode="asgi", cors_allowed_origins="*", logger=logger
+            async_mode="asgi", cors_allowed_origins="*", logger=logger, json=SioJson
         )
 
         super().__init__(
             sio,
             authenticator=authenticator,
             logger=logger,
+            outbound_queue_size=self.app_config.sio_outbound_queue_size,
+            slow_consumer_timeout=self.app_config.sio_slow_consumer_timeout,
             title="RMF API Server",
         )
 
@@ -105,7 +130,22 @@ class App(FastIO, BaseApp):
         shutdown_cbs: List[Union[Coroutine[Any, Any, Any], Callable[[], None]]] = []
 
         self._rmf_events = RmfEvents()
-        self.rmf_repo = rmf_repo_dep(self.auth_dep)
+        self._rmf_ingest = RmfIngest(
+            self._rmf_events,
+            self.app_config.ingest_max_rates,
+            queue_size=self.app_config.ingest_queue_size,
+            overflow_policy=self.app_config.ingest_overflow_policy,
+            logger=self.logger.getChild("Ingest"),
+        )
+        self._rmf_state_store = RmfStateStore(self._rmf_events)
+        self.rmf_repo = rmf_repo_dep(self.auth_dep, self._rmf_state_store)
+        # only the snapshots sent on subscribe are kept for a while, rest reads always
+        # get the latest data.
+        self.rmf_snapshot_repo = rmf_repo_dep(
+            self.auth_dep,
+            self._rmf_state_store,
+            SingleFlight(ttl=self.app_config.snapshot_cache_ttl),
+        )
         self.static_files_repo = StaticFilesRepository(
             f"{self.app_config.public_url.geturl()}/static",
             self.app_config.static_directory,
@@ -114,7 +154,13 @@ class App(FastIO, BaseApp):
         self._rmf_gateway: RmfGateway
 
         self._rmf_bookkeeper = RmfBookKeeper(
-            self._rmf_events, logger=self.logger.getChild("BookKeeper")
+            self._rmf_events,
+            flush_interval=self.app_config.bookkeeper_flush_interval,
+            high_water_mark=self.app_config.bookkeeper_high_water_mark,
+            low_water_mark=self.app_config.bookkeeper_low_water_mark,
+            skip_unchanged=self.app_config.bookkeeper_skip_unchanged,
+            log_policies=self.app_config.bookkeeper_log_policies,
+            logger=self.logger.getChild("BookKeeper"),
         )
 
         self.fapi.include_router(routes.main_router(self))
@@ -151,45 +197,105 @@ class App(FastIO, BaseApp):
                 db_url=self.app_config.db_url,
                 modules={"models": ["api_server.models.tortoise_models"]},
             )
-            await Tortoise.generate_schemas()
             shutdown_cbs.append(Tortoise.close_connections())
 
-            await ttm.User.update_or_create(
-                {"is_admin": True}, username=self.app_config.builtin_admin
-            )
+            # the workers use the schemas created by the ingestion process, so that they
+            # do not all try to create them at once.
+            if self.role != AppRole.WORKER:
+                await Tortoise.generate_schemas()
+                await ttm.User.update_or_create(
+                    {"is_admin": True}, username=self.app_config.builtin_admin
+                )
 
             use_sim_time_env = os.environ.get("RMF_SERVER_USE_SIM_TIME", None)
             if use_sim_time_env:
                 use_sim_time = not use_sim_time_env.lower() in ["0", "false"]
             else:
                 use_sim_time = False
+            ros_args = []
             if use_sim_time:
-                rclpy.init(args=["--ros-args", "-p", "use_sim_time:=true"])
+                ros_args += ["-p", "use_sim_time:=true"]
+            if self.role == AppRole.WORKER:
+                # every worker has its own node, ros nodes must have unique names
+                ros_args += ["-r", f"__node:=rmf_api_server_worker_{os.getpid()}"]
+            if ros_args:
+                rclpy.init(args=["--ros-args", *ros_args])
             else:
                 rclpy.init()
             shutdown_cbs.append(rclpy.shutdown)
 
-            self._rmf_gateway = rmf_gateway_fc(self._rmf_events, self.static_files_repo)
+            self._rmf_gateway = rmf_gateway_fc(
+                self._rmf_ingest.raw_events, self.static_files_repo
+            )
 
-            self._rmf_gateway.spin_background()
+            self._rmf_gateway.spin_background(self.app_config.ros_executor_threads)
             shutdown_cbs.append(self._rmf_gateway.stop_spinning)
 
             # Order is important here
-            # 1. load states from db, this populate the sio/fast_io rooms with the latest data
+            # 1. load states from db, this populate the sio/fast_io rooms and the state
+            # store with the latest data
+            self._rmf_state_store.start()
+            shutdown_cbs.append(self._rmf_state_store.stop)
             await self._load_states()
 
+            if self.role == AppRole.WORKER:
+                # the gateway is only used to send requests to rmf, the events come
+                # from the ingestion process.
+                bus_subscriber = RmfBusSubscriber(
+                    self._rmf_events,
+                    self.app_config.bus_path,
+                    logger=self.logger.getChild("BusSubscriber"),
+                )
+                bus_subscriber.start()
+                shutdown_cbs.append(bus_subscriber.stop())
+                self.logger.info("started app")
+                return
+
+            await self._update_tasks()
+
             # 2. start the services after loading states so that the loaded states are not
             # used. Failing to do so will cause for example, book keeper to save the loaded states
             # back into the db and mess up health watchdog's heartbeat system.
 
+            bookkeeper_logging = QueueLogging(
+                self.logger.getChild("BookKeeper"), self.logger.handlers
+            )
+            bookkeeper_logging.start()
+            shutdown_cbs.append(bookkeeper_logging.stop)
             await self._rmf_bookkeeper.start()
             shutdown_cbs.append(self._rmf_bookkeeper.stop())
             health_watchdog = HealthWatchdog(
                 self._rmf_events,
+                eviction_ttl=self.app_config.health_eviction_ttl,
+                remove_evicted_health=self.app_config.health_remove_evicted,
+                building_map_cache=self._rmf_state_store.building_map,
+                state_store=self._rmf_state_store,
+                # dead entities are published from the loop like every other event
+                scheduler=AsyncIOThreadSafeScheduler(self.loop),
                 logger=self.logger.getChild("HealthWatchdog"),
             )
             await health_watchdog.start()
-
+            shutdown_cbs.append(health_watchdog.stop())
+
+            await self._rmf_ingest.start()
+            shutdown_cbs.append(self._rmf_ingest.stop)
+            if self.app_config.record_path:
+                recorder = RmfRecorder(
+                    self._rmf_ingest.raw_events,
+                    self.app_config.record_path,
+                    logger=self.logger.getChild("Recorder"),
+                )
+                recorder.start()
+                shutdown_cbs.append(recorder.stop)
+            if self.role == AppRole.INGESTION:
+                bus_publisher = RmfBusPublisher(
+                    self._rmf_events,
+                    self.app_config.bus_path,
+                    state_store=self._rmf_state_store,
+                    logger=self.logger.getChild("BusPublisher"),
+                )
+                await bus_publisher.start()
+                shutdown_cbs.append(bus_publisher.stop())
             self._rmf_gateway.subscribe_all()
             shutdown_cbs.append(self._rmf_gateway.unsubscribe_all)
 
@@ -274,7 +380,9 @@ class App(FastIO, BaseApp):
         for health in robot_health:
             self._rmf_events.robot_health.on_next(health)
         self.logger.info(f"loaded {len(robot_health)} robot health")
+        self.logger.info("successfully loaded all states")
 
+    async def _update_tasks(self):
         self.logger.info("updating tasks from RMF")
         try:
             # Sometimes the node has not finished discovery so we need to call
@@ -290,13 +398,17 @@ class App(FastIO, BaseApp):
         except HTTPException as e:
             self.logger.error(f"failed to update tasks from RMF ({e.detail})")
 
-        self.logger.info("successfully loaded all states")
-
     def rmf_events(self) -> RmfEvents:
         return self._rmf_events
 
     def rmf_gateway(self) -> RmfGateway:
         return self._rmf_gateway
 
+    def rmf_state_store(self) -> RmfStateStore:
+        return self._rmf_state_store
+
     def rmf_bookkeeper(self) -> RmfBookKeeper:
         return self._rmf_bookkeeper
+
+    def rmf_ingest(self) -> RmfIngest:
+        return self._rmf_ingest
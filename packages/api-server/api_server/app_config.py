@@ -3,7 +3,7 @@ import os
 import urllib.parse
 from dataclasses import dataclass
 from importlib.abc import Loader
-from typing import Any, Optional, cast
+from typing import Any, Dict, List, Optional, cast
 
 
 @dataclass
@@ -19,11 +19,37 @@ class AppConfig:
     oidc_url: Optional[str]
     aud: str
     iss: Optional[str]
+    ingest_max_rates: Dict[str, Optional[float]]
+    ingest_queue_size: int
+    ingest_overflow_policy: str
+    ros_executor_threads: int
+    record_path: Optional[str]
+    bookkeeper_flush_interval: Optional[float]
+    bookkeeper_high_water_mark: int
+    bookkeeper_low_water_mark: int
+    bookkeeper_skip_unchanged: Optional[Dict[str, List[str]]]
+    bookkeeper_log_policies: Dict[str, str]
+    health_eviction_ttl: Optional[float]
+    health_remove_evicted: bool
+    sio_outbound_queue_size: Optional[int]
+    sio_slow_consumer_timeout: float
+    bus_path: str
+    snapshot_cache_ttl: float
 
     def __post_init__(self):
         self.public_url = urllib.parse.urlparse(cast(str, self.public_url))
 
 
+def app_config_file() -> str:
+    """
+    The config file set with `RMF_API_SERVER_CONFIG`, defaults to `default_config.py`.
+    """
+    return os.environ.get(
+        "RMF_API_SERVER_CONFIG",
+        f"{os.path.dirname(__file__)}/default_config.py",
+    )
+
+
 def load_config(config_file: str) -> AppConfig:
     spec = importlib.util.spec_from_file_location("config", config_file)
     if spec is None:
@@ -6,7 +6,7 @@ from .authenticator import JwtAuthenticator
 from .gateway import RmfGateway
 from .models import User
 from .repositories import RmfRepository, StaticFilesRepository
-from .rmf_io import RmfBookKeeper, RmfEvents
+from .rmf_io import RmfBookKeeper, RmfEvents, RmfStateStore
 
 
 class BaseApp(ABC):
@@ -14,6 +14,8 @@ class BaseApp(ABC):
         self.authenticator: JwtAuthenticator
         self.auth_dep: Callable[..., User]
         self.rmf_repo: Callable[..., RmfRepository]
+        # used for the snapshots sent on socket.io subscribe
+        self.rmf_snapshot_repo: Callable[..., RmfRepository]
         self.logger: Logger
         self.static_files_repo: StaticFilesRepository
 
@@ -25,6 +27,10 @@ class BaseApp(ABC):
     def rmf_gateway(self) -> RmfGateway:
         pass
 
+    @abstractmethod
+    def rmf_state_store(self) -> RmfStateStore:
+        pass
+
     @abstractmethod
     def rmf_bookkeeper(self) -> RmfBookKeeper:
         pass
@@ -25,4 +25,80 @@ config = {
     # Used to verify the "iss" claim
     # If iss is set to None, it means that authentication should be disabled
     "iss": None,
+    # Max rate (in hz) that states are processed at, states are coalesced by their entity
+    # id and only the latest state is kept. A rate of None processes every message.
+    # Coalescing reduces the load of high rate topics, at the cost of up to 1/rate
+    # seconds of extra latency, e.g. `"fleet_states": 2` delays fleet states by up to
+    # 500ms.
+    "ingest_max_rates": {
+        "door_states": None,
+        "lift_states": None,
+        "dispenser_states": None,
+        "ingestor_states": None,
+        "fleet_states": None,
+    },
+    # Max number of messages queued between the ros thread and the event loop.
+    "ingest_queue_size": 1000,
+    # What to do when the ingest queue is full, one of "block", "drop_oldest" or
+    # "drop_newest". "drop_oldest" replaces the queued message of the same entity if
+    # there is one, otherwise the oldest state, building maps and task summaries are
+    # never dropped.
+    "ingest_overflow_policy": "drop_oldest",
+    # Number of threads used to process ros callbacks, when more than 1, states, the
+    # building map and service responses are processed concurrently.
+    "ros_executor_threads": 1,
+    # Path to a file where events received from rmf are recorded to, the recording can be
+    # replayed with `python -m api_server.replay_gateway <path>`. A path ending with ".gz"
+    # is gzipped. Set to None to disable recording.
+    "record_path": None,
+    # When set, states and health are written to the database in batches every
+    # `bookkeeper_flush_interval` seconds, only the latest state of each entity is
+    # written. Set to None to write every message as it arrives.
+    "bookkeeper_flush_interval": None,
+    # Max number of pending database writes, there is at most one pending write for each
+    # entity. When reached, writes for new entities are dropped until the number of
+    # pending writes is down to `bookkeeper_low_water_mark`.
+    "bookkeeper_high_water_mark": 1000,
+    "bookkeeper_low_water_mark": 800,
+    # States that are the same as the last state written for the entity are not written
+    # again. Keyed by topic, each topic lists the fields that are ignored when comparing,
+    # topics that are not listed are always written. Set to None to always write.
+    "bookkeeper_skip_unchanged": {
+        "door_states": ["door_time"],
+        "lift_states": ["lift_time"],
+        "dispenser_states": ["time"],
+        "ingestor_states": ["time"],
+    },
+    # How often the bookkeeper logs the messages of each topic, one of "every",
+    # "on_change" (ignoring the fields in `bookkeeper_skip_unchanged`) or
+    # "sample:<seconds>" to log each entity at most once every <seconds>.
+    # Topics that are not listed log every message.
+    "bookkeeper_log_policies": {
+        "door_states": "on_change",
+        "lift_states": "on_change",
+        "dispenser_states": "on_change",
+        "ingestor_states": "on_change",
+    },
+    # Doors, lifts, dispensers, ingestors and robots that are not seen for this many
+    # seconds are no longer watched by the health watchdog, e.g. a robot that left its
+    # fleet. Set to None to watch them forever.
+    "health_eviction_ttl": None,
+    # Also delete the health of the entities that are no longer watched.
+    "health_remove_evicted": False,
+    # Max number of socket.io events queued for each client, there is at most one queued
+    # event for each path. When full, the oldest event is dropped. Set to None to send
+    # every event as it happens without a bound.
+    "sio_outbound_queue_size": 100,
+    # Clients that have not taken any event for this many seconds while events are
+    # queued for them are disconnected.
+    "sio_slow_consumer_timeout": 10,
+    # Unix socket that the ingestion process publishes the events on, the api workers
+    # subscribe to it. Only used when running with multiple workers, see
+    # `python -m api_server.ingestion` and `python -m api_server.worker`.
+    "bus_path": "rmf_api_server.sock",
+    # Seconds that the snapshots sent on socket.io subscribe are kept in memory after
+    # being read from the database, concurrent reads of the same snapshot share one
+    # query, e.g. when every client re-subscribes after a restart. 0 only shares the
+    # concurrent reads. Rest requests are not affected.
+    "snapshot_cache_ttl": 1,
 }
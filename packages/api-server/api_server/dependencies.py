@@ -4,6 +4,8 @@ from fastapi import Depends, Query
 
 from .models import Pagination, User
 from .repositories.rmf import RmfRepository
+from .rmf_io import RmfStateStore
+from .single_flight import SingleFlight
 
 
 def pagination_query(
@@ -17,8 +19,12 @@ def pagination_query(
     return Pagination(limit=limit, offset=offset, order_by=order_by)
 
 
-def rmf_repo(user_dep: Callable[..., User]) -> Callable[..., RmfRepository]:
+def rmf_repo(
+    user_dep: Callable[..., User],
+    state_store: Optional[RmfStateStore] = None,
+    snapshot_reads: Optional[SingleFlight] = None,
+) -> Callable[..., RmfRepository]:
     def dep(user: User = Depends(user_dep)):
-        return RmfRepository(user)
+        return RmfRepository(user, state_store, snapshot_reads)
 
     return dep
@@ -3,15 +3,15 @@ import inspect
 import logging
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from re import Pattern
+from itertools import combinations
 from typing import (
     Any,
     AsyncContextManager,
     Callable,
     Dict,
     Generic,
+    Iterable,
     List,
-    Match,
     Optional,
     Protocol,
     Sequence,
@@ -27,6 +27,10 @@ import socketio
 from fastapi import APIRouter, Depends, FastAPI
 from fastapi.exceptions import HTTPException
 from fastapi.types import DecoratedCallable
+from rx import operators as rxops
+from rx.core.observable.observable import Observable
+from rx.core.typing import Disposable
+from rx.scheduler.eventloop.asyncioscheduler import AsyncIOScheduler
 from socketio.asyncio_server import AsyncServer
 from starlette.routing import compile_path
 
@@ -37,7 +41,12 @@ from api_server.authenticator import (
 )
 from api_server.models import User
 
+from .batching import Batcher, BatchOptions, FrameEncoding, encode_frame
+from .encoded_json import EncodedJson, SioJson
 from .errors import *
+from .outbound import OutboundQueues, OutboundStats
+from .radix import RadixRouter
+from .throttling import Throttler
 
 T = TypeVar("T")
 
@@ -57,6 +66,7 @@ class DataStore(ABC, Generic[T]):
 @dataclass
 class SubscriptionData:
     path: str
+    min_interval: Optional[float] = None  # in seconds
 
 
 @dataclass
@@ -67,11 +77,24 @@ class WatchRequest:
     user: User
     _on_unsubscribe: Optional[Callable[[], None]] = None
     _subscribe_task: Optional[asyncio.Task] = None
+    _batcher: Optional[Batcher] = None
+    _throttler: Optional[Throttler] = None
+    _outbound: Optional[OutboundQueues] = None
+    _room: Optional[str] = None
 
     def on_unsubscribe(self, cb: Callable[[], None]) -> None:
         self._on_unsubscribe = cb
 
     async def emit(self, data, to: Optional[str] = None) -> None:
+        if to is None and self._throttler is not None:
+            self._throttler.offer(self.sid, self.path, self.path, data)
+            return
+        if to is None and self._batcher is not None:
+            self._batcher.queue(self.sid, self.path, data)
+            return
+        if to is None and self._outbound is not None:
+            self._outbound.emit(self.sid, self.path, data)
+            return
         to = to or self.sid
         await self.sio.emit(self.path, data, to=to)
 
@@ -86,15 +109,51 @@ class Watch:
     path: str
 
 
+@dataclass
+class Broadcast:
+    path: str
+    source: Observable
+    params: Callable[[Any], Dict[str, str]]
+    transform: Optional[Callable[[Any], Any]] = None
+    values: Optional[Callable[[], Iterable[Any]]] = None
+
+
 @dataclass
 class SioRoute:
-    pattern: Pattern
+    path: str
     func: OnSubscribe
 
 
+_MISSING = object()
+
+
+class _BroadcastRoute:
+    def __init__(self, path: str, broadcast: Broadcast):
+        _, self.path_format, convertors = compile_path(path)
+        self.broadcast = broadcast
+        # the parameters that are replaced by "*" in each collection of the path,
+        # e.g. `/fleets/*/*/health`, `/fleets/*/{robot}/health` and
+        # `/fleets/{fleet}/*/health`
+        names = list(convertors)
+        self.wildcards = [
+            subset
+            for size in range(len(names), 0, -1)
+            for subset in combinations(names, size)
+        ]
+
+    def paths(self, params: Dict[str, str]) -> Iterable[str]:
+        """
+        The path of an event and the paths of the collections that the event is in.
+        """
+        yield self.path_format.format(**params)
+        for wildcard in self.wildcards:
+            yield self.path_format.format(**{**params, **dict.fromkeys(wildcard, "*")})
+
+
 class Session(TypedDict, total=False):
     user: User
     subscriptions: Dict[str, WatchRequest]
+    batch: Optional[BatchOptions]
 
 
 # For typing purposes
@@ -141,6 +200,7 @@ class FastIORouter(APIRouter):
         super().__init__(*args, **kwargs)
         self.user_dep = user_dep or (lambda: User(username="stub", is_admin=True))
         self.watches = cast(List[Watch], [])
+        self.broadcasts = cast(List[Broadcast], [])
         self._loop: Optional[asyncio.AbstractEventLoop] = None
 
     def include_router(self, router: "FastIORouter", **kwargs):
@@ -155,6 +215,16 @@ class FastIORouter(APIRouter):
                     path=prefix + watch.path,
                 )
             )
+        for broadcast in router.broadcasts:
+            self.broadcasts.append(
+                Broadcast(
+                    path=prefix + broadcast.path,
+                    source=broadcast.source,
+                    params=broadcast.params,
+                    transform=broadcast.transform,
+                    values=broadcast.values,
+                )
+            )
 
     def watch(self, path: str):
         """
@@ -169,6 +239,39 @@ class FastIORouter(APIRouter):
 
         return decorator
 
+    def broadcast(
+        self,
+        path: str,
+        source: Observable,
+        params: Callable[[Any], Dict[str, str]],
+        transform: Optional[Callable[[Any], Any]] = None,
+        values: Optional[Callable[[], Iterable[Any]]] = None,
+    ):
+        """
+        Sends the events of `source` to all the clients that subscribed to the path of
+        the event, with one emit per event no matter how many clients are subscribed. A
+        watch must still be registered on the same path to accept the subscriptions, it
+        only needs to send the initial data.
+
+        :param path: Path template of the events, same as the path of the watch.
+        :param params: Maps an event to the path parameters of its path.
+        :param transform: Converts an event to the data that is sent, it is only called
+            if there are clients subscribed to the path.
+        :param values: Returns the latest event of every entity. If it is provided,
+            clients can subscribe to collections by using "*" in place of path
+            parameters, e.g. `/doors/*/state`. The current values of the collection are
+            sent on subscribe, followed by the events of every entity in it.
+        """
+        self.broadcasts.append(
+            Broadcast(
+                path=self.prefix + path,
+                source=source,
+                params=params,
+                transform=transform,
+                values=values,
+            )
+        )
+
 
 class FastIO(socketio.ASGIApp):
     def __init__(
@@ -178,11 +281,18 @@ class FastIO(socketio.ASGIApp):
         authenticator: Optional[JwtAuthenticator] = None,
         logger: logging.Logger = None,
         dependencies: Optional[Sequence[Any]] = None,
+        outbound_queue_size: Optional[int] = None,
+        slow_consumer_timeout: float = 10,
         **fast_api_args,
     ):
         """
         :param authenticator: Authenticator used to verify socket.io connections, for
             FastAPI endpoints, a dependency must be provided.
+        :param outbound_queue_size: Max number of events queued for each client that
+            is behind, see `OutboundQueues`. If None, events are sent as they happen
+            without a bound.
+        :param slow_consumer_timeout: Clients that have not taken any event for this
+            many seconds while events are queued for them are disconnected.
         """
         self.logger = logger or logging.getLogger(self.__class__.__name__)
         self.sio = cast(_CustomSio, sio)
@@ -192,27 +302,55 @@ class FastIO(socketio.ASGIApp):
         dependencies.append(Depends(self.auth_dep))
         self.fapi = FastAPI(dependencies=dependencies, **fast_api_args)
         super().__init__(self.sio, other_asgi_app=self.fapi)
-        self._sio_routes: List[SioRoute] = []
+        self._sio_router = RadixRouter[SioRoute]()
+        # keyed by the path template
+        self._broadcasts: Dict[str, _BroadcastRoute] = {}
+        self._broadcast_subs: List[Disposable] = []
+        self.outbound: Optional[OutboundQueues] = None
+        if outbound_queue_size is not None:
+            self.outbound = OutboundQueues(
+                self.sio,
+                maxsize=outbound_queue_size,
+                slow_consumer_timeout=slow_consumer_timeout,
+                logger=self.logger.getChild("Outbound"),
+            )
+        self._batcher = Batcher(self.sio, self.outbound)
+        self._throttler = Throttler(self._send)
+        self.fapi.add_event_handler("startup", self._start_broadcasts)
+        self.fapi.add_event_handler("shutdown", self._stop_broadcasts)
+        if self.outbound is not None:
+            self.fapi.add_event_handler("startup", self.outbound.start)
+            self.fapi.add_event_handler("shutdown", self.outbound.stop)
 
         async def on_connect(sid: str, _environ: dict, auth: Optional[dict] = None):
             async with self.sio.session(sid) as session:
                 session["subscriptions"] = {}
-                if not self.authenticator:
-                    session["user"] = User(username="stub", is_admin=True)
-                    return True
-                token = None
-                if auth:
-                    token = auth["token"]
-
                 try:
-                    user = await self.authenticator.verify_token(token)
-                    session["user"] = user
-                    return True
-                except AuthenticationError as e:
-                    self.logger.error(f"authentication failed: {e}")
+                    session["batch"] = BatchOptions.from_auth(auth)
+                except ValueError as e:
+                    self.logger.error(f"invalid batch options: {e}")
                     return False
+                if not self.authenticator:
+                    session["user"] = User(username="stub", is_admin=True)
+                else:
+                    token = None
+                    if auth:
+                        # clients may only send batch options
+                        token = auth.get("token")
+
+                    try:
+                        user = await self.authenticator.verify_token(token)
+                        session["user"] = user
+                    except AuthenticationError as e:
+                        self.logger.error(f"authentication failed: {e}")
+                        return False
+                batch = session["batch"]
+            if batch is not None:
+                self._batcher.add_client(sid, batch)
+            return True
 
         sio.on("connect", on_connect)
+        sio.on("disconnect", self._on_disconnect)
 
         self.sio.on("subscribe", self._on_subscribe)
         self.sio.on("unsubscribe", self._on_unsubscribe)
@@ -220,22 +358,140 @@ class FastIO(socketio.ASGIApp):
     def include_router(self, router: FastIORouter, prefix: str = "", **kwargs):
         self.fapi.include_router(router, prefix=prefix, **kwargs)
         for watch in router.watches:
-            pattern, _, _ = compile_path(prefix + watch.path)
-            self._sio_routes.append(SioRoute(pattern, watch.func))
+            path = prefix + watch.path
+            self._sio_router.add(path, SioRoute(path, watch.func))
+        for broadcast in router.broadcasts:
+            path = prefix + broadcast.path
+            self._broadcasts[path] = _BroadcastRoute(path, broadcast)
+
+    def _start_broadcasts(self):
+        loop = asyncio.get_event_loop()
+        for route in self._broadcasts.values():
+            sub = route.broadcast.source.pipe(
+                rxops.observe_on(AsyncIOScheduler(loop))
+            ).subscribe(self._make_dispatch(route, loop))
+            self._broadcast_subs.append(sub)
+
+    def _stop_broadcasts(self):
+        for sub in self._broadcast_subs:
+            sub.dispose()
+        self._broadcast_subs.clear()
+
+    def _make_dispatch(self, route: _BroadcastRoute, loop: asyncio.AbstractEventLoop):
+        broadcast = route.broadcast
+
+        def dispatch(data):
+            params = broadcast.params(data)
+            key = route.path_format.format(**params)
+            rooms = self.sio.manager.rooms.get("/", {})
+            transformed = _MISSING
+            for path in route.paths(params):
+                sids = rooms.get(path)
+                batched_sids = rooms.get(self._batch_room(path))
+                throttled_sids = rooms.get(self._throttle_room(path))
+                if throttled_sids:
+                    # throttled subscriptions only transform the updates that are sent
+                    for sid in list(throttled_sids):
+                        self._throttler.offer(sid, path, key, data, broadcast.transform)
+                if not sids and not batched_sids:
+                    continue
+                if transformed is _MISSING:
+                    transformed = (
+                        broadcast.transform(data)
+                        if broadcast.transform is not None
+                        else data
+                    )
+                if sids:
+                    # one emit to the room, only the clients that are behind are
+                    # queued one by one.
+                    behind = (
+                        [sid for sid in self.outbound.behind if sid in sids]
+                        if self.outbound is not None and self.outbound.behind
+                        else None
+                    )
+                    if behind:
+                        for sid in behind:
+                            self.outbound.put(sid, path, transformed, key)
+                        if len(behind) < len(sids):
+                            loop.create_task(
+                                self.sio.emit(
+                                    path, transformed, room=path, skip_sid=behind
+                                )
+                            )
+                    else:
+                        loop.create_task(self.sio.emit(path, transformed, room=path))
+                if batched_sids:
+                    # batches are keyed by the path of the entity so that the updates
+                    # of a collection are not merged
+                    for sid in list(batched_sids):
+                        self._batcher.queue(sid, key, transformed)
+
+        return dispatch
+
+    # The sids that subscribed to a path are in the room of the path, in the throttle
+    # room of the path if the subscription is throttled, or in the batch room of the
+    # path if they opted in to batching.
+    @staticmethod
+    def _batch_room(path: str) -> str:
+        return f"batch:{path}"
+
+    @staticmethod
+    def _throttle_room(path: str) -> str:
+        return f"throttle:{path}"
+
+    def _send(self, sid: str, path: str, key: str, data: Any):
+        if self._batcher.is_batched(sid):
+            self._batcher.queue(sid, key, data)
+        elif self.outbound is not None:
+            self.outbound.emit(sid, path, data, key)
+        else:
+            asyncio.get_event_loop().create_task(self.sio.emit(path, data, to=sid))
+
+    def _send_collection(
+        self, req: WatchRequest, params: Dict[str, str], route: _BroadcastRoute
+    ):
+        # pylint: disable=protected-access
+        broadcast = route.broadcast
+        if broadcast.values is None:
+            return
+        for value in broadcast.values():
+            value_params = broadcast.params(value)
+            if any(v not in ("*", value_params[k]) for k, v in params.items()):
+                continue
+            key = route.path_format.format(**value_params)
+            if req._throttler is not None:
+                req._throttler.offer(req.sid, req.path, key, value, broadcast.transform)
+            else:
+                if broadcast.transform is not None:
+                    value = broadcast.transform(value)
+                self._send(req.sid, req.path, key, value)
+
+    async def _on_disconnect(self, sid: str):
+        self._batcher.remove_client(sid)
+        self._throttler.remove_client(sid)
+        if self.outbound is not None:
+            self.outbound.remove_client(sid)
 
     @staticmethod
     def _parse_sub_data(data: dict) -> SubscriptionData:
         if "path" not in data:
             raise SubscribeError("missing 'path'")
         path = url_unquote(data["path"])
-        return SubscriptionData(path=path)
+        min_interval_ms = data.get("min_interval_ms")
+        if min_interval_ms is None:
+            return SubscriptionData(path=path)
+        min_ms, max_ms = Throttler.MIN_INTERVAL_MS, Throttler.MAX_INTERVAL_MS
+        if (
+            not isinstance(min_interval_ms, (int, float))
+            or not min_ms <= min_interval_ms <= max_ms
+        ):
+            raise SubscribeError(
+                f"'min_interval_ms' must be between {min_ms} and {max_ms}"
+            )
+        return SubscriptionData(path=path, min_interval=min_interval_ms / 1000)
 
-    def _match_path(self, path: str) -> Optional[Tuple[Match, SioRoute]]:
-        for route in self._sio_routes:
-            match = route.pattern.match(path)
-            if match:
-                return match, route
-        return None
+    def _match_path(self, path: str) -> Optional[Tuple[SioRoute, Dict[str, str]]]:
+        return self._sio_router.match(path)
 
     async def _on_subscribe(self, sid: str, data: dict):
         try:
@@ -251,17 +507,39 @@ class FastIO(socketio.ASGIApp):
                     "subscribe", {"success": False, "error": "no events in path"}
                 )
                 return
-            match, sio_route = result
+            sio_route, params = result
+            collection: Optional[_BroadcastRoute] = None
+            if "*" in params.values():
+                collection = self._broadcasts.get(sio_route.path)
+                if collection is None or collection.broadcast.values is None:
+                    await self.sio.emit(
+                        "subscribe",
+                        {"success": False, "error": "path is not a collection"},
+                    )
+                    return
 
             # pylint: disable=protected-access
             async with self.sio.session(sid) as session:
                 user = session["user"]
                 req = WatchRequest(sid=sid, sio=self.sio, path=sub_data.path, user=user)
+                if sub_data.min_interval is not None:
+                    self._throttler.add(sid, sub_data.path, sub_data.min_interval)
+                    req._throttler = self._throttler
+                    req._room = self._throttle_room(sub_data.path)
+                elif self._batcher.is_batched(sid):
+                    req._batcher = self._batcher
+                    req._room = self._batch_room(sub_data.path)
+                else:
+                    req._outbound = self.outbound
+                    req._room = sub_data.path
                 session["subscriptions"][sub_data.path] = req
-                maybe_coro = sio_route.func(req, **match.groupdict())
-                if asyncio.iscoroutine(maybe_coro):
-                    req._subscribe_task = asyncio.create_task(maybe_coro)
-                self.sio.enter_room(sid, sub_data.path)
+                if collection is not None:
+                    self._send_collection(req, params, collection)
+                else:
+                    maybe_coro = sio_route.func(req, **params)
+                    if asyncio.iscoroutine(maybe_coro):
+                        req._subscribe_task = asyncio.create_task(maybe_coro)
+                self.sio.enter_room(sid, req._room)
         except HTTPException as e:
             await self.sio.emit(
                 "subscribe", {"success": False, "error": f"{e.status_code} {e.detail}"}
@@ -283,7 +561,11 @@ class FastIO(socketio.ASGIApp):
                     maybe_coro = req._on_unsubscribe()
                     if inspect.isawaitable(maybe_coro):
                         await maybe_coro
-                self.sio.leave_room(sid, sub_data.path)
+                self.sio.leave_room(sid, req._room)
+                self._throttler.remove(sid, sub_data.path)
+                self._batcher.discard(sid, sub_data.path)
+                if self.outbound is not None:
+                    self.outbound.discard(sid, sub_data.path)
                 await self.sio.emit("unsubscribe", {"success": True})
         except SubscribeError as e:
             await self.sio.emit("unsubscribe", {"success": False, "error": str(e)})
@@ -0,0 +1,164 @@
+import asyncio
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Union
+
+from socketio.asyncio_server import AsyncServer
+
+from .encoded_json import EncodedJson, msgpack
+from .outbound import OutboundQueues
+
+
+class FrameEncoding:
+    JSON = "json"
+    MSGPACK = "msgpack"
+
+
+@dataclass
+class BatchOptions:
+    """
+    Requested by a client in the `batch` field of the `connect` auth payload, e.g.
+    `{"token": "...", "batch": {"interval_ms": 50, "encoding": "msgpack"}}`.
+    """
+
+    interval: float  # in seconds
+    encoding: str = FrameEncoding.JSON
+
+    DEFAULT_INTERVAL_MS = 50
+    MIN_INTERVAL_MS = 10
+    MAX_INTERVAL_MS = 10000
+
+    @classmethod
+    def from_auth(cls, auth: Optional[dict]) -> Optional["BatchOptions"]:
+        """
+        Returns None if the client did not ask for batching.
+
+        :raises ValueError: If the options are not valid.
+        """
+        if not auth or auth.get("batch") is None:
+            return None
+        batch = auth["batch"]
+        if not isinstance(batch, dict):
+            raise ValueError("'batch' must be an object")
+        interval_ms = batch.get("interval_ms", cls.DEFAULT_INTERVAL_MS)
+        if (
+            not isinstance(interval_ms, (int, float))
+            or not cls.MIN_INTERVAL_MS <= interval_ms <= cls.MAX_INTERVAL_MS
+        ):
+            raise ValueError(
+                f"'interval_ms' must be between {cls.MIN_INTERVAL_MS} and "
+                f"{cls.MAX_INTERVAL_MS}"
+            )
+        encoding = batch.get("encoding", FrameEncoding.JSON)
+        if encoding not in (FrameEncoding.JSON, FrameEncoding.MSGPACK):
+            raise ValueError(f"unknown encoding '{encoding}'")
+        if encoding == FrameEncoding.MSGPACK and msgpack is None:
+            raise ValueError("msgpack is not supported by the server")
+        return cls(interval=interval_ms / 1000, encoding=encoding)
+
+
+def _to_json(data: Any) -> str:
+    if isinstance(data, EncodedJson):
+        return data.json
+    return json.dumps(data, separators=(",", ":"))
+
+
+def _to_msgpack(data: Any) -> bytes:
+    if isinstance(data, EncodedJson):
+        return data.to_msgpack()
+    return msgpack.packb(data)
+
+
+def _msgpack_array_header(size: int) -> bytes:
+    if size < 16:
+        return bytes([0x90 | size])
+    if size < 2 ** 16:
+        return b"\xdc" + size.to_bytes(2, "big")
+    return b"\xdd" + size.to_bytes(4, "big")
+
+
+def encode_frame(updates: Dict[str, Any], encoding: str) -> Union[EncodedJson, bytes]:
+    """
+    Encodes the updates of a batch to a frame of `[[path, data], ...]`. The encoded
+    data that are shared by many clients are embedded as is.
+    """
+    if encoding == FrameEncoding.MSGPACK:
+        parts = [_msgpack_array_header(len(updates))]
+        for path, data in updates.items():
+            parts.append(_msgpack_array_header(2))
+            parts.append(msgpack.packb(path))
+            parts.append(_to_msgpack(data))
+        return b"".join(parts)
+    return EncodedJson(
+        "["
+        + ",".join(
+            f"[{json.dumps(path)},{_to_json(data)}]" for path, data in updates.items()
+        )
+        + "]"
+    )
+
+
+class Batcher:
+    """
+    Gathers the updates to clients that opted in to batching and sends them in one
+    `batch` event per client, at most once per interval of the client. Only the latest
+    update of each path is sent. Json frames are embedded as is, so the socket.io server
+    must use `SioJson`.
+
+    If `outbound` is given, frames are sent through it and, for a client that is behind,
+    a frame is held back, while still merging updates, until the previous frame of the
+    client is sent.
+    """
+
+    EVENT = "batch"
+
+    def __init__(self, sio: AsyncServer, outbound: Optional[OutboundQueues] = None):
+        self.sio = sio
+        self.outbound = outbound
+        self._options: Dict[str, BatchOptions] = {}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+
+    def add_client(self, sid: str, options: BatchOptions):
+        self._options[sid] = options
+
+    def remove_client(self, sid: str):
+        self._options.pop(sid, None)
+        self._pending.pop(sid, None)
+        timer = self._timers.pop(sid, None)
+        if timer is not None:
+            timer.cancel()
+
+    def is_batched(self, sid: str) -> bool:
+        return sid in self._options
+
+    def queue(self, sid: str, path: str, data: Any):
+        options = self._options.get(sid)
+        if options is None:
+            return
+        self._pending.setdefault(sid, {})[path] = data
+        if sid not in self._timers:
+            loop = asyncio.get_event_loop()
+            self._timers[sid] = loop.call_later(options.interval, self._flush, sid)
+
+    def discard(self, sid: str, path: str):
+        pending = self._pending.get(sid)
+        if pending is not None:
+            pending.pop(path, None)
+
+    def _flush(self, sid: str):
+        self._timers.pop(sid, None)
+        pending = self._pending.pop(sid, None)
+        options = self._options.get(sid)
+        if not pending or options is None:
+            return
+        loop = asyncio.get_event_loop()
+        if self.outbound is None:
+            frame = encode_frame(pending, options.encoding)
+            loop.create_task(self.sio.emit(self.EVENT, frame, to=sid))
+            return
+        if self.outbound.depth(sid) > 0:
+            self._pending[sid] = pending
+            self._timers[sid] = loop.call_later(options.interval, self._flush, sid)
+            return
+        self.outbound.emit(sid, self.EVENT, encode_frame(pending, options.encoding))
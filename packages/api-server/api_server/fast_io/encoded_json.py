@@ -0,0 +1,54 @@
+import json
+from typing import Any, Optional
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+
+class EncodedJson:
+    """
+    Data that is already encoded to json. It can be emitted as is without encoding it
+    again if the socket.io server uses `SioJson`.
+    """
+
+    __slots__ = ("json", "_msgpack")
+
+    def __init__(self, encoded: str):
+        self.json = encoded
+        self._msgpack: Optional[bytes] = None
+
+    def to_msgpack(self) -> bytes:
+        """
+        The same data encoded to msgpack, it is encoded on first use. Requires
+        `msgpack`.
+        """
+        if self._msgpack is None:
+            self._msgpack = msgpack.packb(json.loads(self.json))
+        return self._msgpack
+
+
+class SioJson:
+    """
+    A json module for socket.io servers that embeds `EncodedJson` in the packets as is,
+    e.g. `socketio.AsyncServer(json=SioJson)`.
+    """
+
+    @staticmethod
+    def dumps(obj: Any, **kwargs) -> str:
+        # socket.io encodes the packet data as `[event, *args]`
+        if isinstance(obj, list) and any(isinstance(x, EncodedJson) for x in obj):
+            return (
+                "["
+                + ",".join(
+                    x.json if isinstance(x, EncodedJson) else json.dumps(x, **kwargs)
+                    for x in obj
+                )
+                + "]"
+            )
+        return json.dumps(obj, **kwargs)
+
+    @staticmethod
+    def loads(s: str, **kwargs) -> Any:
+        return json.loads(s, **kwargs)
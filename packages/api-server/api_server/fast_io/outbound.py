@@ -0,0 +1,210 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Set
+
+from socketio.asyncio_server import AsyncServer
+
+
+@dataclass
+class OutboundStats:
+    queued: int = 0
+    replaced: int = 0
+    dropped: int = 0
+    sent: int = 0
+    slow_consumers: int = 0
+
+
+class _ClientQueue:
+    __slots__ = ("items", "not_empty", "task", "last_progress")
+
+    def __init__(self):
+        # the (event, data) of the queued events, by key
+        self.items: "OrderedDict[str, tuple]" = OrderedDict()
+        self.not_empty = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.last_progress = 0.0
+
+
+class OutboundQueues:
+    """
+    A bounded queue of outgoing events for each client that is behind, the events are
+    sent one at a time by a task of the client, only when engine.io has less than
+    `max_backlog` packets that are not yet written to the client's transport. There is
+    at most one queued event per key (the path of the event), queueing an event with a
+    key that is already queued replaces the data of the queued event. When the queue is
+    full, the oldest event is dropped.
+
+    Clients that keep up are not queued, they are in none of the queues and events are
+    emitted to them directly, e.g. with one emit to a room. A client is behind, and in
+    `behind`, from when it has `max_backlog` or more packets in engine.io (checked every
+    `poll_interval` seconds after `start`) or an event is queued to it, until its queue
+    is empty and its backlog is below `max_backlog` again.
+
+    A client that does not take any event for `slow_consumer_timeout` seconds while it
+    is behind is disconnected.
+    """
+
+    def __init__(
+        self,
+        sio: AsyncServer,
+        *,
+        maxsize: int = 100,
+        max_backlog: int = 16,
+        slow_consumer_timeout: float = 10,
+        poll_interval: float = 0.05,
+        logger: logging.Logger = None,
+    ):
+        self.sio = sio
+        self.maxsize = maxsize
+        self.max_backlog = max_backlog
+        self.slow_consumer_timeout = slow_consumer_timeout
+        self.poll_interval = poll_interval
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self.stats = OutboundStats()
+        # sids of the clients that events must be queued to
+        self.behind: Set[str] = set()
+        self._clients: Dict[str, _ClientQueue] = {}
+        self._watch_task: Optional[asyncio.Task] = None
+
+    def depth(self, sid: str) -> int:
+        client = self._clients.get(sid)
+        return 0 if client is None else len(client.items)
+
+    def emit(self, sid: str, event: str, data: Any, key: Optional[str] = None):
+        """
+        Queues an event to a client that is behind, emits it directly otherwise. Must be
+        called from the loop thread.
+        """
+        if sid in self.behind:
+            self.put(sid, event, data, key)
+        else:
+            asyncio.get_event_loop().create_task(self.sio.emit(event, data, to=sid))
+
+    def put(self, sid: str, event: str, data: Any, key: Optional[str] = None):
+        """
+        Queues an event to a client, the client is behind until the event is sent. Must
+        be called from the loop thread.
+        """
+        key = key or event
+        loop = asyncio.get_event_loop()
+        client = self._get_client(sid)
+        if key in client.items:
+            client.items[key] = (event, data)
+            self.stats.replaced += 1
+            return
+        if len(client.items) >= self.maxsize:
+            client.items.popitem(last=False)
+            self.stats.dropped += 1
+        if not client.items and not client.not_empty.is_set():
+            client.last_progress = loop.time()
+        client.items[key] = (event, data)
+        self.stats.queued += 1
+        client.not_empty.set()
+
+    def discard(self, sid: str, event: str):
+        """
+        Drops the queued events of a path, e.g. when the client unsubscribes from it.
+        """
+        client = self._clients.get(sid)
+        if client is None:
+            return
+        for key in [k for k, (e, _) in client.items.items() if e == event]:
+            del client.items[key]
+
+    def remove_client(self, sid: str):
+        self.behind.discard(sid)
+        client = self._clients.pop(sid, None)
+        if client is not None and client.task is not None:
+            client.task.cancel()
+
+    async def start(self):
+        self._watch_task = asyncio.get_event_loop().create_task(self._watch_backlogs())
+
+    async def stop(self):
+        tasks = [c.task for c in self._clients.values() if c.task is not None]
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            tasks.append(self._watch_task)
+            self._watch_task = None
+        for sid in list(self._clients):
+            self.remove_client(sid)
+        if tasks:
+            await asyncio.wait(tasks)
+
+    def check_backlogs(self):
+        """
+        Marks the clients with `max_backlog` or more packets in engine.io as behind.
+        """
+        try:
+            sockets = list(self.sio.eio.sockets.items())
+        except AttributeError:
+            return
+        loop = asyncio.get_event_loop()
+        for eio_sid, socket in sockets:
+            if socket.queue.qsize() < self.max_backlog:
+                continue
+            sid = self.sio.manager.sid_from_eio_sid(eio_sid, "/")
+            if sid is None or sid in self.behind:
+                continue
+            client = self._get_client(sid)
+            client.last_progress = loop.time()
+            # wakes up the task of the client, it keeps the client behind until the
+            # backlog is below `max_backlog`.
+            client.not_empty.set()
+
+    def _get_client(self, sid: str) -> _ClientQueue:
+        client = self._clients.get(sid)
+        if client is None:
+            client = self._clients[sid] = _ClientQueue()
+            client.task = asyncio.get_event_loop().create_task(self._run(sid, client))
+        self.behind.add(sid)
+        return client
+
+    async def _watch_backlogs(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            self.check_backlogs()
+
+    def _backlog(self, sid: str) -> int:
+        # packets that engine.io has queued but not yet written to the transport
+        try:
+            eio_sid = self.sio.manager.eio_sid_from_sid(sid, "/")
+            return self.sio.eio.sockets[eio_sid].queue.qsize()
+        except (AttributeError, KeyError):
+            return 0
+
+    async def _run(self, sid: str, client: _ClientQueue):
+        loop = asyncio.get_event_loop()
+        while True:
+            await client.not_empty.wait()
+            while self._backlog(sid) >= self.max_backlog:
+                if loop.time() - client.last_progress > self.slow_consumer_timeout:
+                    self._disconnect_slow_consumer(sid)
+                    return
+                await asyncio.sleep(self.poll_interval)
+            if not client.items:
+                # caught up, events are emitted directly again
+                client.not_empty.clear()
+                self.behind.discard(sid)
+                continue
+            _, (event, data) = client.items.popitem(last=False)
+            client.last_progress = loop.time()
+            try:
+                await self.sio.emit(event, data, to=sid)
+                self.stats.sent += 1
+            except Exception as e:  # pylint: disable=broad-except
+                self.logger.error(f"failed to send '{event}' to {sid}: {e}")
+
+    def _disconnect_slow_consumer(self, sid: str):
+        self.behind.discard(sid)
+        client = self._clients.pop(sid, None)
+        if client is not None:
+            self.stats.dropped += len(client.items)
+        self.stats.slow_consumers += 1
+        self.logger.warning(
+            f"disconnecting {sid}, it has not taken any event for "
+            f"{self.slow_consumer_timeout} seconds"
+        )
+        asyncio.get_event_loop().create_task(self.sio.disconnect(sid))
@@ -0,0 +1,82 @@
+from typing import Dict, Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class _Node(Generic[T]):
+    __slots__ = ("static", "params", "value")
+
+    def __init__(self):
+        self.static: Dict[str, "_Node[T]"] = {}
+        # keyed by the parameter name, routes may name the same segment differently
+        self.params: Dict[str, "_Node[T]"] = {}
+        self.value: Optional[T] = None
+
+
+class RadixRouter(Generic[T]):
+    """
+    Matches paths against path templates like `/doors/{door_name}/state` by walking a
+    tree of path segments, so the cost of a match depends on the length of the path and
+    not on the number of routes. Static segments take precedence over parameters, a
+    parameter matches any non empty segment.
+    """
+
+    def __init__(self):
+        self._root: _Node[T] = _Node()
+
+    @staticmethod
+    def _split(path: str) -> Optional[List[str]]:
+        if not path:
+            return []
+        if not path.startswith("/"):
+            return None
+        return path[1:].split("/")
+
+    def add(self, template: str, value: T):
+        segments = self._split(template)
+        if segments is None:
+            raise ValueError(f"'{template}' must start with '/'")
+        node = self._root
+        for segment in segments:
+            if segment.startswith("{") and segment.endswith("}"):
+                # drop the convertor, e.g. `{name:str}`
+                name = segment[1:-1].split(":", 1)[0]
+                node = node.params.setdefault(name, _Node())
+            else:
+                node = node.static.setdefault(segment, _Node())
+        if node.value is not None:
+            raise ValueError(f"'{template}' is already registered")
+        node.value = value
+
+    def match(self, path: str) -> Optional[Tuple[T, Dict[str, str]]]:
+        """
+        Returns the value of the matched route and the path parameters.
+        """
+        segments = self._split(path)
+        if segments is None:
+            return None
+        params: Dict[str, str] = {}
+        node = self._match(self._root, segments, 0, params)
+        if node is None:
+            return None
+        return node.value, params
+
+    def _match(
+        self, node: _Node[T], segments: List[str], i: int, params: Dict[str, str]
+    ) -> Optional[_Node[T]]:
+        if i == len(segments):
+            return node if node.value is not None else None
+        segment = segments[i]
+        child = node.static.get(segment)
+        if child is not None:
+            found = self._match(child, segments, i + 1, params)
+            if found is not None:
+                return found
+        if not segment:
+            return None
+        for name, param in node.params.items():
+            found = self._match(param, segments, i + 1, params)
+            if found is not None:
+                params[name] = segment
+                return found
+        return None
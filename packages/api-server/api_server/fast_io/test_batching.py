@@ -0,0 +1,85 @@
+import asyncio
+import json
+import unittest
+from typing import Any, List, Tuple, cast
+
+from .batching import Batcher, BatchOptions, FrameEncoding, encode_frame
+from .encoded_json import EncodedJson, msgpack
+
+
+class TestBatchOptions(unittest.TestCase):
+    def test_from_auth(self):
+        self.assertIsNone(BatchOptions.from_auth(None))
+        self.assertIsNone(BatchOptions.from_auth({"token": "test"}))
+        options = BatchOptions.from_auth({"batch": {}})
+        self.assertIsNotNone(options)
+        options = cast(BatchOptions, options)
+        self.assertEqual(options.interval, 0.05)
+        self.assertEqual(options.encoding, FrameEncoding.JSON)
+
+    def test_invalid_options(self):
+        for batch in [
+            "yes",
+            {"interval_ms": 0},
+            {"interval_ms": "50"},
+            {"encoding": "xml"},
+        ]:
+            with self.assertRaises(ValueError):
+                BatchOptions.from_auth({"batch": batch})
+
+
+class TestEncodeFrame(unittest.TestCase):
+    def test_json(self):
+        frame = encode_frame(
+            {"/a": EncodedJson('{"x":1}'), "/b": {"y": 2}}, FrameEncoding.JSON
+        )
+        self.assertIsInstance(frame, EncodedJson)
+        self.assertEqual(
+            json.loads(cast(EncodedJson, frame).json),
+            [["/a", {"x": 1}], ["/b", {"y": 2}]],
+        )
+
+    @unittest.skipIf(msgpack is None, "msgpack is not installed")
+    def test_msgpack(self):
+        updates = {f"/{i}": EncodedJson(json.dumps({"i": i})) for i in range(20)}
+        frame = encode_frame(updates, FrameEncoding.MSGPACK)
+        self.assertEqual(
+            msgpack.unpackb(frame),
+            [[f"/{i}", {"i": i}] for i in range(20)],
+        )
+
+
+class FakeSio:
+    def __init__(self):
+        self.emits: List[Tuple[str, Any, str]] = []
+
+    async def emit(self, event: str, data: Any, to: str):
+        self.emits.append((event, data, to))
+
+
+class TestBatcher(unittest.IsolatedAsyncioTestCase):
+    async def test_sends_latest_per_path(self):
+        sio = FakeSio()
+        batcher = Batcher(cast(Any, sio))
+        batcher.add_client("sid", BatchOptions(interval=0.01))
+        batcher.queue("sid", "/a", {"v": 1})
+        batcher.queue("sid", "/b", {"v": 1})
+        batcher.queue("sid", "/a", {"v": 2})
+        # not batched
+        batcher.queue("other", "/a", {"v": 1})
+        await asyncio.sleep(0.05)
+        self.assertEqual(len(sio.emits), 1)
+        event, frame, to = sio.emits[0]
+        self.assertEqual(event, Batcher.EVENT)
+        self.assertEqual(to, "sid")
+        self.assertEqual(json.loads(frame.json), [["/a", {"v": 2}], ["/b", {"v": 1}]])
+
+    async def test_remove_client(self):
+        sio = FakeSio()
+        batcher = Batcher(cast(Any, sio))
+        batcher.add_client("sid", BatchOptions(interval=0.01))
+        batcher.queue("sid", "/a", {"v": 1})
+        batcher.remove_client("sid")
+        await asyncio.sleep(0.05)
+        self.assertEqual(len(sio.emits), 0)
+        self.assertFalse(batcher.is_batched("sid"))
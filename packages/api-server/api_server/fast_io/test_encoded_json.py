@@ -0,0 +1,17 @@
+import json
+import unittest
+
+from .encoded_json import EncodedJson, SioJson
+
+
+class TestSioJson(unittest.TestCase):
+    def test_embeds_encoded_json(self):
+        encoded = EncodedJson(json.dumps({"a": [1, 2]}))
+        s = SioJson.dumps(["/path", encoded], separators=(",", ":"))
+        self.assertEqual(json.loads(s), ["/path", {"a": [1, 2]}])
+
+    def test_plain_data(self):
+        data = ["/path", {"a": 1}]
+        s = SioJson.dumps(data, separators=(",", ":"))
+        self.assertEqual(s, json.dumps(data, separators=(",", ":")))
+        self.assertEqual(SioJson.loads(s), data)
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import unittest
+from types import SimpleNamespace
+from typing import Any, List, Tuple, cast
+
+from .batching import Batcher, BatchOptions
+from .outbound import OutboundQueues
+
+
+class FakeSio:
+    def __init__(self):
+        self.emits: List[Tuple[str, Any, str]] = []
+        self.disconnected: List[str] = []
+        self.manager = SimpleNamespace(
+            eio_sid_from_sid=lambda sid, _namespace: sid,
+            sid_from_eio_sid=lambda eio_sid, _namespace: eio_sid,
+        )
+        self.eio = SimpleNamespace(sockets={})
+
+    def set_backlog(self, sid: str, backlog: int):
+        queue = asyncio.Queue()
+        for i in range(backlog):
+            queue.put_nowait(i)
+        self.eio.sockets[sid] = SimpleNamespace(queue=queue)
+
+    async def emit(self, event: str, data: Any, to: str):
+        self.emits.append((event, data, to))
+
+    async def disconnect(self, sid: str):
+        self.disconnected.append(sid)
+
+
+class TestOutboundQueues(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.sio = FakeSio()
+        self.outbound = OutboundQueues(
+            cast(Any, self.sio),
+            maxsize=2,
+            max_backlog=1,
+            slow_consumer_timeout=0.1,
+            poll_interval=0.01,
+        )
+
+    async def asyncTearDown(self):
+        await self.outbound.stop()
+
+    async def test_sends_in_order(self):
+        self.outbound.put("sid", "/a", 1)
+        self.outbound.put("sid", "/b", 1)
+        await asyncio.sleep(0.01)
+        self.assertEqual(self.sio.emits, [("/a", 1, "sid"), ("/b", 1, "sid")])
+        self.assertEqual(self.outbound.stats.sent, 2)
+
+    async def test_emits_directly_when_not_behind(self):
+        self.outbound.emit("sid", "/a", 1)
+        await asyncio.sleep(0)
+        self.assertEqual(self.sio.emits, [("/a", 1, "sid")])
+        self.assertEqual(self.outbound.stats.queued, 0)
+        self.assertNotIn("sid", self.outbound.behind)
+
+    async def test_behind_until_caught_up(self):
+        await self.outbound.start()
+        self.sio.set_backlog("sid", 1)
+        await asyncio.sleep(0.03)
+        self.assertIn("sid", self.outbound.behind)
+        self.outbound.emit("sid", "/a", 1)
+        self.assertEqual(self.outbound.depth("sid"), 1)
+        self.assertEqual(self.sio.emits, [])
+
+        self.sio.set_backlog("sid", 0)
+        await asyncio.sleep(0.03)
+        self.assertEqual(self.sio.emits, [("/a", 1, "sid")])
+        self.assertNotIn("sid", self.outbound.behind)
+        self.outbound.emit("sid", "/b", 1)
+        self.assertEqual(self.outbound.stats.queued, 1)
+
+    async def test_replaces_queued_event_of_same_key(self):
+        self.sio.set_backlog("sid", 1)
+        self.outbound.put("sid", "/a", 1)
+        self.outbound.put("sid", "/a", 2)
+        self.assertEqual(self.outbound.depth("sid"), 1)
+        self.assertEqual(self.outbound.stats.replaced, 1)
+        self.sio.set_backlog("sid", 0)
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.sio.emits, [("/a", 2, "sid")])
+
+    async def test_drops_oldest_when_full(self):
+        self.sio.set_backlog("sid", 1)
+        for path in ["/a", "/b", "/c"]:
+            self.outbound.put("sid", path, 1)
+        self.assertEqual(self.outbound.depth("sid"), 2)
+        self.assertEqual(self.outbound.stats.dropped, 1)
+        self.sio.set_backlog("sid", 0)
+        await asyncio.sleep(0.05)
+        self.assertEqual([e[0] for e in self.sio.emits], ["/b", "/c"])
+
+    async def test_discard(self):
+        self.sio.set_backlog("sid", 1)
+        self.outbound.put("sid", "/a", 1)
+        self.outbound.put("sid", "/b", 1)
+        self.outbound.discard("sid", "/a")
+        self.sio.set_backlog("sid", 0)
+        await asyncio.sleep(0.05)
+        self.assertEqual([e[0] for e in self.sio.emits], ["/b"])
+
+    async def test_disconnects_slow_consumer(self):
+        self.sio.set_backlog("slow", 1)
+        self.outbound.put("slow", "/a", 1)
+        self.outbound.put("fast", "/a", 1)
+        await asyncio.sleep(0.2)
+        self.assertEqual(self.sio.disconnected, ["slow"])
+        self.assertEqual(self.sio.emits, [("/a", 1, "fast")])
+        self.assertEqual(self.outbound.stats.slow_consumers, 1)
+        self.assertEqual(self.outbound.stats.dropped, 1)
+        self.assertEqual(self.outbound.depth("slow"), 0)
+
+    async def test_batcher_holds_frame_until_previous_is_sent(self):
+        batcher = Batcher(cast(Any, self.sio), self.outbound)
+        batcher.add_client("sid", BatchOptions(interval=0.01))
+        self.sio.set_backlog("sid", 1)
+        self.outbound.check_backlogs()
+        batcher.queue("sid", "/a", {"v": 1})
+        await asyncio.sleep(0.03)
+        self.assertEqual(self.outbound.depth("sid"), 1)
+        batcher.queue("sid", "/a", {"v": 2})
+        batcher.queue("sid", "/b", {"v": 1})
+        await asyncio.sleep(0.03)
+        # the updates are merged into the next frame instead of replacing the queued one
+        self.assertEqual(self.outbound.stats.replaced, 0)
+        self.sio.set_backlog("sid", 0)
+        await asyncio.sleep(0.05)
+        frames = [json.loads(frame.json) for _, frame, _ in self.sio.emits]
+        self.assertEqual(
+            frames, [[["/a", {"v": 1}]], [["/a", {"v": 2}], ["/b", {"v": 1}]]]
+        )
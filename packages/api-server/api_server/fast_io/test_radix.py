@@ -0,0 +1,56 @@
+import unittest
+
+from .radix import RadixRouter
+
+
+class TestRadixRouter(unittest.TestCase):
+    def setUp(self):
+        self.router = RadixRouter[str]()
+        self.router.add("/doors/{door_name}/state", "door_state")
+        self.router.add("/doors/{door_name}/health", "door_health")
+        self.router.add("/fleets/{name}/state", "fleet_state")
+        self.router.add("/fleets/{fleet}/{robot}/health", "robot_health")
+        self.router.add("/fleets/special/state", "special")
+        self.router.add("/building_map", "building_map")
+
+    def test_match(self):
+        self.assertEqual(
+            self.router.match("/doors/door 1/state"),
+            ("door_state", {"door_name": "door 1"}),
+        )
+        self.assertEqual(
+            self.router.match("/fleets/fleet_1/robot_1/health"),
+            ("robot_health", {"fleet": "fleet_1", "robot": "robot_1"}),
+        )
+        self.assertEqual(self.router.match("/building_map"), ("building_map", {}))
+
+    def test_static_takes_precedence(self):
+        self.assertEqual(self.router.match("/fleets/special/state"), ("special", {}))
+        self.assertEqual(
+            self.router.match("/fleets/other/state"), ("fleet_state", {"name": "other"})
+        )
+
+    def test_no_match(self):
+        for path in [
+            "",
+            "/doors",
+            "/doors//state",
+            "/doors/door_1/state/",
+            "/doors/door_1/unknown",
+            "doors/door_1/state",
+        ]:
+            self.assertIsNone(self.router.match(path), path)
+
+    def test_duplicate(self):
+        with self.assertRaises(ValueError):
+            self.router.add("/doors/{door_name}/state", "again")
+
+    def test_different_parameter_names(self):
+        self.router.add("/doors/{name}/other", "other")
+        self.assertEqual(
+            self.router.match("/doors/door_1/other"), ("other", {"name": "door_1"})
+        )
+        self.assertEqual(
+            self.router.match("/doors/door_1/state"),
+            ("door_state", {"door_name": "door_1"}),
+        )
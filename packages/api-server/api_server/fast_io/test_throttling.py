@@ -0,0 +1,55 @@
+import asyncio
+import unittest
+from typing import Any, List, Tuple
+
+from .throttling import Throttler
+
+
+class TestThrottler(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.sent: List[Tuple[str, str, str, Any]] = []
+        self.throttler = Throttler(lambda *args: self.sent.append(args))
+
+    async def test_sends_latest_per_interval(self):
+        transformed = []
+
+        def transform(x):
+            transformed.append(x)
+            return x * 10
+
+        self.throttler.add("sid", "/a", 0.05)
+        # the first update is sent right away
+        self.throttler.offer("sid", "/a", "/a", 1, transform)
+        self.assertEqual(self.sent, [("sid", "/a", "/a", 10)])
+        for i in range(2, 5):
+            self.throttler.offer("sid", "/a", "/a", i, transform)
+        self.assertEqual(len(self.sent), 1)
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.sent, [("sid", "/a", "/a", 10), ("sid", "/a", "/a", 40)])
+        # dropped updates are not transformed
+        self.assertEqual(transformed, [1, 4])
+        self.assertEqual(self.throttler.dropped, 2)
+
+    async def test_not_throttled(self):
+        self.throttler.offer("sid", "/a", "/a", 1)
+        self.assertEqual(self.sent, [])
+        self.assertFalse(self.throttler.is_throttled("sid", "/a"))
+
+    async def test_remove(self):
+        self.throttler.add("sid", "/a", 0.05)
+        self.throttler.offer("sid", "/a", "/a", 1)
+        self.throttler.offer("sid", "/a", "/a", 2)
+        self.throttler.remove_client("sid")
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.sent, [("sid", "/a", "/a", 1)])
+        self.assertFalse(self.throttler.is_throttled("sid", "/a"))
+
+    async def test_collection(self):
+        self.throttler.add("sid", "/*", 0.05)
+        self.throttler.offer("sid", "/*", "/a", 1)
+        self.throttler.offer("sid", "/*", "/b", 1)
+        self.throttler.offer("sid", "/*", "/a", 2)
+        # each entity has its own interval
+        self.assertEqual(self.sent, [("sid", "/*", "/a", 1), ("sid", "/*", "/b", 1)])
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.sent[2:], [("sid", "/*", "/a", 2)])
@@ -0,0 +1,113 @@
+import asyncio
+import math
+from typing import Any, Callable, Dict, Optional, Tuple
+
+Transform = Optional[Callable[[Any], Any]]
+
+
+class _Throttled:
+    __slots__ = ("last_sent", "pending", "timer")
+
+    def __init__(self):
+        self.last_sent = -math.inf
+        self.pending: Optional[Tuple[Any, Transform]] = None
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class _Subscription:
+    __slots__ = ("interval", "keys")
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        # a subscription to a collection has an interval for each entity
+        self.keys: Dict[str, _Throttled] = {}
+
+
+class Throttler:
+    """
+    Sends at most one update per interval for each throttled subscription. An update is
+    sent right away if nothing was sent in the last interval, else the latest update is
+    sent at the end of the interval. The updates in between are dropped before they are
+    transformed.
+
+    Updates are throttled by their key, which is the path of the entity, so that a
+    subscription to a collection receives the updates of every entity in it.
+    """
+
+    MIN_INTERVAL_MS = 10
+    MAX_INTERVAL_MS = 60000
+
+    def __init__(self, send: Callable[[str, str, str, Any], None]):
+        """
+        :param send: Called with the sid, the subscribed path, the key and the data of
+            an update to send.
+        """
+        self._send = send
+        self._subscriptions: Dict[str, Dict[str, _Subscription]] = {}
+        self.dropped = 0
+
+    def add(self, sid: str, path: str, interval: float):
+        self.remove(sid, path)
+        self._subscriptions.setdefault(sid, {})[path] = _Subscription(interval)
+
+    def remove(self, sid: str, path: str):
+        subs = self._subscriptions.get(sid)
+        if subs is None:
+            return
+        sub = subs.pop(path, None)
+        if sub is not None:
+            for throttled in sub.keys.values():
+                if throttled.timer is not None:
+                    throttled.timer.cancel()
+        if not subs:
+            del self._subscriptions[sid]
+
+    def remove_client(self, sid: str):
+        for path in list(self._subscriptions.get(sid, {})):
+            self.remove(sid, path)
+
+    def is_throttled(self, sid: str, path: str) -> bool:
+        return path in self._subscriptions.get(sid, {})
+
+    def offer(
+        self,
+        sid: str,
+        path: str,
+        key: str,
+        data: Any,
+        transform: Transform = None,
+    ):
+        """
+        :param path: The subscribed path.
+        :param key: The path of the entity of the update.
+        """
+        sub = self._subscriptions.get(sid, {}).get(path)
+        if sub is None:
+            return
+        throttled = sub.keys.get(key)
+        if throttled is None:
+            throttled = sub.keys[key] = _Throttled()
+        if throttled.pending is not None:
+            self.dropped += 1
+        throttled.pending = (data, transform)
+        if throttled.timer is not None:
+            return
+        loop = asyncio.get_event_loop()
+        delay = throttled.last_sent + sub.interval - loop.time()
+        if delay <= 0:
+            self._flush(sid, path, key, throttled)
+        else:
+            throttled.timer = loop.call_later(
+                delay, self._flush, sid, path, key, throttled
+            )
+
+    def _flush(self, sid: str, path: str, key: str, throttled: _Throttled):
+        throttled.timer = None
+        if throttled.pending is None:
+            return
+        data, transform = throttled.pending
+        throttled.pending = None
+        if transform is not None:
+            data = transform(data)
+        throttled.last_sent = asyncio.get_event_loop().time()
+        self._send(sid, path, key, data)
@@ -5,6 +5,7 @@ import base64
 import hashlib
 import logging
 import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
 from typing import List, Optional
 
 import rclpy
@@ -12,6 +13,7 @@ import rclpy.executors
 import rclpy.node
 from builtin_interfaces.msg import Time as RosTime
 from fastapi import HTTPException
+from rclpy.callback_groups import MutuallyExclusiveCallbackGroup, ReentrantCallbackGroup
 from rclpy.subscription import Subscription
 from rmf_building_map_msgs.msg import AffineImage as RmfAffineImage
 from rmf_building_map_msgs.msg import BuildingMap as RmfBuildingMap
@@ -28,7 +30,6 @@ from rmf_task_msgs.msg import Tasks as RmfTasks
 from rmf_task_msgs.srv import CancelTask as RmfCancelTask
 from rmf_task_msgs.srv import GetTaskList as RmfGetTaskList
 from rmf_task_msgs.srv import SubmitTask as RmfSubmitTask
-from rosidl_runtime_py.convert import message_to_ordereddict
 
 from .models import (
     BuildingMap,
@@ -43,29 +44,48 @@ from .repositories import StaticFilesRepository
 from .rmf_io import RmfEvents
 
 
+def _save_image(
+    image: RmfAffineImage, prefix: str, static_files: StaticFilesRepository
+) -> str:
+    # look at non-crypto hashes if we need more performance
+    sha1_hash = hashlib.sha1()
+    sha1_hash.update(image.data)
+    fingerprint = base64.b32encode(sha1_hash.digest()).lower().decode()
+    relpath = f"{prefix}-{image.name}.{fingerprint}.{image.encoding}"
+    # the path contains the hash of the image, so an existing file has the same content
+    return static_files.add_file(image.data, relpath, skip_existing=True)
+
+
 def process_building_map(
     rmf_building_map: RmfBuildingMap,
     static_files: StaticFilesRepository,
+    executor: Optional[Executor] = None,
 ) -> BuildingMap:
     """
-    1. Converts a `BuildingMap` message to an ordered dict.
-    2. Saves the images into `{static_directory}/{map_name}/`.
+    1. Saves the images into `{static_directory}/{map_name}/`.
+    2. Converts a `BuildingMap` message to a `BuildingMap` model.
     3. Change the `AffineImage` `data` field to the url of the image.
-    """
-    processed_map = message_to_ordereddict(rmf_building_map)
 
-    for i, level in enumerate(rmf_building_map.levels):
+    :param executor: If provided, images are saved in the executor while the rest of the
+        map is being converted.
+    """
+    urlpaths = []
+    for level in rmf_building_map.levels:
         level: RmfLevel
-        for j, image in enumerate(level.images):
-            image: RmfAffineImage
-            # look at non-crypto hashes if we need more performance
-            sha1_hash = hashlib.sha1()
-            sha1_hash.update(image.data)
-            fingerprint = base64.b32encode(sha1_hash.digest()).lower().decode()
-            relpath = f"{rmf_building_map.name}/{level.name}-{image.name}.{fingerprint}.{image.encoding}"  # pylint: disable=line-too-long
-            urlpath = static_files.add_file(image.data, relpath)
-            processed_map["levels"][i]["images"][j]["data"] = urlpath
-    return BuildingMap(**processed_map)
+        prefix = f"{rmf_building_map.name}/{level.name}"
+        for image in level.images:
+            if executor is None:
+                urlpaths.append(_save_image(image, prefix, static_files))
+            else:
+                urlpaths.append(
+                    executor.submit(_save_image, image, prefix, static_files)
+                )
+
+    processed_map = BuildingMap.from_msg(rmf_building_map)
+    images = (image for level in processed_map.levels for image in level.images)
+    for image, urlpath in zip(images, urlpaths):
+        image.data = urlpath.result() if isinstance(urlpath, Future) else urlpath
+    return processed_map
 
 
 class RmfGateway(rclpy.node.Node):
@@ -74,18 +94,33 @@ class RmfGateway(rclpy.node.Node):
         rmf_events: RmfEvents,
         static_files: StaticFilesRepository,
         *,
+        map_workers: int = 4,
         logger: logging.Logger = None,
     ):
+        """
+        :param map_workers: Number of threads used to save building map images.
+        """
         super().__init__("rmf_api_server")
+        # Callback groups only matter when spinning with more than 1 thread, they allow
+        # states, the building map and service responses to be processed concurrently.
+        self._states_cb_group = ReentrantCallbackGroup()
+        self._map_cb_group = MutuallyExclusiveCallbackGroup()
+        self._services_cb_group = ReentrantCallbackGroup()
         self._door_req = self.create_publisher(
             RmfDoorRequest, "adapter_door_requests", 10
         )
         self._lift_req = self.create_publisher(
             RmfLiftRequest, "adapter_lift_requests", 10
         )
-        self._submit_task_srv = self.create_client(RmfSubmitTask, "submit_task")
-        self.get_tasks_srv = self.create_client(RmfGetTaskList, "get_tasks")
-        self._cancel_task_srv = self.create_client(RmfCancelTask, "cancel_task")
+        self._submit_task_srv = self.create_client(
+            RmfSubmitTask, "submit_task", callback_group=self._services_cb_group
+        )
+        self.get_tasks_srv = self.create_client(
+            RmfGetTaskList, "get_tasks", callback_group=self._services_cb_group
+        )
+        self._cancel_task_srv = self.create_client(
+            RmfCancelTask, "cancel_task", callback_group=self._services_cb_group
+        )
 
         self.rmf_events = rmf_events
         self.static_files = static_files
@@ -97,11 +132,29 @@ class RmfGateway(rclpy.node.Node):
             lambda: self._finish_spin.set_result(None)
         )
         self._loop: asyncio.AbstractEventLoop
+        # building maps are processed one at a time outside of the spin thread, so that
+        # other subscriptions are not blocked while saving the images.
+        self._map_executor = ThreadPoolExecutor(1, thread_name_prefix="building_map")
+        self._image_executor = ThreadPoolExecutor(
+            map_workers, thread_name_prefix="building_map_images"
+        )
+        self._map_seq = 0
+
+    def spin_background(self, num_threads: int = 1):
+        """
+        :param num_threads: Number of threads used to execute callbacks, a
+            `MultiThreadedExecutor` is used if it is more than 1.
+        """
+        if num_threads > 1:
+            executor = rclpy.executors.MultiThreadedExecutor(num_threads)
+        else:
+            executor = rclpy.executors.SingleThreadedExecutor()
 
-    def spin_background(self):
         def spin():
-            self.logger.info("start spinning rclpy node")
-            rclpy.spin_until_future_complete(self, self._finish_spin)
+            self.logger.info(f"start spinning rclpy node with {num_threads} thread(s)")
+            executor.add_node(self)
+            executor.spin_until_future_complete(self._finish_spin)
+            executor.shutdown()
             self.logger.info("finished spinning rclpy node")
 
         self._spin_thread = threading.Thread(target=spin)
@@ -111,6 +164,29 @@ class RmfGateway(rclpy.node.Node):
         self._finish_gc.trigger()
         if self._spin_thread is not None:
             self._spin_thread.join()
+        self._map_executor.shutdown()
+        self._image_executor.shutdown()
+
+    def _on_building_map(self, rmf_building_map: RmfBuildingMap):
+        self._map_seq += 1
+        seq = self._map_seq
+
+        def process():
+            # skip maps that are replaced before they are processed
+            if seq != self._map_seq:
+                return
+            building_map = process_building_map(
+                rmf_building_map, self.static_files, self._image_executor
+            )
+            if seq == self._map_seq:
+                self.rmf_events.building_map.on_next(building_map)
+
+        def on_done(fut: Future):
+            e = fut.exception()
+            if e is not None:
+                self.logger.error(f"failed to process building map ({e})")
+
+        self._map_executor.submit(process).add_done_callback(on_done)
 
     async def call_service(self, client: rclpy.client.Client, req, timeout=1):
         """
@@ -128,20 +204,18 @@ class RmfGateway(rclpy.node.Node):
         door_states_sub = self.create_subscription(
             RmfDoorState,
             "door_states",
-            lambda msg: self.rmf_events.door_states.on_next(DoorState.from_orm(msg)),
+            lambda msg: self.rmf_events.door_states.on_next(DoorState.from_msg(msg)),
             10,
+            callback_group=self._states_cb_group,
         )
         self._subscriptions.append(door_states_sub)
 
-        def convert_lift_state(lift_state: RmfLiftState):
-            dic = message_to_ordereddict(lift_state)
-            return LiftState(**dic)
-
         lift_states_sub = self.create_subscription(
             RmfLiftState,
             "lift_states",
-            lambda msg: self.rmf_events.lift_states.on_next(convert_lift_state(msg)),
+            lambda msg: self.rmf_events.lift_states.on_next(LiftState.from_msg(msg)),
             10,
+            callback_group=self._states_cb_group,
         )
         self._subscriptions.append(lift_states_sub)
 
@@ -149,9 +223,10 @@ class RmfGateway(rclpy.node.Node):
             RmfDispenserState,
             "dispenser_states",
             lambda msg: self.rmf_events.dispenser_states.on_next(
-                DispenserState.from_orm(msg)
+                DispenserState.from_msg(msg)
             ),
             10,
+            callback_group=self._states_cb_group,
         )
         self._subscriptions.append(dispenser_states_sub)
 
@@ -159,17 +234,19 @@ class RmfGateway(rclpy.node.Node):
             RmfIngestorState,
             "ingestor_states",
             lambda msg: self.rmf_events.ingestor_states.on_next(
-                IngestorState.from_orm(msg)
+                IngestorState.from_msg(msg)
             ),
             10,
+            callback_group=self._states_cb_group,
         )
         self._subscriptions.append(ingestor_states_sub)
 
         fleet_states_sub = self.create_subscription(
             RmfFleetState,
             "fleet_states",
-            lambda msg: self.rmf_events.fleet_states.on_next(FleetState.from_orm(msg)),
+            lambda msg: self.rmf_events.fleet_states.on_next(FleetState.from_msg(msg)),
             10,
+            callback_group=self._states_cb_group,
         )
         self._subscriptions.append(fleet_states_sub)
 
@@ -177,25 +254,25 @@ class RmfGateway(rclpy.node.Node):
             RmfTasks,
             "dispatcher_ongoing_tasks",
             lambda msg: [
-                self.rmf_events.task_summaries.on_next(TaskSummary.from_orm(task))
+                self.rmf_events.task_summaries.on_next(TaskSummary.from_msg(task))
                 for task in msg.tasks
             ],
             10,
+            callback_group=self._states_cb_group,
         )
         self._subscriptions.append(task_summaries_sub)
 
         map_sub = self.create_subscription(
             RmfBuildingMap,
             "map",
-            lambda msg: self.rmf_events.building_map.on_next(
-                process_building_map(msg, self.static_files)
-            ),
+            self._on_building_map,
             rclpy.qos.QoSProfile(
                 history=rclpy.qos.HistoryPolicy.KEEP_ALL,
                 depth=1,
                 reliability=rclpy.qos.ReliabilityPolicy.RELIABLE,
                 durability=rclpy.qos.DurabilityPolicy.TRANSIENT_LOCAL,
             ),
+            callback_group=self._map_cb_group,
         )
         self._subscriptions.append(map_sub)
 
@@ -223,9 +300,9 @@ class RmfGateway(rclpy.node.Node):
             raise HTTPException(500, "service call succeeded but RMF returned an error")
         tasks: List[TaskSummary] = []
         for t in resp.active_tasks:
-            tasks.append(TaskSummary.from_orm(t))
+            tasks.append(TaskSummary.from_msg(t))
         for t in resp.terminated_tasks:
-            tasks.append(TaskSummary.from_orm(t))
+            tasks.append(TaskSummary.from_msg(t))
         return tasks
 
     def request_door(self, door_name: str, mode: int) -> None:
@@ -0,0 +1,28 @@
+"""
+The ingestion process, it receives the events from rmf, writes them to the database and
+publishes them on the bus for the api workers (`python -m api_server.worker`). It does
+not serve clients, only one should run at a time.
+"""
+
+import asyncio
+import signal
+
+from .app import App, AppRole
+
+
+async def run(app: App):
+    await app.fapi.router.startup()
+    stop = asyncio.Event()
+    loop = asyncio.get_event_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+    await app.fapi.router.shutdown()
+
+
+def main():
+    asyncio.run(run(App(role=AppRole.INGESTION)))
+
+
+if __name__ == "__main__":
+    main()
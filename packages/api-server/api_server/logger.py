@@ -0,0 +1,92 @@
+import json
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Sequence
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def dumps(obj: Any) -> str:
+    """
+    Serializes to compact json, using `orjson` if it is installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=str).decode()
+    return json.dumps(obj, separators=(",", ":"), default=str)
+
+
+class JsonMessage:
+    """
+    Log message that is serialized to json only when the log record is formatted, so
+    nothing is serialized if the record is filtered out or it can be done on another
+    thread with `LazyQueueHandler`.
+    """
+
+    __slots__ = ("model",)
+
+    def __init__(self, model: BaseModel):
+        self.model = model
+
+    def __str__(self) -> str:
+        return dumps(self.model.dict())
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    A `QueueHandler` that leaves the formatting of the records to the handlers of the
+    `QueueListener`. Records are dropped when the queue is full.
+    """
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class QueueLogging:
+    """
+    Makes a logger (and its children) hand off records to a background thread, which
+    formats and emits them with `handlers`. While started, the logger does not propagate
+    to its parents, `handlers` should be the handlers that it would propagate to.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        handlers: Sequence[logging.Handler],
+        *,
+        maxsize: int = 10000,
+    ):
+        self.logger = logger
+        self.handler = LazyQueueHandler(queue.Queue(maxsize))
+        self._listener = QueueListener(
+            self.handler.queue, *handlers, respect_handler_level=True
+        )
+        self._propagate = logger.propagate
+
+    def start(self):
+        self._listener.start()
+        self.logger.addHandler(self.handler)
+        self.logger.propagate = False
+
+    def stop(self):
+        """
+        Emits the queued records and stops the background thread.
+        """
+        self.logger.removeHandler(self.handler)
+        self.logger.propagate = self._propagate
+        self._listener.stop()
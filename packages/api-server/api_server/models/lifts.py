@@ -17,6 +17,12 @@ class LiftState(rmf_lift_msgs.LiftState):
     def from_tortoise(tortoise: ttm.LiftState) -> "LiftState":
         return LiftState(**tortoise.data)
 
+    @classmethod
+    def from_msg(cls, msg) -> "LiftState":
+        lift_state = super().from_msg(msg)
+        lift_state.available_modes = list(msg.available_modes)
+        return lift_state
+
     async def save(self) -> None:
         await ttm.LiftState.update_or_create({"data": self.dict()}, id_=self.lift_name)
 
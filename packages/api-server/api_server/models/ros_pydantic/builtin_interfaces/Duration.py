@@ -18,6 +18,16 @@ class Duration(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "Duration":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            sec=msg.sec,
+            nanosec=msg.nanosec,
+        )
+
 
 # # Duration defines a period between two time points. It is comprised of a
 # # seconds component and a nanoseconds component.
@@ -18,6 +18,16 @@ class Time(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "Time":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            sec=msg.sec,
+            nanosec=msg.nanosec,
+        )
+
 
 # # Time indicates a specific point in time, relative to a clock's 0 point.
 #
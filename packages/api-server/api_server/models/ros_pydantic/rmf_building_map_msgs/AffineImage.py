@@ -28,6 +28,21 @@ class AffineImage(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "AffineImage":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            name=msg.name,
+            x_offset=msg.x_offset,
+            y_offset=msg.y_offset,
+            yaw=msg.yaw,
+            scale=msg.scale,
+            encoding=msg.encoding,
+            data=bytes(msg.data),
+        )
+
 
 # string name
 # float32 x_offset
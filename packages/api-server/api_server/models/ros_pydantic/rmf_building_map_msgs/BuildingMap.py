@@ -23,6 +23,18 @@ class BuildingMap(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "BuildingMap":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            name=msg.name,
+            levels=[fields["levels"].type_.from_msg(x) for x in msg.levels],
+            lifts=[fields["lifts"].type_.from_msg(x) for x in msg.lifts],
+        )
+
 
 # string name
 # Level[] levels
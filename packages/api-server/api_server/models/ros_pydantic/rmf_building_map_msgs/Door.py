@@ -30,6 +30,22 @@ class Door(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "Door":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            name=msg.name,
+            v1_x=msg.v1_x,
+            v1_y=msg.v1_y,
+            v2_x=msg.v2_x,
+            v2_y=msg.v2_y,
+            door_type=msg.door_type,
+            motion_range=msg.motion_range,
+            motion_direction=msg.motion_direction,
+        )
+
 
 # string name
 #
@@ -13,3 +13,10 @@ class GetBuildingMap_Request(pydantic.BaseModel):
         schema_extra = {
             "required": [],
         }
+
+    @classmethod
+    def from_msg(cls, msg) -> "GetBuildingMap_Request":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct()
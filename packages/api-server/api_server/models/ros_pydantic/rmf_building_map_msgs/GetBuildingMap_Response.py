@@ -18,6 +18,16 @@ class GetBuildingMap_Response(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "GetBuildingMap_Response":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            building_map=fields["building_map"].type_.from_msg(msg.building_map),
+        )
+
 
 #
 # BuildingMap building_map
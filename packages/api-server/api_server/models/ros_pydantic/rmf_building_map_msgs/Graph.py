@@ -26,6 +26,19 @@ class Graph(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "Graph":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            name=msg.name,
+            vertices=[fields["vertices"].type_.from_msg(x) for x in msg.vertices],
+            edges=[fields["edges"].type_.from_msg(x) for x in msg.edges],
+            params=[fields["params"].type_.from_msg(x) for x in msg.params],
+        )
+
 
 # string name
 # GraphNode[] vertices
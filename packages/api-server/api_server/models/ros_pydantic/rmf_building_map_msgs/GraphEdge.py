@@ -24,6 +24,19 @@ class GraphEdge(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "GraphEdge":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            v1_idx=msg.v1_idx,
+            v2_idx=msg.v2_idx,
+            params=[fields["params"].type_.from_msg(x) for x in msg.params],
+            edge_type=msg.edge_type,
+        )
+
 
 # uint32 v1_idx
 # uint32 v2_idx
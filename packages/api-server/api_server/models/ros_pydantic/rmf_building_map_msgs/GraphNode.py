@@ -24,6 +24,19 @@ class GraphNode(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "GraphNode":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            x=msg.x,
+            y=msg.y,
+            name=msg.name,
+            params=[fields["params"].type_.from_msg(x) for x in msg.params],
+        )
+
 
 # float32 x
 # float32 y
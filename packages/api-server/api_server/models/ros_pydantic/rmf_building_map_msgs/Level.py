@@ -33,6 +33,22 @@ class Level(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "Level":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            name=msg.name,
+            elevation=msg.elevation,
+            images=[fields["images"].type_.from_msg(x) for x in msg.images],
+            places=[fields["places"].type_.from_msg(x) for x in msg.places],
+            doors=[fields["doors"].type_.from_msg(x) for x in msg.doors],
+            nav_graphs=[fields["nav_graphs"].type_.from_msg(x) for x in msg.nav_graphs],
+            wall_graph=fields["wall_graph"].type_.from_msg(msg.wall_graph),
+        )
+
 
 # string name
 # float32 elevation
@@ -35,6 +35,24 @@ class Lift(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "Lift":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            name=msg.name,
+            levels=list(msg.levels),
+            doors=[fields["doors"].type_.from_msg(x) for x in msg.doors],
+            wall_graph=fields["wall_graph"].type_.from_msg(msg.wall_graph),
+            ref_x=msg.ref_x,
+            ref_y=msg.ref_y,
+            ref_yaw=msg.ref_yaw,
+            width=msg.width,
+            depth=msg.depth,
+        )
+
 
 # string name
 # string[] levels
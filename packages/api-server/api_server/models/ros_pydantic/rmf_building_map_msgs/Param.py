@@ -26,6 +26,20 @@ class Param(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "Param":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            name=msg.name,
+            type=msg.type,
+            value_int=msg.value_int,
+            value_float=msg.value_float,
+            value_string=msg.value_string,
+            value_bool=msg.value_bool,
+        )
+
 
 # string name
 #
@@ -26,6 +26,20 @@ class Place(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "Place":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            name=msg.name,
+            x=msg.x,
+            y=msg.y,
+            yaw=msg.yaw,
+            position_tolerance=msg.position_tolerance,
+            yaw_tolerance=msg.yaw_tolerance,
+        )
+
 
 # string name
 # float32 x
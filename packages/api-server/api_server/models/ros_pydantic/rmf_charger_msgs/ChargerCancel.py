@@ -18,6 +18,16 @@ class ChargerCancel(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "ChargerCancel":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            charger_name=msg.charger_name,
+            request_id=msg.request_id,
+        )
+
 
 # string charger_name  # the charger that should process this message
 #
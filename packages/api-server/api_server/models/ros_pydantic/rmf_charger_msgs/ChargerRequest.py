@@ -26,6 +26,20 @@ class ChargerRequest(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "ChargerRequest":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            charger_name=msg.charger_name,
+            fleet_name=msg.fleet_name,
+            robot_name=msg.robot_name,
+            start_timeout=fields["start_timeout"].type_.from_msg(msg.start_timeout),
+            request_id=msg.request_id,
+        )
+
 
 # # The name of the charger that should process this message
 # string charger_name
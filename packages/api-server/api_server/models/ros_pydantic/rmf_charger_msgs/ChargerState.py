@@ -33,6 +33,25 @@ class ChargerState(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "ChargerState":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            charger_time=fields["charger_time"].type_.from_msg(msg.charger_time),
+            state=msg.state,
+            charger_name=msg.charger_name,
+            error_message=msg.error_message,
+            request_id=msg.request_id,
+            robot_fleet=msg.robot_fleet,
+            robot_name=msg.robot_name,
+            time_to_fully_charged=fields["time_to_fully_charged"].type_.from_msg(
+                msg.time_to_fully_charged
+            ),
+        )
+
 
 # # Time when this state message was created
 # builtin_interfaces/Time charger_time
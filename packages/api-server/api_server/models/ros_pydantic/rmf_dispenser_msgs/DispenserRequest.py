@@ -27,6 +27,20 @@ class DispenserRequest(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "DispenserRequest":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            time=fields["time"].type_.from_msg(msg.time),
+            request_guid=msg.request_guid,
+            target_guid=msg.target_guid,
+            transporter_type=msg.transporter_type,
+            items=[fields["items"].type_.from_msg(x) for x in msg.items],
+        )
+
 
 # builtin_interfaces/Time time
 #
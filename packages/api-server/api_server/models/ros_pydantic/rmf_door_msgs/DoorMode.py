@@ -16,6 +16,15 @@ class DoorMode(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "DoorMode":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            value=msg.value,
+        )
+
 
 # # The DoorMode message captures the "mode" of an automatic door controller.
 # # Most door controllers default to running in "closed" mode, and transition
@@ -25,6 +25,19 @@ class DoorRequest(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "DoorRequest":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            request_time=fields["request_time"].type_.from_msg(msg.request_time),
+            requester_id=msg.requester_id,
+            door_name=msg.door_name,
+            requested_mode=fields["requested_mode"].type_.from_msg(msg.requested_mode),
+        )
+
 
 # builtin_interfaces/Time request_time
 # string requester_id
@@ -20,6 +20,17 @@ class DoorSessions(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "DoorSessions":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            door_name=msg.door_name,
+            sessions=[fields["sessions"].type_.from_msg(x) for x in msg.sessions],
+        )
+
 
 #
 # string door_name
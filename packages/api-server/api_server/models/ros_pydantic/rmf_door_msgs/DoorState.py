@@ -23,6 +23,18 @@ class DoorState(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "DoorState":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            door_time=fields["door_time"].type_.from_msg(msg.door_time),
+            door_name=msg.door_name,
+            current_mode=fields["current_mode"].type_.from_msg(msg.current_mode),
+        )
+
 
 # builtin_interfaces/Time door_time
 # string door_name
@@ -20,6 +20,17 @@ class Session(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "Session":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            request_time=fields["request_time"].type_.from_msg(msg.request_time),
+            requester_id=msg.requester_id,
+        )
+
 
 #
 # builtin_interfaces/Time request_time
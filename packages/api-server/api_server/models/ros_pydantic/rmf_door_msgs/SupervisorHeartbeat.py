@@ -18,6 +18,18 @@ class SupervisorHeartbeat(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "SupervisorHeartbeat":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            all_sessions=[
+                fields["all_sessions"].type_.from_msg(x) for x in msg.all_sessions
+            ],
+        )
+
 
 #
 # DoorSessions[] all_sessions
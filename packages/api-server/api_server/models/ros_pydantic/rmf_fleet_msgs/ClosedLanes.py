@@ -18,6 +18,16 @@ class ClosedLanes(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "ClosedLanes":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            fleet_name=msg.fleet_name,
+            closed_lanes=msg.closed_lanes.tolist(),
+        )
+
 
 #
 # string fleet_name
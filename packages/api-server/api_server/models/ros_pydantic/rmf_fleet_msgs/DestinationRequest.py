@@ -24,6 +24,19 @@ class DestinationRequest(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "DestinationRequest":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            fleet_name=msg.fleet_name,
+            robot_name=msg.robot_name,
+            destination=fields["destination"].type_.from_msg(msg.destination),
+            task_id=msg.task_id,
+        )
+
 
 # string fleet_name
 # string robot_name
@@ -20,6 +20,17 @@ class Dock(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "Dock":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            fleet_name=msg.fleet_name,
+            params=[fields["params"].type_.from_msg(x) for x in msg.params],
+        )
+
 
 # string fleet_name
 # DockParameter[] params
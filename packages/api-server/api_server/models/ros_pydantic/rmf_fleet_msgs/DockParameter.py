@@ -22,6 +22,18 @@ class DockParameter(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "DockParameter":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            start=msg.start,
+            finish=msg.finish,
+            path=[fields["path"].type_.from_msg(x) for x in msg.path],
+        )
+
 
 # # The name of the waypoint where the docking begins
 # string start
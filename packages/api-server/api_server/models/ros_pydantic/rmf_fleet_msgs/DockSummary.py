@@ -18,5 +18,15 @@ class DockSummary(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "DockSummary":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            docks=[fields["docks"].type_.from_msg(x) for x in msg.docks],
+        )
+
 
 # Dock[] docks
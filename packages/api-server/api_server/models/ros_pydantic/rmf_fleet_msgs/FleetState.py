@@ -20,6 +20,17 @@ class FleetState(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "FleetState":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            name=msg.name,
+            robots=[fields["robots"].type_.from_msg(x) for x in msg.robots],
+        )
+
 
 # string name
 # RobotState[] robots
@@ -20,6 +20,17 @@ class LaneRequest(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "LaneRequest":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            fleet_name=msg.fleet_name,
+            open_lanes=msg.open_lanes.tolist(),
+            close_lanes=msg.close_lanes.tolist(),
+        )
+
 
 #
 # string fleet_name
@@ -18,6 +18,16 @@ class LiftClearance_Request(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "LiftClearance_Request":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            robot_name=msg.robot_name,
+            lift_name=msg.lift_name,
+        )
+
 
 #
 # # Name of the robot that wants to enter a lift
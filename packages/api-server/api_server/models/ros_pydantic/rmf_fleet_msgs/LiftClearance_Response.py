@@ -16,6 +16,15 @@ class LiftClearance_Response(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "LiftClearance_Response":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            decision=msg.decision,
+        )
+
 
 #
 #
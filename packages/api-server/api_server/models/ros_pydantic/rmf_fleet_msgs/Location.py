@@ -28,6 +28,21 @@ class Location(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "Location":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            t=fields["t"].type_.from_msg(msg.t),
+            x=msg.x,
+            y=msg.y,
+            yaw=msg.yaw,
+            level_name=msg.level_name,
+            index=msg.index,
+        )
+
 
 # builtin_interfaces/Time t
 # float32 x
@@ -27,6 +27,20 @@ class ModeRequest(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "ModeRequest":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            fleet_name=msg.fleet_name,
+            robot_name=msg.robot_name,
+            mode=fields["mode"].type_.from_msg(msg.mode),
+            task_id=msg.task_id,
+            parameters=[fields["parameters"].type_.from_msg(x) for x in msg.parameters],
+        )
+
 
 # string fleet_name
 # string robot_name
@@ -24,6 +24,19 @@ class PathRequest(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "PathRequest":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            fleet_name=msg.fleet_name,
+            robot_name=msg.robot_name,
+            path=[fields["path"].type_.from_msg(x) for x in msg.path],
+            task_id=msg.task_id,
+        )
+
 
 # string fleet_name
 # string robot_name
@@ -24,6 +24,19 @@ class PauseRequest(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "PauseRequest":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            fleet_name=msg.fleet_name,
+            robot_name=msg.robot_name,
+            mode_request_id=msg.mode_request_id,
+            type=msg.type,
+            at_checkpoint=msg.at_checkpoint,
+        )
+
 
 # string fleet_name
 # string robot_name
@@ -18,6 +18,16 @@ class RobotMode(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "RobotMode":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            mode=msg.mode,
+            mode_request_id=msg.mode_request_id,
+        )
+
 
 # uint32 mode
 # uint32 MODE_IDLE=0
@@ -33,6 +33,23 @@ class RobotState(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "RobotState":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            name=msg.name,
+            model=msg.model,
+            task_id=msg.task_id,
+            seq=msg.seq,
+            mode=fields["mode"].type_.from_msg(msg.mode),
+            battery_percent=msg.battery_percent,
+            location=fields["location"].type_.from_msg(msg.location),
+            path=[fields["path"].type_.from_msg(x) for x in msg.path],
+        )
+
 
 # string name
 # string model
@@ -20,6 +20,17 @@ class IngestorRequestItem(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "IngestorRequestItem":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            type_guid=msg.type_guid,
+            quantity=msg.quantity,
+            compartment_name=msg.compartment_name,
+        )
+
 
 # string type_guid
 # int32 quantity
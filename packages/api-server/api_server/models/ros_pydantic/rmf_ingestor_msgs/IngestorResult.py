@@ -24,6 +24,19 @@ class IngestorResult(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "IngestorResult":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            time=fields["time"].type_.from_msg(msg.time),
+            request_guid=msg.request_guid,
+            source_guid=msg.source_guid,
+            status=msg.status,
+        )
+
 
 # builtin_interfaces/Time time
 #
@@ -26,6 +26,20 @@ class IngestorState(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "IngestorState":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            time=fields["time"].type_.from_msg(msg.time),
+            guid=msg.guid,
+            mode=msg.mode,
+            request_guid_queue=list(msg.request_guid_queue),
+            seconds_remaining=msg.seconds_remaining,
+        )
+
 
 # builtin_interfaces/Time time
 #
@@ -28,6 +28,21 @@ class LiftRequest(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "LiftRequest":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            lift_name=msg.lift_name,
+            request_time=fields["request_time"].type_.from_msg(msg.request_time),
+            session_id=msg.session_id,
+            request_type=msg.request_type,
+            destination_floor=msg.destination_floor,
+            door_state=msg.door_state,
+        )
+
 
 # string lift_name
 # builtin_interfaces/Time request_time
@@ -36,6 +36,25 @@ class LiftState(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "LiftState":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            lift_time=fields["lift_time"].type_.from_msg(msg.lift_time),
+            lift_name=msg.lift_name,
+            available_floors=list(msg.available_floors),
+            current_floor=msg.current_floor,
+            destination_floor=msg.destination_floor,
+            door_state=msg.door_state,
+            motion_state=msg.motion_state,
+            available_modes=bytes(msg.available_modes),
+            current_mode=msg.current_mode,
+            session_id=msg.session_id,
+        )
+
 
 # # lift_time records when the information in this message was generated
 # builtin_interfaces/Time lift_time
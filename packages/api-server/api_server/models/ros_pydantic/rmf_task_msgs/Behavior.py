@@ -20,6 +20,17 @@ class Behavior(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "Behavior":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            name=msg.name,
+            parameters=[fields["parameters"].type_.from_msg(x) for x in msg.parameters],
+        )
+
 
 # string name
 # BehaviorParameter[] parameters
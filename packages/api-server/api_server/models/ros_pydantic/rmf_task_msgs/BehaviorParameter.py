@@ -18,6 +18,16 @@ class BehaviorParameter(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "BehaviorParameter":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            name=msg.name,
+            value=msg.value,
+        )
+
 
 # string name
 # string value
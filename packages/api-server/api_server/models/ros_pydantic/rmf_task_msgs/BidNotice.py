@@ -21,6 +21,17 @@ class BidNotice(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "BidNotice":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            task_profile=fields["task_profile"].type_.from_msg(msg.task_profile),
+            time_window=fields["time_window"].type_.from_msg(msg.time_window),
+        )
+
 
 # # This message is published by the Task Dispatcher node to notify all
 # # Fleet Adapters to participate in a bidding process for a new task.
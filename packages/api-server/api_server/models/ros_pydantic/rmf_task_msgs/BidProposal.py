@@ -29,6 +29,21 @@ class BidProposal(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "BidProposal":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            fleet_name=msg.fleet_name,
+            task_profile=fields["task_profile"].type_.from_msg(msg.task_profile),
+            prev_cost=msg.prev_cost,
+            new_cost=msg.new_cost,
+            finish_time=fields["finish_time"].type_.from_msg(msg.finish_time),
+            robot_name=msg.robot_name,
+        )
+
 
 # # This message is published by a Fleet Adapter in response to a BidNotice
 # # message.
@@ -18,6 +18,16 @@ class CancelTask_Request(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "CancelTask_Request":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            requester=msg.requester,
+            task_id=msg.task_id,
+        )
+
 
 # # Cancel Task | "Delete" service call
 #
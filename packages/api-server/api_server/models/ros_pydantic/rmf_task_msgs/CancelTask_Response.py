@@ -18,6 +18,16 @@ class CancelTask_Response(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "CancelTask_Response":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            success=msg.success,
+            message=msg.message,
+        )
+
 
 #
 #
@@ -16,6 +16,15 @@ class Clean(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "Clean":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            start_waypoint=msg.start_waypoint,
+        )
+
 
 # # The name of the waypoint where the robot should begin its pre-configured
 # # cleaning job.
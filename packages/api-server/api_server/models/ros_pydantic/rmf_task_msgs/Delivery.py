@@ -33,6 +33,27 @@ class Delivery(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "Delivery":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            task_id=msg.task_id,
+            items=[fields["items"].type_.from_msg(x) for x in msg.items],
+            pickup_place_name=msg.pickup_place_name,
+            pickup_dispenser=msg.pickup_dispenser,
+            pickup_behavior=fields["pickup_behavior"].type_.from_msg(
+                msg.pickup_behavior
+            ),
+            dropoff_place_name=msg.dropoff_place_name,
+            dropoff_ingestor=msg.dropoff_ingestor,
+            dropoff_behavior=fields["dropoff_behavior"].type_.from_msg(
+                msg.dropoff_behavior
+            ),
+        )
+
 
 # # task_id is intended to be a pseudo-random string generated
 # # by the caller which can be used to identify this task as it
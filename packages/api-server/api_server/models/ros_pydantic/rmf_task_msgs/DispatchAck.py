@@ -22,6 +22,19 @@ class DispatchAck(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "DispatchAck":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            dispatch_request=fields["dispatch_request"].type_.from_msg(
+                msg.dispatch_request
+            ),
+            success=msg.success,
+        )
+
 
 # # This message is published by the fleet adapter in response to a
 # # DispatchRequest message. It indicates whether the requested task addition or
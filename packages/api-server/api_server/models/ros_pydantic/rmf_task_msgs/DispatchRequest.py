@@ -22,6 +22,18 @@ class DispatchRequest(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "DispatchRequest":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            fleet_name=msg.fleet_name,
+            task_profile=fields["task_profile"].type_.from_msg(msg.task_profile),
+            method=msg.method,
+        )
+
 
 # # This message is published by Task Dispatcher Node to either award or cancel a
 # # task for a Fleet Adapter
@@ -18,6 +18,16 @@ class GetTaskList_Request(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "GetTaskList_Request":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            requester=msg.requester,
+            task_id=list(msg.task_id),
+        )
+
 
 # # Query list of submitted tasks | Get service call
 #
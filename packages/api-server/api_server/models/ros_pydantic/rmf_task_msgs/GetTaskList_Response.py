@@ -22,6 +22,23 @@ class GetTaskList_Response(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "GetTaskList_Response":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            success=msg.success,
+            active_tasks=[
+                fields["active_tasks"].type_.from_msg(x) for x in msg.active_tasks
+            ],
+            terminated_tasks=[
+                fields["terminated_tasks"].type_.from_msg(x)
+                for x in msg.terminated_tasks
+            ],
+        )
+
 
 #
 #
@@ -24,6 +24,19 @@ class Loop(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "Loop":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            task_id=msg.task_id,
+            robot_type=msg.robot_type,
+            num_loops=msg.num_loops,
+            start_name=msg.start_name,
+            finish_name=msg.finish_name,
+        )
+
 
 # # task_id is intended to be a pseudo-random string generated
 # # by the caller which can be used to identify this task as it
@@ -16,5 +16,14 @@ class Priority(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "Priority":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            value=msg.value,
+        )
+
 
 # uint64 value 0
@@ -18,6 +18,16 @@ class ReviveTask_Request(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "ReviveTask_Request":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            requester=msg.requester,
+            task_id=msg.task_id,
+        )
+
 
 # # Revive a previously cancelled or failed task. This will reinitiate
 # # a bidding sequence to reassign this task.
@@ -16,6 +16,15 @@ class ReviveTask_Response(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "ReviveTask_Response":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            success=msg.success,
+        )
+
 
 #
 #
@@ -20,6 +20,17 @@ class Station(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "Station":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            task_id=msg.task_id,
+            robot_type=msg.robot_type,
+            place_name=msg.place_name,
+        )
+
 
 # # task_id is intended to be a pseudo-random string generated
 # # by the caller which can be used to identify this task as it
@@ -20,6 +20,17 @@ class SubmitTask_Request(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "SubmitTask_Request":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            requester=msg.requester,
+            description=fields["description"].type_.from_msg(msg.description),
+        )
+
 
 # # Submit Task | POST service call
 #
@@ -20,6 +20,17 @@ class SubmitTask_Response(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "SubmitTask_Response":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            success=msg.success,
+            task_id=msg.task_id,
+            message=msg.message,
+        )
+
 
 #
 #
@@ -36,6 +36,22 @@ class TaskDescription(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "TaskDescription":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            start_time=fields["start_time"].type_.from_msg(msg.start_time),
+            priority=fields["priority"].type_.from_msg(msg.priority),
+            task_type=fields["task_type"].type_.from_msg(msg.task_type),
+            station=fields["station"].type_.from_msg(msg.station),
+            loop=fields["loop"].type_.from_msg(msg.loop),
+            delivery=fields["delivery"].type_.from_msg(msg.delivery),
+            clean=fields["clean"].type_.from_msg(msg.clean),
+        )
+
 
 # # Desired start time of a task
 # builtin_interfaces/Time start_time
@@ -23,6 +23,20 @@ class TaskProfile(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "TaskProfile":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            task_id=msg.task_id,
+            submission_time=fields["submission_time"].type_.from_msg(
+                msg.submission_time
+            ),
+            description=fields["description"].type_.from_msg(msg.description),
+        )
+
 
 # # Unique ID assigned to this task
 # string task_id
@@ -35,6 +35,26 @@ class TaskSummary(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "TaskSummary":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            fleet_name=msg.fleet_name,
+            task_id=msg.task_id,
+            task_profile=fields["task_profile"].type_.from_msg(msg.task_profile),
+            state=msg.state,
+            status=msg.status,
+            submission_time=fields["submission_time"].type_.from_msg(
+                msg.submission_time
+            ),
+            start_time=fields["start_time"].type_.from_msg(msg.start_time),
+            end_time=fields["end_time"].type_.from_msg(msg.end_time),
+            robot_name=msg.robot_name,
+        )
+
 
 # # Publish by Fleet Adapter (aka DispatchStatus)
 #
@@ -16,6 +16,15 @@ class TaskType(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "TaskType":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            type=msg.type,
+        )
+
 
 # uint32 type
 # uint32 TYPE_STATION=0
@@ -18,5 +18,15 @@ class Tasks(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "Tasks":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        fields = cls.__fields__
+        return cls.construct(
+            tasks=[fields["tasks"].type_.from_msg(x) for x in msg.tasks],
+        )
+
 
 # TaskSummary[] tasks
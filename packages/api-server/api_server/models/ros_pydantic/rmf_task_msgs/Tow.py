@@ -28,6 +28,21 @@ class Tow(pydantic.BaseModel):
             ],
         }
 
+    @classmethod
+    def from_msg(cls, msg) -> "Tow":
+        """
+        Converts a ros message without validation, the message is trusted to be valid.
+        """
+        return cls.construct(
+            task_id=msg.task_id,
+            object_type=msg.object_type,
+            is_object_id_known=msg.is_object_id_known,
+            object_id=msg.object_id,
+            pickup_place_name=msg.pickup_place_name,
+            is_dropoff_place_known=msg.is_dropoff_place_known,
+            dropoff_place_name=msg.dropoff_place_name,
+        )
+
 
 # # task_id is intended to be a pseudo-random string generated
 # # by the caller which can be used to identify this task as it
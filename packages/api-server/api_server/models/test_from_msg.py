@@ -0,0 +1,69 @@
+import unittest
+
+from rmf_building_map_msgs.msg import AffineImage as RmfAffineImage
+from rmf_building_map_msgs.msg import BuildingMap as RmfBuildingMap
+from rmf_building_map_msgs.msg import Level as RmfLevel
+from rmf_fleet_msgs.msg import FleetState as RmfFleetState
+from rmf_fleet_msgs.msg import Location as RmfLocation
+from rmf_fleet_msgs.msg import RobotMode as RmfRobotMode
+from rmf_fleet_msgs.msg import RobotState as RmfRobotState
+from rmf_lift_msgs.msg import LiftState as RmfLiftState
+from rosidl_runtime_py.convert import message_to_ordereddict
+
+from .building_map import AffineImage, BuildingMap, Level
+from .fleets import FleetState, RobotState
+from .lifts import LiftState
+
+
+class TestFromMsg(unittest.TestCase):
+    def test_fleet_state(self):
+        msg = RmfFleetState(
+            name="test_fleet",
+            robots=[
+                RmfRobotState(
+                    name="test_robot",
+                    seq=1,
+                    mode=RmfRobotMode(mode=RmfRobotMode.MODE_MOVING),
+                    battery_percent=50.0,
+                    location=RmfLocation(x=1.0, y=2.0, level_name="L1"),
+                    path=[RmfLocation(x=float(i), index=i) for i in range(10)],
+                )
+            ],
+        )
+        converted = FleetState.from_msg(msg)
+        expected = FleetState(**message_to_ordereddict(msg))
+        self.assertEqual(converted.dict(), expected.dict())
+        self.assertEqual(converted.json(), expected.json())
+        # nested values are the api models declared on the fields
+        self.assertIs(type(converted.robots[0]), RobotState)
+
+    def test_building_map(self):
+        msg = RmfBuildingMap(
+            name="test_map",
+            levels=[
+                RmfLevel(
+                    name="L1",
+                    images=[
+                        RmfAffineImage(name="test_image", encoding="png", data=b"")
+                    ],
+                )
+            ],
+        )
+        converted = BuildingMap.from_msg(msg)
+        self.assertIs(type(converted.levels[0]), Level)
+        self.assertIs(type(converted.levels[0].images[0]), AffineImage)
+
+    def test_lift_state(self):
+        msg = RmfLiftState(
+            lift_name="test_lift",
+            available_floors=["L1", "L2"],
+            current_floor="L1",
+            available_modes=[RmfLiftState.MODE_HUMAN, RmfLiftState.MODE_AGV],
+        )
+        converted = LiftState.from_msg(msg)
+        expected = LiftState(**message_to_ordereddict(msg))
+        self.assertEqual(converted.dict(), expected.dict())
+        self.assertEqual(
+            converted.available_modes,
+            [RmfLiftState.MODE_HUMAN, RmfLiftState.MODE_AGV],
+        )
@@ -14,4 +14,5 @@ from .health import (
 from .ingestor_state import IngestorState
 from .lift_state import LiftState
 from .task_summary import TaskSummary
+from .upsert import bulk_upsert
 from .user import *
@@ -0,0 +1,94 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+from tortoise import Tortoise
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.models import Model
+
+# max number of bound parameters in one statement
+_MAX_PARAMS = {
+    "sqlite": 999,
+    "postgres": 32767,
+}
+
+
+def _quote(name: str) -> str:
+    return f'"{name}"'
+
+
+def _column(model: Type[Model], field_name: str) -> str:
+    field = model._meta.fields_map[field_name]  # pylint: disable=protected-access
+    return field.source_field or field_name
+
+
+def _upsert_sql(
+    dialect: str,
+    table: str,
+    columns: List[str],
+    conflict_columns: List[str],
+    num_rows: int,
+) -> str:
+    if dialect == "postgres":
+        placeholders = [f"${i + 1}" for i in range(num_rows * len(columns))]
+    else:
+        placeholders = ["?"] * (num_rows * len(columns))
+    values = ",".join(
+        f"({','.join(placeholders[i : i + len(columns)])})"
+        for i in range(0, len(placeholders), len(columns))
+    )
+    update_columns = [c for c in columns if c not in conflict_columns]
+    if update_columns:
+        action = "DO UPDATE SET " + ",".join(
+            f"{_quote(c)}=excluded.{_quote(c)}" for c in update_columns
+        )
+    else:
+        action = "DO NOTHING"
+    return (
+        f"INSERT INTO {_quote(table)} ({','.join(map(_quote, columns))}) "
+        f"VALUES {values} ON CONFLICT ({','.join(map(_quote, conflict_columns))}) "
+        f"{action}"
+    )
+
+
+async def bulk_upsert(
+    model: Type[Model],
+    rows: Sequence[Dict[str, Any]],
+    conflict_fields: Sequence[str] = ("id_",),
+    *,
+    using_db: Optional[BaseDBAsyncClient] = None,
+) -> None:
+    """
+    Inserts or updates many rows in one statement with `INSERT ... ON CONFLICT DO UPDATE`
+    on sqlite and postgres, other databases fall back to one `update_or_create` per row.
+    Columns that are not in a row are not updated.
+
+    :param rows: Dicts of field name to value, all rows must have the same fields. When
+        there are many rows with the same `conflict_fields`, the last one is used.
+    :param conflict_fields: Fields with a unique constraint that identify a row.
+    """
+    if not rows:
+        return
+    deduped: Dict[Tuple, Dict[str, Any]] = {
+        tuple(row[f] for f in conflict_fields): row for row in rows
+    }
+    conn = using_db or Tortoise.get_connection("default")
+    dialect = conn.capabilities.dialect
+    if dialect not in _MAX_PARAMS:
+        for row in deduped.values():
+            keys = {f: row[f] for f in conflict_fields}
+            defaults = {k: v for k, v in row.items() if k not in conflict_fields}
+            await model.update_or_create(defaults, using_db=conn, **keys)
+        return
+
+    meta = model._meta  # pylint: disable=protected-access
+    fields = list(next(iter(deduped.values())))
+    columns = [_column(model, f) for f in fields]
+    conflict_columns = [_column(model, f) for f in conflict_fields]
+    chunk_size = max(_MAX_PARAMS[dialect] // len(columns), 1)
+    values = [
+        [meta.fields_map[f].to_db_value(row[f], None) for f in fields]
+        for row in deduped.values()
+    ]
+    for i in range(0, len(values), chunk_size):
+        chunk = values[i : i + chunk_size]
+        sql = _upsert_sql(dialect, meta.db_table, columns, conflict_columns, len(chunk))
+        await conn.execute_query(sql, [v for row in chunk for v in row])
@@ -0,0 +1,115 @@
+import argparse
+import logging
+import time
+from typing import Optional
+
+import uvicorn
+
+from .models import TaskSummary
+from .repositories import StaticFilesRepository
+from .rmf_io import RmfEvents
+from .rmf_io.recorder import read_recording
+from .stand_in_gateway import StandInGateway
+
+
+class ReplayGateway(StandInGateway):
+    """
+    Stand-in for `RmfGateway` that replays a recording made by `RmfRecorder` instead of
+    connecting to RMF. Requests to RMF are ignored.
+
+    Note that images in the building map are not recorded, their urls point to the static
+    files of the server that made the recording.
+
+    .. code-block::
+        app = App(
+            rmf_gateway_fc=lambda rmf_events, static_files: ReplayGateway(
+                rmf_events, static_files, "recording.jsonl.gz", speed=10
+            )
+        )
+    """
+
+    def __init__(
+        self,
+        rmf_events: RmfEvents,
+        static_files: StaticFilesRepository,
+        recording: str,
+        *,
+        speed: Optional[float] = 1,
+        repeat: bool = False,
+        logger: logging.Logger = None,
+    ):
+        """
+        :param speed: Replay speed relative to the recording, `None` or 0 replays as fast
+            as possible.
+        :param repeat: Restarts from the beginning when the recording ends.
+        """
+        super().__init__(rmf_events, static_files, logger=logger)
+        self.recording = recording
+        self.speed = speed
+        self.repeat = repeat
+        self.replayed = 0
+
+    def _run(self):
+        self.logger.info(f'replaying "{self.recording}" at {self.speed or "max"} speed')
+        while True:
+            start = time.perf_counter()
+            first_timestamp = None
+            for timestamp, topic, model in read_recording(self.recording):
+                if self._stop.is_set():
+                    return
+                if first_timestamp is None:
+                    first_timestamp = timestamp
+                if self.speed:
+                    delay = (timestamp - first_timestamp) / self.speed - (
+                        time.perf_counter() - start
+                    )
+                    if delay > 0 and self._stop.wait(delay):
+                        return
+                if isinstance(model, TaskSummary):
+                    self._tasks[model.task_id] = model
+                getattr(self.rmf_events, topic).on_next(model)
+                self.replayed += 1
+            self.logger.info(f"replayed {self.replayed} events")
+            if not self.repeat:
+                return
+
+
+def main():
+    # pylint: disable=import-outside-toplevel
+    from .app import App
+
+    parser = argparse.ArgumentParser(
+        description="runs the api server with events replayed from a recording"
+    )
+    parser.add_argument("recording", help="file recorded with the record_path option")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1,
+        help="replay speed relative to the recording, 0 replays as fast as possible",
+    )
+    parser.add_argument(
+        "--repeat", action="store_true", help="restart when the recording ends"
+    )
+    args = parser.parse_args()
+
+    app = App(
+        rmf_gateway_fc=lambda rmf_events, static_files: ReplayGateway(
+            rmf_events,
+            static_files,
+            args.recording,
+            speed=args.speed,
+            repeat=args.repeat,
+        )
+    )
+    uvicorn.run(
+        app,
+        host=app.app_config.host,
+        port=app.app_config.port,
+        root_path=app.app_config.public_url.path,
+        log_level=app.app_config.log_level.lower(),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,15 @@
 from datetime import datetime
-from typing import Dict, List, Optional, cast
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    TypeVar,
+    cast,
+)
 
 from fastapi.exceptions import HTTPException
 from tortoise.queryset import MODEL, QuerySet
@@ -29,11 +39,30 @@ from api_server.models import (
 from api_server.models import tortoise_models as ttm
 from api_server.models.fleets import Fleet, Robot
 from api_server.permissions import Enforcer, RmfAction
+from api_server.rmf_io import RmfStateStore, topics
+from api_server.single_flight import SingleFlight
+
+T = TypeVar("T")
 
 
 class RmfRepository:
-    def __init__(self, user: User):
+    def __init__(
+        self,
+        user: User,
+        state_store: Optional[RmfStateStore] = None,
+        snapshot_reads: Optional[SingleFlight] = None,
+    ):
+        """
+        :param state_store: When given, the latest states and health are read from it,
+            falling back to the database for the entities that it does not have.
+        :param snapshot_reads: When given, the database reads go through it, it should
+            be shared by all the repositories used for the snapshots that are sent on
+            subscribe. Rest handlers should not use it, as it may return results that
+            are up to `ttl` seconds old.
+        """
         self.user = user
+        self.state_store = state_store
+        self.snapshot_reads = snapshot_reads
 
     @staticmethod
     def _build_filter_params(**queries: dict):
@@ -68,83 +97,179 @@ class RmfRepository:
             query = query.order_by(*order_fields)
         return query
 
+    @staticmethod
+    def _paginate_in_memory(
+        items: List[T],
+        pagination: Pagination,
+        sort_keys: Dict[str, Callable[[T], Any]],
+    ) -> List[T]:
+        """
+        Like `_add_pagination` for items that are already in memory. Items are ordered by
+        the first sort key by default.
+
+        :param sort_keys: The fields that can be ordered by.
+        """
+        order_by = pagination.order_by or next(iter(sort_keys))
+        # sort by the last field first so that the first field takes precedence
+        for v in reversed(order_by.split(",")):
+            reverse = v[0] == "-"
+            field = v[1:] if v[0] in ["-", "+"] else v
+            if field not in sort_keys:
+                raise HTTPException(422, f"cannot order by {field}")
+            items = sorted(items, key=sort_keys[field], reverse=reverse)
+        return items[pagination.offset : pagination.offset + pagination.limit]
+
+    async def _load(self, key: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+        if self.snapshot_reads is None:
+            return await load()
+        return await self.snapshot_reads.get(key, load)
+
+    async def _read_through(
+        self, topic: str, key: str, load: Callable[[], Awaitable[Optional[T]]]
+    ) -> Optional[T]:
+        if self.state_store is not None:
+            value = self.state_store.get(topic, key)
+            if value is not None:
+                return value
+        value = await self._load((topic, key), load)
+        if value is not None and self.state_store is not None:
+            value = self.state_store.put_if_absent(topic, value)
+        return value
+
     async def get_bulding_map(self) -> Optional[BuildingMap]:
-        building_map = await ttm.BuildingMap.first()
-        if building_map is None:
-            return None
-        return BuildingMap(**building_map.data)
+        if self.state_store is not None:
+            indexed = await self.state_store.building_map.get()
+            return None if indexed is None else indexed.building_map
+
+        async def load():
+            building_map = await ttm.BuildingMap.first()
+            if building_map is None:
+                return None
+            return BuildingMap(**building_map.data)
+
+        return await self._load(topics.building_map, load)
 
     async def get_doors(self) -> List[Door]:
+        if self.state_store is not None:
+            indexed = await self.state_store.building_map.get()
+            return [] if indexed is None else indexed.doors
         building_map = await self.get_bulding_map()
         if building_map is None:
             return []
         return [door for level in building_map.levels for door in level.doors]
 
     async def get_door_state(self, door_name: str) -> Optional[DoorState]:
-        door_state = await ttm.DoorState.get_or_none(id_=door_name)
-        if door_state is None:
-            return None
-        return DoorState(**door_state.data)
+        async def load():
+            door_state = await ttm.DoorState.get_or_none(id_=door_name)
+            if door_state is None:
+                return None
+            return DoorState(**door_state.data)
+
+        return await self._read_through(topics.door_states, door_name, load)
 
     async def get_door_health(self, door_name: str) -> Optional[DoorHealth]:
-        door_health = await ttm.DoorHealth.get_or_none(id_=door_name)
-        if door_health is None:
-            return None
-        return await DoorHealth.from_tortoise(door_health)
+        async def load():
+            door_health = await ttm.DoorHealth.get_or_none(id_=door_name)
+            if door_health is None:
+                return None
+            return await DoorHealth.from_tortoise(door_health)
+
+        return await self._read_through(topics.door_health, door_name, load)
 
     async def get_lifts(self) -> List[Lift]:
+        if self.state_store is not None:
+            indexed = await self.state_store.building_map.get()
+            return [] if indexed is None else indexed.lifts
         building_map = await self.get_bulding_map()
         if building_map is None:
             return []
         return building_map.lifts
 
     async def get_lift_state(self, lift_name: str) -> Optional[LiftState]:
-        lift_state = await ttm.LiftState.get_or_none(id_=lift_name)
-        if lift_state is None:
-            return None
-        return LiftState(**lift_state.data)
+        async def load():
+            lift_state = await ttm.LiftState.get_or_none(id_=lift_name)
+            if lift_state is None:
+                return None
+            return LiftState(**lift_state.data)
+
+        return await self._read_through(topics.lift_states, lift_name, load)
 
     async def get_lift_health(self, lift_name: str) -> Optional[LiftHealth]:
-        lift_health = await ttm.LiftHealth.get_or_none(id_=lift_name)
-        if lift_health is None:
-            return None
-        return await LiftHealth.from_tortoise(lift_health)
+        async def load():
+            lift_health = await ttm.LiftHealth.get_or_none(id_=lift_name)
+            if lift_health is None:
+                return None
+            return await LiftHealth.from_tortoise(lift_health)
+
+        return await self._read_through(topics.lift_health, lift_name, load)
 
     async def get_dispensers(self) -> List[Dispenser]:
+        if self.state_store is not None:
+            return [
+                Dispenser(guid=guid)
+                for guid in self.state_store.keys(topics.dispenser_states)
+            ]
         states = await ttm.DispenserState.all()
         return [Dispenser(guid=state.data["guid"]) for state in states]
 
     async def get_dispenser_state(self, guid: str) -> Optional[DispenserState]:
-        dispenser_state = await ttm.DispenserState.get_or_none(id_=guid)
-        if dispenser_state is None:
-            return None
-        return DispenserState(**dispenser_state.data)
+        async def load():
+            dispenser_state = await ttm.DispenserState.get_or_none(id_=guid)
+            if dispenser_state is None:
+                return None
+            return DispenserState(**dispenser_state.data)
+
+        return await self._read_through(topics.dispenser_states, guid, load)
 
     async def get_dispenser_health(self, guid: str) -> Optional[DispenserHealth]:
-        dispenser_health = await ttm.DispenserHealth.get_or_none(id_=guid)
-        if dispenser_health is None:
-            return None
-        return await DispenserHealth.from_tortoise(dispenser_health)
+        async def load():
+            dispenser_health = await ttm.DispenserHealth.get_or_none(id_=guid)
+            if dispenser_health is None:
+                return None
+            return await DispenserHealth.from_tortoise(dispenser_health)
+
+        return await self._read_through(topics.dispenser_health, guid, load)
 
     async def get_ingestors(self) -> List[Ingestor]:
+        if self.state_store is not None:
+            return [
+                Ingestor(guid=guid)
+                for guid in self.state_store.keys(topics.ingestor_states)
+            ]
         states = await ttm.IngestorState.all()
         return [Ingestor(guid=state.data["guid"]) for state in states]
 
     async def get_ingestor_state(self, guid: str) -> Optional[IngestorState]:
-        ingestor_state = await ttm.IngestorState.get_or_none(id_=guid)
-        if ingestor_state is None:
-            return None
-        return IngestorState(**ingestor_state.data)
+        async def load():
+            ingestor_state = await ttm.IngestorState.get_or_none(id_=guid)
+            if ingestor_state is None:
+                return None
+            return IngestorState(**ingestor_state.data)
+
+        return await self._read_through(topics.ingestor_states, guid, load)
 
     async def get_ingestor_health(self, guid: str) -> Optional[IngestorHealth]:
-        ingestor_health = await ttm.IngestorHealth.get_or_none(id_=guid)
-        if ingestor_health is None:
-            return None
-        return await IngestorHealth.from_tortoise(ingestor_health)
+        async def load():
+            ingestor_health = await ttm.IngestorHealth.get_or_none(id_=guid)
+            if ingestor_health is None:
+                return None
+            return await IngestorHealth.from_tortoise(ingestor_health)
+
+        return await self._read_through(topics.ingestor_health, guid, load)
 
     async def query_fleets(
         self, pagination: Pagination, *, fleet_name: Optional[str] = None
     ) -> List[Fleet]:
+        if self.state_store is not None:
+            states = self.state_store.values(topics.fleet_states)
+            if fleet_name is not None:
+                fleet_names = set(fleet_name.split(","))
+                states = [s for s in states if s.name in fleet_names]
+            states = self._paginate_in_memory(
+                states, pagination, {"fleet_name": lambda s: s.name}
+            )
+            return [Fleet(name=s.name, state=s) for s in states]
+
         filter_params = {}
         if fleet_name is not None:
             filter_params["id___in"] = fleet_name.split(",")
@@ -154,10 +279,13 @@ class RmfRepository:
         return [Fleet(name=s.id_, state=FleetState.from_tortoise(s)) for s in states]
 
     async def get_fleet_state(self, fleet_name: str) -> Optional[FleetState]:
-        fleet_state = await ttm.FleetState.get_or_none(id_=fleet_name)
-        if fleet_state is None:
-            return None
-        return FleetState(**fleet_state.data)
+        async def load():
+            fleet_state = await ttm.FleetState.get_or_none(id_=fleet_name)
+            if fleet_state is None:
+                return None
+            return FleetState(**fleet_state.data)
+
+        return await self._read_through(topics.fleet_states, fleet_name, load)
 
     async def query_robots(
         self,
@@ -183,23 +311,32 @@ class RmfRepository:
     async def get_robot_health(
         self, fleet_name: str, robot_name: str
     ) -> Optional[RobotHealth]:
-        robot_health = await ttm.RobotHealth.get_or_none(
-            id_=f"{fleet_name}/{robot_name}"
-        )
-        if robot_health is None:
-            return None
-        return await RobotHealth.from_tortoise(robot_health)
+        robot_id = f"{fleet_name}/{robot_name}"
+
+        async def load():
+            robot_health = await ttm.RobotHealth.get_or_none(id_=robot_id)
+            if robot_health is None:
+                return None
+            return await RobotHealth.from_tortoise(robot_health)
+
+        return await self._read_through(topics.robot_health, robot_id, load)
 
     async def get_task_summary(self, task_id: str) -> TaskSummary:
         # FIXME: This would fail if task_id contains "_/"
         task_id = task_id.replace("__", "/")
-        ts = await Enforcer.query(
-            self.user, ttm.TaskSummary.all(), RmfAction.TaskRead
-        ).get_or_none(id_=task_id)
 
+        async def load():
+            ts = await Enforcer.query(
+                self.user, ttm.TaskSummary.all(), RmfAction.TaskRead
+            ).get_or_none(id_=task_id)
+            return None if ts is None else TaskSummary.from_tortoise(ts)
+
+        # users with the same roles can read the same tasks
+        roles = "*" if self.user.is_admin else ",".join(sorted(self.user.roles))
+        ts = await self._load((topics.task_summaries, roles, task_id), load)
         if ts is None:
             raise HTTPException(404)
-        return TaskSummary.from_tortoise(ts)
+        return ts
 
     async def query_task_summaries(
         self,
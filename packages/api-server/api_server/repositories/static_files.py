@@ -1,5 +1,6 @@
 import logging
 import os
+from uuid import uuid4
 
 
 class StaticFilesRepository:
@@ -19,18 +20,33 @@ class StaticFilesRepository:
         self.directory = directory
         self.logger = logger or logging.getLogger(self.__class__.__name__)
 
-    def add_file(self, data: bytes, path: str) -> str:
+    def add_file(self, data: bytes, path: str, *, skip_existing: bool = False) -> str:
         """
+        The file is written to a temporary file first and then renamed, so a partially
+        written file is never served.
+
         Parameters:
             data:
             path: relative path to save the file to
+            skip_existing: do not write the file if it already exists, use this when the
+                path is derived from the contents of the file.
         Returns:
             the url path of the new file
         """
         filepath = f"{self.directory}/{path}"
+        urlpath = f"{self.base_url}/{path}"
+        if skip_existing and os.path.exists(filepath):
+            self.logger.info(f'file "{filepath}" already exists')
+            return urlpath
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        with open(filepath, "bw") as f:
-            f.write(data)
+        tmppath = f"{filepath}.{uuid4().hex}.tmp"
+        try:
+            with open(tmppath, "bw") as f:
+                f.write(data)
+            os.replace(tmppath, filepath)
+        except BaseException:
+            if os.path.exists(tmppath):
+                os.remove(tmppath)
+            raise
         self.logger.info(f'saved new file "{filepath}"')
-        urlpath = f"{self.base_url}/{path}"
         return urlpath
@@ -0,0 +1,95 @@
+import asyncio
+import unittest
+
+from fastapi import HTTPException
+from tortoise import Tortoise
+
+from api_server.models import User
+from api_server.models import tortoise_models as ttm
+from api_server.rmf_io import RmfEvents, RmfStateStore
+from api_server.single_flight import SingleFlight
+from api_server.test import init_db, test_data
+
+from .rmf import RmfRepository
+
+
+class TestRmfRepository_StateStore(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await init_db()
+        self.rmf = RmfEvents()
+        self.store = RmfStateStore(self.rmf)
+        self.store.start()
+        self.repo = RmfRepository(User(username="test_user"), self.store)
+
+    async def asyncTearDown(self):
+        self.store.stop()
+        await Tortoise.close_connections()
+
+    async def test_reads_from_store(self):
+        self.rmf.door_states.on_next(test_data.make_door_state("test_door"))
+        door_state = await self.repo.get_door_state("test_door")
+        self.assertIsNotNone(door_state)
+        # not in the database
+        self.assertIsNone(await ttm.DoorState.get_or_none(id_="test_door"))
+
+    async def test_read_through(self):
+        await test_data.make_lift_state("test_lift").save()
+        lift_state = await self.repo.get_lift_state("test_lift")
+        self.assertIsNotNone(lift_state)
+        await ttm.LiftState.all().delete()
+        self.assertIs(await self.repo.get_lift_state("test_lift"), lift_state)
+        self.assertIsNone(await self.repo.get_lift_state("unknown_lift"))
+
+    async def test_list_dispensers(self):
+        self.rmf.dispenser_states.on_next(test_data.make_dispenser_state("test"))
+        dispensers = await self.repo.get_dispensers()
+        self.assertEqual([d.guid for d in dispensers], ["test"])
+
+
+class TestRmfRepository_SnapshotReads(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await init_db()
+        self.snapshot_reads = SingleFlight(ttl=60)
+        self.repo = RmfRepository(
+            User(username="test_user"), snapshot_reads=self.snapshot_reads
+        )
+
+    async def asyncTearDown(self):
+        await Tortoise.close_connections()
+
+    async def test_concurrent_reads_share_one_query(self):
+        await test_data.make_door_state("test_door").save()
+        states = await asyncio.gather(
+            *(self.repo.get_door_state("test_door") for _ in range(10))
+        )
+        self.assertEqual(self.snapshot_reads.stats.loads, 1)
+        for state in states:
+            self.assertIs(state, states[0])
+
+        # the result is kept until it expires
+        await ttm.DoorState.all().delete()
+        self.assertIs(await self.repo.get_door_state("test_door"), states[0])
+        self.assertEqual(self.snapshot_reads.stats.hits, 1)
+
+    async def test_missing_state_is_not_kept(self):
+        self.assertIsNone(await self.repo.get_door_state("test_door"))
+        await test_data.make_door_state("test_door").save()
+        self.assertIsNotNone(await self.repo.get_door_state("test_door"))
+        self.assertEqual(self.snapshot_reads.stats.loads, 2)
+
+    async def test_task_summaries_are_shared_by_role(self):
+        await test_data.make_task_summary("test_task").save()
+        admin_repo = RmfRepository(
+            User(username="admin", is_admin=True), snapshot_reads=self.snapshot_reads
+        )
+        await admin_repo.get_task_summary("test_task")
+        # another admin reuses the result
+        other_admin_repo = RmfRepository(
+            User(username="admin2", is_admin=True), snapshot_reads=self.snapshot_reads
+        )
+        await other_admin_repo.get_task_summary("test_task")
+        self.assertEqual(self.snapshot_reads.stats.loads, 1)
+        # a user without roles cannot read the task
+        with self.assertRaises(HTTPException):
+            await self.repo.get_task_summary("test_task")
+        self.assertEqual(self.snapshot_reads.stats.loads, 2)
@@ -1,3 +1,4 @@
+import os
 import os.path
 import unittest
 from os.path import dirname
@@ -21,3 +22,20 @@ class TestStaticFilesRepository(unittest.TestCase):
         self.assertTrue(os.path.exists(saved_path))
         with open(saved_path, "br") as f:
             self.assertEqual(b"hello", f.read())
+
+    def test_add_file_does_not_leave_temp_files(self):
+        target_path = "TestStaticFilesRepository/test_no_temp_files/test.txt"
+        self.repo.add_file(b"hello", target_path)
+        self.repo.add_file(b"world", target_path)
+        saved_dir = os.path.dirname(f"{self.artifact_dir}/{target_path}")
+        self.assertEqual(os.listdir(saved_dir), ["test.txt"])
+        with open(f"{self.artifact_dir}/{target_path}", "br") as f:
+            self.assertEqual(b"world", f.read())
+
+    def test_add_file_skip_existing(self):
+        target_path = "TestStaticFilesRepository/test_add_file_skip_existing.txt"
+        self.repo.add_file(b"hello", target_path)
+        url_path = self.repo.add_file(b"world", target_path, skip_existing=True)
+        self.assertEqual(url_path, f"/static/{target_path}")
+        with open(f"{self.artifact_dir}/{target_path}", "br") as f:
+            self.assertEqual(b"hello", f.read())
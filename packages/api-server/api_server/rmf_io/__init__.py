@@ -1,4 +1,9 @@
 from .book_keeper import RmfBookKeeper, RmfBookKeeperEvents
+from .building_map_cache import BuildingMapCache, IndexedBuildingMap
+from .bus import RmfBusPublisher, RmfBusSubscriber
 from .events import RmfEvents
 from .health_watchdog import HealthWatchdog
+from .ingest import RmfIngest
+from .recorder import RmfRecorder, read_recording
+from .state_store import RmfStateStore
 from .topics import topics
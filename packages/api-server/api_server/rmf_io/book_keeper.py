@@ -1,32 +1,62 @@
-import asyncio
 import json
 import logging
+import time
 from collections import namedtuple
-from typing import Coroutine, List
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    cast,
+)
 
 import tortoise.transactions
 from rx.core.typing import Disposable
 from rx.subject.subject import Subject
+from tortoise.models import Model
 
-from api_server.models import (
-    BuildingMap,
-    DispenserHealth,
-    DispenserState,
-    DoorHealth,
-    DoorState,
-    FleetState,
-    HealthStatus,
-    IngestorHealth,
-    IngestorState,
-    LiftHealth,
-    LiftState,
-    RobotHealth,
-    TaskSummary,
-)
+from api_server.logger import JsonMessage
+from api_server.models import BuildingMap, FleetState, HealthStatus, TaskSummary
 from api_server.models import tortoise_models as ttm
 from api_server.models.health import BaseBasicHealth
 
 from .events import RmfEvents
+from .topics import topics
+from .write_behind import WriteBehind
+from .write_queue import WriteQueue
+
+# (tortoise model, row, conflict fields)
+_Row = Tuple[Type[Model], Dict[str, Any], Sequence[str]]
+_PK = ("id_",)
+
+
+@dataclass
+class PersistStats:
+    written: int = 0
+    # unchanged states that are not written
+    skipped: int = 0
+
+
+class LogPolicy:
+    """
+    How often the states of a topic are logged:
+        * "every": every state is logged.
+        * "on_change": a state is logged when it is different from the last state logged
+          for the entity, ignoring the same fields as `skip_unchanged`.
+        * "sample:<seconds>": the state of each entity is logged at most once every
+          <seconds>, e.g. "sample:5".
+    """
+
+    EVERY = "every"
+    ON_CHANGE = "on_change"
+    SAMPLE = "sample:"
 
 
 class RmfBookKeeperEvents:
@@ -57,13 +87,44 @@ class RmfBookKeeper:
         self,
         rmf_events: RmfEvents,
         *,
+        flush_interval: Optional[float] = None,
+        high_water_mark: int = 1000,
+        low_water_mark: int = 800,
+        skip_unchanged: Optional[Dict[str, Sequence[str]]] = None,
+        log_policies: Optional[Dict[str, str]] = None,
         logger: logging.Logger = None,
     ):
+        """
+        :param flush_interval: When set, states and health are not written as they
+            arrive, instead, only the latest of each entity is kept and they are written
+            in one transaction every `flush_interval` seconds. See `WriteBehind`.
+        :param high_water_mark: Max number of pending writes, see `WriteQueue`.
+        :param low_water_mark: See `WriteQueue`.
+        :param skip_unchanged: Topics where a state is not written if it is the same as
+            the last state written for the entity, mapped to the top level fields that
+            are ignored when comparing, e.g. `{"door_states": ["door_time"]}`.
+            Skipped states are still published as usual, so they still count as
+            heartbeats.
+        :param log_policies: `LogPolicy` of each topic, keyed by topic. Topics that are
+            not in the dict log every state.
+        """
         self.rmf = rmf_events
+        self.skip_unchanged = skip_unchanged or {}
+        self.log_policies = log_policies or {}
+        # keyed by topic
+        self.persist_stats: Dict[str, PersistStats] = {}
         self.bookkeeper_events = RmfBookKeeperEvents()
-        self._loop: asyncio.AbstractEventLoop
         self._main_logger = logger or logging.getLogger(self.__class__.__name__)
-        self._pending_tasks = set()
+        self.write_queue = WriteQueue(
+            high_water_mark=high_water_mark,
+            low_water_mark=low_water_mark,
+            logger=self._main_logger.getChild("WriteQueue"),
+        )
+        self.write_behind: Optional[WriteBehind] = None
+        if flush_interval:
+            self.write_behind = WriteBehind(
+                flush_interval, logger=self._main_logger.getChild("WriteBehind")
+            )
 
         self._loggers = self._ChildLoggers(
             self._main_logger.getChild("building_map"),
@@ -95,7 +156,9 @@ class RmfBookKeeper:
         self._subscriptions: List[Disposable] = []
 
     async def start(self):
-        self._loop = asyncio.get_event_loop()
+        await self.write_queue.start()
+        if self.write_behind is not None:
+            await self.write_behind.start()
         self._record_building_map()
         self._record_door_state()
         self._record_door_health()
@@ -113,17 +176,112 @@ class RmfBookKeeper:
         for sub in self._subscriptions:
             sub.dispose()
         self._subscriptions.clear()
-        if len(self._pending_tasks) > 0:
-            await asyncio.wait(self._pending_tasks)
+        await self.write_queue.stop()
+        if self.write_behind is not None:
+            await self.write_behind.stop()
+
+    def _make_log_filter(self, topic: str) -> Callable[[Hashable, Optional[int]], bool]:
+        """
+        Returns a function that decides if a state should be logged according to the
+        log policy of the topic, given the key and fingerprint of the state.
+        """
+        policy = self.log_policies.get(topic, LogPolicy.EVERY)
+        if policy == LogPolicy.EVERY:
+            return lambda _k, _fingerprint: True
+
+        if policy == LogPolicy.ON_CHANGE:
+            last_fingerprints: Dict[Hashable, Optional[int]] = {}
+
+            def on_change(k: Hashable, fingerprint: Optional[int]) -> bool:
+                if k in last_fingerprints and last_fingerprints[k] == fingerprint:
+                    return False
+                last_fingerprints[k] = fingerprint
+                return True
+
+            return on_change
+
+        if policy.startswith(LogPolicy.SAMPLE):
+            period = float(policy[len(LogPolicy.SAMPLE) :])
+            last_logged: Dict[Hashable, float] = {}
+
+            def sample(k: Hashable, _fingerprint: Optional[int]) -> bool:
+                now = time.monotonic()
+                if k in last_logged and now - last_logged[k] < period:
+                    return False
+                last_logged[k] = now
+                return True
+
+            return sample
+
+        raise ValueError(f"unknown log policy '{policy}' for {topic}")
+
+    def _record(
+        self,
+        topic: str,
+        key: Callable[[Any], Hashable],
+        save: Callable[[Any], Coroutine],
+        rows: Callable[[Any], List[_Row]],
+        log: Callable[[Any], None],
+    ):
+        """
+        Saves each item of `topic` with `save` through the write queue, or when using
+        write behind, queues the `rows` of the item. `key` identifies the entity of an
+        item. Items are logged with `log` according to the log policy of the topic.
+        """
+        stats = self.persist_stats[topic] = PersistStats()
+        # hash of the last written state of each entity
+        fingerprints: Dict[Hashable, int] = {}
+        skip_unchanged = topic in self.skip_unchanged
+        exclude = set(self.skip_unchanged.get(topic, ()))
+        need_fingerprint = (
+            skip_unchanged
+            or self.log_policies.get(topic, LogPolicy.EVERY) == LogPolicy.ON_CHANGE
+        )
+        should_log = self._make_log_filter(topic)
+
+        def fingerprint(x) -> Optional[int]:
+            if not need_fingerprint:
+                return None
+            return hash(json.dumps(x.dict(exclude=exclude), default=str))
+
+        def changed(k: Hashable, fp: Optional[int]) -> bool:
+            if not skip_unchanged:
+                stats.written += 1
+                return True
+            if fingerprints.get(k) == fp:
+                stats.skipped += 1
+                return False
+            fingerprints[k] = cast(int, fp)
+            stats.written += 1
+            return True
+
+        write_behind = self.write_behind
+
+        async def update(x):
+            try:
+                await save(x)
+            except Exception:
+                fingerprints.pop(key(x), None)
+                raise
+
+        def on_next(x):
+            k = key(x)
+            fp = fingerprint(x)
+            if should_log(k, fp):
+                log(x)
+            if not changed(k, fp):
+                return
+            if write_behind is not None:
+                for model, row, conflict_fields in rows(x):
+                    write_behind.put(model, row, conflict_fields)
+            elif not self.write_queue.put(k, lambda: update(x)):
+                fingerprints.pop(k, None)
 
-    def _create_task(self, coro: Coroutine):
-        task = self._loop.create_task(coro)
-        task.add_done_callback(self._pending_tasks.remove)
-        self._pending_tasks.add(task)
+        self._subscriptions.append(getattr(self.rmf, topic).subscribe(on_next))
 
     @staticmethod
     def _report_health(health: BaseBasicHealth, logger: logging.Logger):
-        message = health.json()
+        message = JsonMessage(health)
         if health.health_status == HealthStatus.UNHEALTHY:
             logger.warning(message)
         elif health.health_status == HealthStatus.DEAD:
@@ -136,120 +294,148 @@ class RmfBookKeeper:
             if not building_map:
                 return
             await building_map.save()
-            self._loggers.building_map.info(json.dumps(building_map.dict()))
+            self._loggers.building_map.info(JsonMessage(building_map))
 
         self._subscriptions.append(
-            self.rmf.building_map.subscribe(lambda x: self._create_task(update(x)))
+            self.rmf.building_map.subscribe(
+                lambda x: self.write_queue.put(
+                    ("building_map",), lambda: update(x), droppable=False
+                )
+            )
         )
 
     def _record_door_state(self):
-        async def update(door_state: DoorState):
-            await door_state.save()
-            self._loggers.door_state.info(json.dumps(door_state.dict()))
-
-        self._subscriptions.append(
-            self.rmf.door_states.subscribe(lambda x: self._create_task(update(x)))
+        self._record(
+            topics.door_states,
+            lambda x: ("door_state", x.door_name),
+            lambda x: x.save(),
+            lambda x: [(ttm.DoorState, {"id_": x.door_name, "data": x.dict()}, _PK)],
+            lambda x: self._loggers.door_state.info(JsonMessage(x)),
         )
 
     def _record_door_health(self):
-        async def update(health: DoorHealth):
-            await health.save()
-            self._report_health(health, self._loggers.door_health)
-
-        self._subscriptions.append(
-            self.rmf.door_health.subscribe(lambda x: self._create_task(update(x)))
+        self._record(
+            topics.door_health,
+            lambda x: ("door_health", x.id_),
+            lambda x: x.save(),
+            lambda x: [(ttm.DoorHealth, x.dict(), _PK)],
+            lambda x: self._report_health(x, self._loggers.door_health),
         )
 
     def _record_lift_state(self):
-        async def update(lift_state: LiftState):
-            await lift_state.save()
-            self._loggers.lift_state.info(lift_state.json())
-
-        self._subscriptions.append(
-            self.rmf.lift_states.subscribe(lambda x: self._create_task(update(x)))
+        self._record(
+            topics.lift_states,
+            lambda x: ("lift_state", x.lift_name),
+            lambda x: x.save(),
+            lambda x: [(ttm.LiftState, {"id_": x.lift_name, "data": x.dict()}, _PK)],
+            lambda x: self._loggers.lift_state.info(JsonMessage(x)),
         )
 
     def _record_lift_health(self):
-        async def update(health: LiftHealth):
-            await health.save()
-            self._report_health(health, self._loggers.lift_health)
-
-        self._subscriptions.append(
-            self.rmf.lift_health.subscribe(lambda x: self._create_task(update(x)))
+        self._record(
+            topics.lift_health,
+            lambda x: ("lift_health", x.id_),
+            lambda x: x.save(),
+            lambda x: [(ttm.LiftHealth, x.dict(), _PK)],
+            lambda x: self._report_health(x, self._loggers.lift_health),
         )
 
     def _record_dispenser_state(self):
-        async def update(dispenser_state: DispenserState):
-            await dispenser_state.save()
-            self._loggers.dispenser_state.info(dispenser_state.json())
-
-        self._subscriptions.append(
-            self.rmf.dispenser_states.subscribe(lambda x: self._create_task(update(x)))
+        self._record(
+            topics.dispenser_states,
+            lambda x: ("dispenser_state", x.guid),
+            lambda x: x.save(),
+            lambda x: [(ttm.DispenserState, {"id_": x.guid, "data": x.dict()}, _PK)],
+            lambda x: self._loggers.dispenser_state.info(JsonMessage(x)),
         )
 
     def _record_dispenser_health(self):
-        async def update(health: DispenserHealth):
-            await health.save()
-            self._report_health(health, self._loggers.dispenser_health)
-
-        self._subscriptions.append(
-            self.rmf.dispenser_health.subscribe(lambda x: self._create_task(update(x)))
+        self._record(
+            topics.dispenser_health,
+            lambda x: ("dispenser_health", x.id_),
+            lambda x: x.save(),
+            lambda x: [(ttm.DispenserHealth, x.dict(), _PK)],
+            lambda x: self._report_health(x, self._loggers.dispenser_health),
         )
 
     def _record_ingestor_state(self):
-        async def update(ingestor_state: IngestorState):
-            await ingestor_state.save()
-            self._loggers.ingestor_state.info(ingestor_state.json())
-
-        self._subscriptions.append(
-            self.rmf.ingestor_states.subscribe(lambda x: self._create_task(update(x)))
+        self._record(
+            topics.ingestor_states,
+            lambda x: ("ingestor_state", x.guid),
+            lambda x: x.save(),
+            lambda x: [(ttm.IngestorState, {"id_": x.guid, "data": x.dict()}, _PK)],
+            lambda x: self._loggers.ingestor_state.info(JsonMessage(x)),
         )
 
     def _record_ingestor_health(self):
-        async def update(health: IngestorHealth):
-            await health.save()
-            self._report_health(health, self._loggers.ingestor_health)
-
-        self._subscriptions.append(
-            self.rmf.ingestor_health.subscribe(lambda x: self._create_task(update(x)))
+        self._record(
+            topics.ingestor_health,
+            lambda x: ("ingestor_health", x.id_),
+            lambda x: x.save(),
+            lambda x: [(ttm.IngestorHealth, x.dict(), _PK)],
+            lambda x: self._report_health(x, self._loggers.ingestor_health),
         )
 
     def _record_fleet_state(self):
-        async def update(fleet_state: FleetState):
-            tasks = [
-                ttm.RobotState.update_or_create(
-                    {
-                        "data": r.dict(),
-                    },
-                    fleet_name=fleet_state.name,
-                    robot_name=r.name,
-                )
+        robot_conflict_fields = ("fleet_name", "robot_name")
+
+        def robot_rows(fleet_state: FleetState) -> List[Dict[str, Any]]:
+            return [
+                {
+                    "fleet_name": fleet_state.name,
+                    "robot_name": r.name,
+                    "data": r.dict(),
+                }
                 for r in fleet_state.robots
             ]
-            async with tortoise.transactions.in_transaction():
-                await asyncio.gather(fleet_state.save(), *tasks)
 
-            self._loggers.fleet_state.info(fleet_state.json())
+        async def save(fleet_state: FleetState):
+            async with tortoise.transactions.in_transaction() as conn:
+                await fleet_state.save()
+                await ttm.bulk_upsert(
+                    ttm.RobotState,
+                    robot_rows(fleet_state),
+                    robot_conflict_fields,
+                    using_db=conn,
+                )
 
-        self._subscriptions.append(
-            self.rmf.fleet_states.subscribe(lambda x: self._create_task(update(x)))
+        def rows(fleet_state: FleetState) -> List[_Row]:
+            fleet_row = {"id_": fleet_state.name, "data": fleet_state.dict()}
+            return [
+                (ttm.FleetState, fleet_row, _PK),
+                *(
+                    (ttm.RobotState, row, robot_conflict_fields)
+                    for row in robot_rows(fleet_state)
+                ),
+            ]
+
+        self._record(
+            topics.fleet_states,
+            lambda x: ("fleet_state", x.name),
+            save,
+            rows,
+            lambda x: self._loggers.fleet_state.info(JsonMessage(x)),
         )
 
     def _record_robot_health(self):
-        async def update(health: RobotHealth):
-            await health.save()
-            self._report_health(health, self._loggers.robot_health)
-
-        self._subscriptions.append(
-            self.rmf.robot_health.subscribe(lambda x: self._create_task(update(x)))
+        self._record(
+            topics.robot_health,
+            lambda x: ("robot_health", x.id_),
+            lambda x: x.save(),
+            lambda x: [(ttm.RobotHealth, x.dict(), _PK)],
+            lambda x: self._report_health(x, self._loggers.robot_health),
         )
 
     def _record_task_summary(self):
         async def update(summary: TaskSummary):
             await summary.save()
-            self._loggers.task_summary.info(summary.json())
+            self._loggers.task_summary.info(JsonMessage(summary))
             self.bookkeeper_events.task_summary_written.on_next(summary)
 
         self._subscriptions.append(
-            self.rmf.task_summaries.subscribe(lambda x: self._create_task(update(x)))
+            self.rmf.task_summaries.subscribe(
+                lambda x: self.write_queue.put(
+                    ("task_summary", x.task_id), lambda: update(x), droppable=False
+                )
+            )
         )
@@ -0,0 +1,155 @@
+import asyncio
+import itertools
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class OverflowPolicy:
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+
+
+@dataclass
+class BridgeStats:
+    enqueued: int = 0
+    delivered: int = 0
+    replaced: int = 0
+    dropped: int = 0
+    blocked: int = 0
+    batches: int = 0
+    max_depth: int = 0
+
+
+class LoopBridge:
+    """
+    Passes items from foreign threads (e.g. the rclpy spin thread) to an asyncio loop.
+    Items are queued in a bounded queue and delivered to `handler` on the loop in batches,
+    the loop is woken up at most once per batch.
+
+    When the queue is full, the overflow policy decides what happens to new items:
+        * "block": the producer thread is blocked until the loop drains the queue.
+        * "drop_oldest": replaces the queued item with the same key, if there is none,
+          drops the oldest keyed item in the queue. Items without a key (e.g. building
+          maps and task summaries) are never dropped, if there is no keyed item to drop,
+          a new keyed item is dropped and the producer of a new item without a key is
+          blocked like with "block".
+        * "drop_newest": drops the new item.
+
+    An exception raised by `handler` is logged, the other items are still delivered.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        handler: Callable[[str, Any], None],
+        *,
+        maxsize: int = 1000,
+        overflow_policy: str = OverflowPolicy.DROP_OLDEST,
+        logger: logging.Logger = None,
+    ):
+        if overflow_policy not in (
+            OverflowPolicy.BLOCK,
+            OverflowPolicy.DROP_OLDEST,
+            OverflowPolicy.DROP_NEWEST,
+        ):
+            raise ValueError(f"unknown overflow policy '{overflow_policy}'")
+        self.loop = loop
+        self.handler = handler
+        self.maxsize = maxsize
+        self.overflow_policy = overflow_policy
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self.stats = BridgeStats()
+        self._queue: "OrderedDict[Tuple[str, int], Any]" = OrderedDict()
+        self._latest: Dict[Tuple[str, Hashable], Tuple[str, int]] = {}
+        # queued items that have a key, in queue order
+        self._keyed: "OrderedDict[Tuple[str, int], None]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._wakeup_pending = False
+        self._closed = False
+        self._seq = itertools.count()
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def put(self, topic: str, item: Any, key: Optional[Hashable] = None) -> None:
+        """
+        Queues an item, this can be called from any thread except the loop's thread when
+        using the "block" policy, or when using the "drop_oldest" policy for items
+        without a key.
+
+        :param key: Key of the entity that the item is the latest state of, used by the
+            "drop_oldest" policy to find the older item to replace when the queue is
+            full. Items without a key are never dropped by "drop_oldest".
+        """
+        with self._cond:
+            if self._closed:
+                return
+            if len(self._queue) >= self.maxsize:
+                if self.overflow_policy == OverflowPolicy.DROP_NEWEST:
+                    self.stats.dropped += 1
+                    return
+                if self.overflow_policy == OverflowPolicy.DROP_OLDEST:
+                    older = self._latest.get((topic, key)) if key is not None else None
+                    if older is not None and older in self._queue:
+                        self._remove(older)
+                        self.stats.replaced += 1
+                    elif self._keyed:
+                        self._remove(next(iter(self._keyed)))
+                        self.stats.dropped += 1
+                    elif key is not None:
+                        self.stats.dropped += 1
+                        return
+                if len(self._queue) >= self.maxsize:
+                    self.stats.blocked += 1
+                    while len(self._queue) >= self.maxsize and not self._closed:
+                        self._cond.wait()
+                    if self._closed:
+                        return
+            qkey = (topic, next(self._seq))
+            if key is not None:
+                self._latest[(topic, key)] = qkey
+                self._keyed[qkey] = None
+            self._queue[qkey] = item
+            self.stats.enqueued += 1
+            self.stats.max_depth = max(self.stats.max_depth, len(self._queue))
+            if self._wakeup_pending:
+                return
+            self._wakeup_pending = True
+        try:
+            self.loop.call_soon_threadsafe(self._drain)
+        except RuntimeError:
+            # loop is closed
+            pass
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._queue.clear()
+            self._latest.clear()
+            self._keyed.clear()
+            self._cond.notify_all()
+
+    def _remove(self, qkey: Tuple[str, int]) -> None:
+        del self._queue[qkey]
+        self._keyed.pop(qkey, None)
+
+    def _drain(self) -> None:
+        with self._cond:
+            batch = self._queue
+            self._queue = OrderedDict()
+            self._latest = {}
+            self._keyed = OrderedDict()
+            self._wakeup_pending = False
+            self._cond.notify_all()
+        self.stats.batches += 1
+        for (topic, _), item in batch.items():
+            self.stats.delivered += 1
+            try:
+                self.handler(topic, item)
+            except Exception:  # pylint: disable=broad-except
+                self.logger.exception(f"failed to handle an item of {topic}")
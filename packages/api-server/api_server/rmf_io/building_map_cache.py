@@ -0,0 +1,159 @@
+import hashlib
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from rx.core.typing import Disposable
+
+from api_server.fast_io import EncodedJson
+from api_server.logger import dumps
+from api_server.models import BuildingMap, Door, Lift
+from api_server.models import tortoise_models as ttm
+from api_server.models.ros_pydantic.rmf_building_map_msgs import GraphNode
+from api_server.single_flight import SingleFlight
+
+from .events import RmfEvents
+
+
+class Waypoint(NamedTuple):
+    level_name: str
+    graph_name: str
+    node: GraphNode
+
+
+class IndexedBuildingMap:
+    """
+    A parsed building map and indexes of it. It is shared by all the readers so it, and
+    the models in it, must not be modified.
+    """
+
+    def __init__(
+        self,
+        building_map: BuildingMap,
+        version: str,
+        encoded: Optional[EncodedJson] = None,
+    ):
+        """
+        :param version: A hash of the content of the map.
+        :param encoded: The map encoded to json, if it is already encoded.
+        """
+        self.building_map = building_map
+        self.version = version
+        self.doors: List[Door] = []
+        self.doors_by_name: Dict[str, Door] = {}
+        self.doors_by_level: Dict[str, List[Door]] = {}
+        self.waypoints_by_name: Dict[str, Waypoint] = {}
+        for level in building_map.levels:
+            self.doors.extend(level.doors)
+            self.doors_by_level[level.name] = level.doors
+            for door in level.doors:
+                self.doors_by_name[door.name] = door
+            for graph in level.nav_graphs:
+                for node in graph.vertices:
+                    if node.name:
+                        self.waypoints_by_name.setdefault(
+                            node.name, Waypoint(level.name, graph.name, node)
+                        )
+        self.lifts: List[Lift] = building_map.lifts
+        self.lifts_by_name: Dict[str, Lift] = {lift.name: lift for lift in self.lifts}
+        self._encoded = encoded
+
+    @property
+    def encoded(self) -> EncodedJson:
+        """
+        The map encoded to json, it is encoded on first use.
+        """
+        if self._encoded is None:
+            self._encoded = EncodedJson(dumps(self.building_map.dict()))
+        return self._encoded
+
+    @staticmethod
+    def content_hash(building_map: BuildingMap) -> str:
+        return IndexedBuildingMap.encoded_hash(EncodedJson(dumps(building_map.dict())))
+
+    @staticmethod
+    def encoded_hash(encoded: EncodedJson) -> str:
+        return hashlib.sha1(encoded.json.encode()).hexdigest()
+
+    @classmethod
+    def from_building_map(cls, building_map: BuildingMap) -> "IndexedBuildingMap":
+        encoded = EncodedJson(dumps(building_map.dict()))
+        return cls(building_map, cls.encoded_hash(encoded), encoded)
+
+
+class BuildingMapCache:
+    """
+    Keeps the latest building map from `RmfEvents` parsed and indexed. The indexed map is
+    only rebuilt when the content of the map changes, and it is replaced as a whole so
+    readers always see a consistent map.
+    """
+
+    def __init__(self, rmf_events: RmfEvents):
+        self.rmf = rmf_events
+        self._current: Optional[IndexedBuildingMap] = None
+        # the last received map may have the same content as the current map but it is a
+        # different object.
+        self._last_encoded: Optional[Tuple[BuildingMap, EncodedJson]] = None
+        self._subscription: Optional[Disposable] = None
+        # concurrent reads before a map is received share one database query
+        self._loads: SingleFlight[Optional[IndexedBuildingMap]] = SingleFlight(ttl=0)
+
+    @property
+    def current(self) -> Optional[IndexedBuildingMap]:
+        return self._current
+
+    def start(self):
+        self._subscription = self.rmf.building_map.subscribe(self._on_building_map)
+
+    def stop(self):
+        if self._subscription is not None:
+            self._subscription.dispose()
+            self._subscription = None
+
+    def _on_building_map(self, building_map: Optional[BuildingMap]):
+        if building_map is None:
+            return
+        # the map is encoded to hash its content, the encoding is kept to send the map
+        encoded = EncodedJson(dumps(building_map.dict()))
+        self._last_encoded = (building_map, encoded)
+        version = IndexedBuildingMap.encoded_hash(encoded)
+        if self._current is not None and self._current.version == version:
+            return
+        self._current = IndexedBuildingMap(building_map, version, encoded)
+
+    def etag(self) -> Optional[str]:
+        if self._current is None:
+            return None
+        return f'"{self._current.version}"'
+
+    def encode(self, building_map: BuildingMap) -> EncodedJson:
+        """
+        Encodes a map to json, the encoding is reused if it is the last received map or
+        the current map.
+        """
+        last = self._last_encoded
+        if last is not None and last[0] is building_map:
+            return last[1]
+        current = self._current
+        if current is not None and current.building_map is building_map:
+            return current.encoded
+        return EncodedJson(dumps(building_map.dict()))
+
+    async def get(self) -> Optional[IndexedBuildingMap]:
+        """
+        Returns the latest map, loading it from the database if no map is received yet.
+        """
+        if self._current is not None:
+            return self._current
+        indexed = await self._loads.get(None, self._load)
+        if indexed is None:
+            return None
+        # a map may be received while loading
+        if self._current is None:
+            self._current = indexed
+        return self._current
+
+    @staticmethod
+    async def _load() -> Optional[IndexedBuildingMap]:
+        ttm_map = await ttm.BuildingMap.first()
+        if ttm_map is None:
+            return None
+        return IndexedBuildingMap.from_building_map(BuildingMap.from_tortoise(ttm_map))
@@ -0,0 +1,255 @@
+import asyncio
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Type
+
+from pydantic import BaseModel
+from rx.core.typing import Disposable
+
+from api_server.logger import dumps
+from api_server.models import (
+    BuildingMap,
+    DispenserHealth,
+    DispenserState,
+    DoorHealth,
+    DoorState,
+    FleetState,
+    IngestorHealth,
+    IngestorState,
+    LiftHealth,
+    LiftState,
+    RobotHealth,
+    TaskSummary,
+)
+
+from .events import RmfEvents
+from .state_store import RmfStateStore
+from .topics import topics
+
+BUS_TOPICS: Dict[str, Type[BaseModel]] = {
+    topics.door_states: DoorState,
+    topics.door_health: DoorHealth,
+    topics.lift_states: LiftState,
+    topics.lift_health: LiftHealth,
+    topics.dispenser_states: DispenserState,
+    topics.dispenser_health: DispenserHealth,
+    topics.ingestor_states: IngestorState,
+    topics.ingestor_health: IngestorHealth,
+    topics.fleet_states: FleetState,
+    topics.robot_health: RobotHealth,
+    topics.task_summaries: TaskSummary,
+    topics.building_map: BuildingMap,
+}
+
+# a fleet state with many robots or a building map can be a few MiB
+MAX_LINE = 2 ** 26
+
+
+def encode_event(topic: str, value: BaseModel) -> bytes:
+    """
+    Encodes an event to a line of `[topic, data]`.
+    """
+    return f'["{topic}",{dumps(value.dict())}]\n'.encode()
+
+
+def decode_event(line: bytes) -> Tuple[str, BaseModel]:
+    topic, data = json.loads(line)
+    return topic, BUS_TOPICS[topic].parse_obj(data)
+
+
+@dataclass
+class BusStats:
+    published: int = 0
+    subscribers: int = 0
+    slow_subscribers: int = 0
+
+
+class RmfBusPublisher:
+    """
+    Publishes the events of `RmfEvents` to the api workers connected to a unix socket.
+    Each event is encoded once, as a line of `[topic, data]`, and written to every
+    subscriber. A subscriber first gets the latest value of every entity in
+    `state_store`, followed by the events as they happen.
+
+    A subscriber with more than `max_buffer` bytes that are not sent yet is
+    disconnected, it gets a new snapshot when it reconnects. Events must be published on
+    the loop thread, like `RmfIngest` and `HealthWatchdog` do.
+    """
+
+    def __init__(
+        self,
+        rmf_events: RmfEvents,
+        path: str,
+        *,
+        state_store: Optional[RmfStateStore] = None,
+        max_buffer: int = 2 ** 26,
+        logger: logging.Logger = None,
+    ):
+        self.rmf = rmf_events
+        self.path = path
+        self.state_store = state_store
+        self.max_buffer = max_buffer
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self.stats = BusStats()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self._subscriptions: List[Disposable] = []
+
+    async def start(self):
+        if os.path.exists(self.path):
+            # left behind by a publisher that did not stop cleanly
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._on_connect, self.path)
+        for topic in BUS_TOPICS:
+            self._subscriptions.append(
+                getattr(self.rmf, topic).subscribe(self._make_publish(topic))
+            )
+        self.logger.info(f'publishing events on "{self.path}"')
+
+    async def stop(self):
+        for sub in self._subscriptions:
+            sub.dispose()
+        self._subscriptions.clear()
+        if self._server is None:
+            return
+        self._server.close()
+        for writer in list(self._writers):
+            self._drop(writer)
+        await self._server.wait_closed()
+        self._server = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def _snapshot(self) -> Iterator[Tuple[str, Any]]:
+        if self.state_store is not None:
+            for topic in RmfStateStore.KEY_MAPPERS:
+                for value in self.state_store.values(topic):
+                    yield topic, value
+        building_map = self.rmf.building_map.value
+        if building_map is not None:
+            yield topics.building_map, building_map
+
+    def _on_connect(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # the snapshot is written before any other event, nothing can be published in
+        # between as this runs on the loop thread.
+        for topic, value in self._snapshot():
+            writer.write(encode_event(topic, value))
+        self._writers.add(writer)
+        self.stats.subscribers = len(self._writers)
+        self.logger.info(f"subscriber connected ({len(self._writers)} subscribers)")
+        asyncio.get_event_loop().create_task(self._wait_closed(reader, writer))
+
+    async def _wait_closed(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        # subscribers never write, the read returns when they disconnect
+        try:
+            await reader.read()
+        except OSError:
+            pass
+        if writer in self._writers:
+            self._drop(writer)
+            self.logger.info(
+                f"subscriber disconnected ({len(self._writers)} subscribers)"
+            )
+
+    def _drop(self, writer: asyncio.StreamWriter):
+        self._writers.discard(writer)
+        self.stats.subscribers = len(self._writers)
+        writer.close()
+
+    def _make_publish(self, topic: str):
+        def publish(value: Any):
+            if value is None:
+                return
+            self.stats.published += 1
+            if not self._writers:
+                return
+            line = encode_event(topic, value)
+            for writer in list(self._writers):
+                if writer.transport.get_write_buffer_size() > self.max_buffer:
+                    self.stats.slow_subscribers += 1
+                    self.logger.warning("disconnecting a subscriber that is behind")
+                    self._drop(writer)
+                    continue
+                writer.write(line)
+
+        return publish
+
+
+class RmfBusSubscriber:
+    """
+    Receives the events of a `RmfBusPublisher` and publishes them to `RmfEvents`, on the
+    loop thread. Reconnects every `reconnect_interval` seconds when the publisher is not
+    available.
+    """
+
+    def __init__(
+        self,
+        rmf_events: RmfEvents,
+        path: str,
+        *,
+        reconnect_interval: float = 1,
+        logger: logging.Logger = None,
+    ):
+        self.rmf = rmf_events
+        self.path = path
+        self.reconnect_interval = reconnect_interval
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self.received = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.get_event_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        connected = True
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(
+                    self.path, limit=MAX_LINE
+                )
+            except OSError as e:
+                if connected:
+                    self.logger.warning(f'cannot connect to "{self.path}": {e}')
+                connected = False
+                await asyncio.sleep(self.reconnect_interval)
+                continue
+            connected = True
+            self.logger.info(f'subscribed to "{self.path}"')
+            try:
+                await self._receive(reader)
+            finally:
+                writer.close()
+            self.logger.warning("disconnected from the publisher")
+            await asyncio.sleep(self.reconnect_interval)
+
+    async def _receive(self, reader: asyncio.StreamReader):
+        while True:
+            try:
+                line = await reader.readline()
+            except (OSError, ValueError) as e:
+                # `ValueError` if a line is longer than `MAX_LINE`
+                self.logger.error(f"failed to read from the publisher: {e}")
+                return
+            if not line:
+                return
+            try:
+                topic, value = decode_event(line)
+            except (ValueError, KeyError) as e:
+                self.logger.error(f"invalid event: {e}")
+                continue
+            self.received += 1
+            getattr(self.rmf, topic).on_next(value)
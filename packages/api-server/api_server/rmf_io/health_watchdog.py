@@ -1,20 +1,19 @@
+import asyncio
+import concurrent.futures
 import logging
-from typing import Any, Dict, List, Optional, cast
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple, Type, cast
 
 from rmf_dispenser_msgs.msg import DispenserState as RmfDispenserState
 from rmf_door_msgs.msg import DoorMode as RmfDoorMode
 from rmf_fleet_msgs.msg import RobotMode as RmfRobotMode
 from rmf_ingestor_msgs.msg import IngestorState as RmfIngestorState
 from rmf_lift_msgs.msg import LiftState as RmfLiftState
-from rx import operators as ops
-from rx.core.observable.observable import Observable
-from rx.core.pipe import pipe
 from rx.core.typing import Disposable
-from rx.scheduler.scheduler import Scheduler
-from rx.subject.behaviorsubject import BehaviorSubject
+from rx.scheduler.eventloop import AsyncIOThreadSafeScheduler
+from rx.scheduler.periodicscheduler import PeriodicScheduler
+from rx.subject.subject import Subject
 
 from api_server.models import (
-    BuildingMap,
     Dispenser,
     DispenserHealth,
     DispenserState,
@@ -31,9 +30,79 @@ from api_server.models import (
     RobotState,
 )
 from api_server.models import tortoise_models as ttm
+from api_server.models.health import BaseBasicHealth
 
+from .building_map_cache import BuildingMapCache, IndexedBuildingMap
 from .events import RmfEvents
-from .operators import heartbeat, most_critical
+from .liveness import LivenessTracker
+from .state_store import RmfStateStore
+from .topics import topics
+
+
+class _HealthWatch:
+    """
+    Combines the liveness and the mode health of one kind of entity. The health is DEAD
+    if the entity is not alive, else it is the health of its mode. A health is only
+    emitted when it changes.
+    """
+
+    def __init__(
+        self,
+        model: Type[BaseBasicHealth],
+        ttm_model: Type[ttm.BasicHealthModel],
+        topic: str,
+        subject: Subject,
+        mode_to_health: Callable[[str, Any], Optional[BaseBasicHealth]],
+        liveness: LivenessTracker,
+        expiry: Optional[LivenessTracker],
+    ):
+        self.model = model
+        self.ttm_model = ttm_model
+        self.topic = topic
+        self.subject = subject
+        self.mode_to_health = mode_to_health
+        self.liveness = liveness
+        self.expiry = expiry
+        self.mode_health: Dict[str, Optional[BaseBasicHealth]] = {}
+        self.health: Dict[str, BaseBasicHealth] = {}
+
+    def on_state(self, id_: str, state: Any):
+        """
+        :param state: The latest state of the entity, None if it is not known.
+        """
+        mode_health = None if state is None else self.mode_to_health(id_, state)
+        with self.liveness.lock:
+            changed = mode_health != self.mode_health.get(id_, None)
+            self.mode_health[id_] = mode_health
+            # emits the health if the entity becomes alive
+            self.liveness.touch((self, id_))
+            if self.expiry is not None:
+                self.expiry.touch((self, id_))
+            if changed:
+                self.update(id_)
+
+    def update(self, id_: str):
+        if self.liveness.is_alive((self, id_)):
+            health = self.mode_health.get(id_, None)
+            if health is None:
+                health = self.model(id_=id_, health_status=HealthStatus.HEALTHY)
+        else:
+            health = self.model(
+                id_=id_,
+                health_status=HealthStatus.DEAD,
+                health_message="heartbeat failed",
+            )
+        if health != self.health.get(id_, None):
+            self.health[id_] = health
+            self.subject.on_next(health)
+
+    def evict(self, id_: str):
+        with self.liveness.lock:
+            self.liveness.remove((self, id_))
+            if self.expiry is not None:
+                self.expiry.remove((self, id_))
+            self.mode_health.pop(id_, None)
+            self.health.pop(id_, None)
 
 
 class HealthWatchdog:
@@ -43,36 +112,163 @@ class HealthWatchdog:
         self,
         rmf_events: RmfEvents,
         *,
-        scheduler: Optional[Scheduler] = None,
+        eviction_ttl: Optional[float] = None,
+        remove_evicted_health: bool = False,
+        building_map_cache: Optional[BuildingMapCache] = None,
+        state_store: Optional[RmfStateStore] = None,
+        scheduler: Optional[PeriodicScheduler] = None,
         logger: logging.Logger = None,
     ):
+        """
+        :param eviction_ttl: Entities that are not seen for this many seconds are
+            forgotten, they are watched again if they are seen later. Entities are never
+            forgotten if None.
+        :param remove_evicted_health: Also delete the health of the evicted entities
+            from the database, and from `state_store`.
+        :param building_map_cache: Where the known doors and lifts are read from, they
+            are loaded from the database if it is not given.
+        :param state_store: The store that the health of the entities is kept in, if
+            any.
+        :param scheduler: Runs the liveness checks, the health of the dead entities is
+            published on its thread. Defaults to a scheduler on the current event loop,
+            so that health is published on the loop thread like the other events.
+        """
         self.rmf = rmf_events
+        self.building_map_cache = building_map_cache or BuildingMapCache(rmf_events)
+        scheduler = scheduler or AsyncIOThreadSafeScheduler(asyncio.get_event_loop())
         self.scheduler = scheduler
+        self.remove_evicted_health = remove_evicted_health
+        self.state_store = state_store
         self.logger = logger or logging.getLogger(self.__class__.__name__)
-        self._building_watchers: List[Disposable] = []
+        self.liveness = LivenessTracker(
+            self.LIVELINESS, self._on_liveness, scheduler=scheduler
+        )
+        self.expiry: Optional[LivenessTracker] = None
+        if eviction_ttl is not None:
+            # the exact time of the eviction is not important, a coarse resolution means
+            # that most messages do not need to move the deadline.
+            self.expiry = LivenessTracker(
+                eviction_ttl,
+                self._on_expiry,
+                resolution=max(1, min(eviction_ttl / 10, self.LIVELINESS)),
+                scheduler=scheduler,
+                lock=self.liveness.lock,
+            )
+        self._doors = _HealthWatch(
+            DoorHealth,
+            ttm.DoorHealth,
+            topics.door_health,
+            self.rmf.door_health,
+            lambda _, state: self.door_mode_to_health(state),
+            self.liveness,
+            self.expiry,
+        )
+        self._lifts = _HealthWatch(
+            LiftHealth,
+            ttm.LiftHealth,
+            topics.lift_health,
+            self.rmf.lift_health,
+            lambda _, state: self.lift_mode_to_health(state),
+            self.liveness,
+            self.expiry,
+        )
+        self._dispensers = _HealthWatch(
+            DispenserHealth,
+            ttm.DispenserHealth,
+            topics.dispenser_health,
+            self.rmf.dispenser_health,
+            lambda _, state: self.dispenser_mode_to_health(state),
+            self.liveness,
+            self.expiry,
+        )
+        self._ingestors = _HealthWatch(
+            IngestorHealth,
+            ttm.IngestorHealth,
+            topics.ingestor_health,
+            self.rmf.ingestor_health,
+            lambda _, state: self.ingestor_mode_to_health(state),
+            self.liveness,
+            self.expiry,
+        )
+        self._robots = _HealthWatch(
+            RobotHealth,
+            ttm.RobotHealth,
+            topics.robot_health,
+            self.rmf.robot_health,
+            self.robot_mode_to_health,
+            self.liveness,
+            self.expiry,
+        )
+        self._subscriptions: List[Disposable] = []
+        self._removals: Set[concurrent.futures.Future] = set()
+        self._loop: asyncio.AbstractEventLoop
+
+    @property
+    def watched(self) -> int:
+        """
+        The number of entities being watched.
+        """
+        return len(self.liveness)
 
     async def start(self):
-        await self._watch_door_health()
-        await self._watch_lift_health()
+        self._loop = asyncio.get_event_loop()
+        self.liveness.start()
+        if self.expiry is not None:
+            self.expiry.start()
+        building_map = await self.building_map_cache.get()
+        await self._watch_door_health(building_map)
+        await self._watch_lift_health(building_map)
         await self._watch_dispenser_health()
         await self._watch_ingestor_health()
         await self._watch_robot_health()
 
-    @staticmethod
-    def _combine_most_critical(*obs: Observable):
+    async def stop(self):
         """
-        Combines an observable sequence of an observable sequence of BasicHealthModel to an
-        observable sequence of BasicHealthModel with the most critical health status. If there
-        are multiple BasicHealthModel with the same criticality, the most recent item is
-        chosen.
-
-        :param obs: Sequence[rx.Observable[BasicHealthModel]]
+        Stops watching and forgets all the entities.
         """
-        return pipe(
-            ops.timestamp(),
-            ops.combine_latest(*[x.pipe(ops.timestamp()) for x in obs]),
-            most_critical(),
-        )
+        for sub in self._subscriptions:
+            sub.dispose()
+        self._subscriptions.clear()
+        self.liveness.stop()
+        if self.expiry is not None:
+            self.expiry.stop()
+        for watch in (
+            self._doors,
+            self._lifts,
+            self._dispensers,
+            self._ingestors,
+            self._robots,
+        ):
+            for id_ in list(watch.mode_health):
+                watch.evict(id_)
+        if self._removals:
+            await asyncio.wait([asyncio.wrap_future(f) for f in list(self._removals)])
+
+    @staticmethod
+    def _on_liveness(key: Hashable, _alive: bool):
+        watch, id_ = cast(Tuple[_HealthWatch, str], key)
+        watch.update(id_)
+
+    def _on_expiry(self, key: Hashable, alive: bool):
+        if alive:
+            return
+        watch, id_ = cast(Tuple[_HealthWatch, str], key)
+        watch.evict(id_)
+        self.logger.info(f"evicted {watch.model.__name__} {id_}")
+        if self.remove_evicted_health:
+            if self.state_store is not None:
+                self.state_store.remove(watch.topic, id_)
+            fut = asyncio.run_coroutine_threadsafe(
+                self._remove_health(watch.ttm_model, id_), self._loop
+            )
+            self._removals.add(fut)
+            fut.add_done_callback(self._removals.discard)
+
+    async def _remove_health(self, model: Type[ttm.BasicHealthModel], id_: str):
+        try:
+            await model.filter(id_=id_).delete()
+        except Exception:  # pylint: disable=broad-except
+            self.logger.exception(f"failed to remove {model.__name__} {id_}")
 
     @staticmethod
     def door_mode_to_health(state: Optional[DoorState]) -> Optional[DoorHealth]:
@@ -100,53 +296,19 @@ class HealthWatchdog:
             health_message="door is in an unknown mode",
         )
 
-    async def _watch_door_health(self):
-        def to_door_health(id_: str, has_heartbeat: bool):
-            if has_heartbeat:
-                return DoorHealth(id_=id_, health_status=HealthStatus.HEALTHY)
-            return DoorHealth(
-                id_=id_,
-                health_status=HealthStatus.DEAD,
-                health_message="heartbeat failed",
-            )
-
-        def watch(id_: str, obs: Observable):
-            door_mode_health = obs.pipe(
-                ops.map(cast(Any, self.door_mode_to_health)),
-                ops.distinct_until_changed(),
-            )
-            obs.pipe(
-                heartbeat(self.LIVELINESS),
-                ops.map(
-                    cast(Any, lambda has_heartbeat: to_door_health(id_, has_heartbeat))
-                ),
-                self._combine_most_critical(door_mode_health),
-            ).subscribe(self.rmf.door_health.on_next, scheduler=self.scheduler)
-
-        ttm_map = await ttm.BuildingMap.get_or_none()
-        if ttm_map is None:
-            doors = []
-        else:
-            building_map = BuildingMap.from_tortoise(ttm_map)
-            doors = [door for level in building_map.levels for door in level.doors]
+    async def _watch_door_health(self, building_map: Optional[IndexedBuildingMap]):
+        doors = [] if building_map is None else building_map.doors
         states_list = [DoorState.from_tortoise(x) for x in await ttm.DoorState.all()]
         door_states = {state.door_name: state for state in states_list}
         initial_states = {door.name: door_states.get(door.name, None) for door in doors}
 
-        subjects: Dict[str, BehaviorSubject] = {
-            id_: BehaviorSubject(state) for id_, state in initial_states.items()
-        }
-        for id_, subject in subjects.items():
-            watch(id_, subject)
+        for id_, state in initial_states.items():
+            self._doors.on_state(id_, state)
 
         def on_state(state: DoorState):
-            if state.door_name not in subjects:
-                subjects[state.door_name] = BehaviorSubject(state)
-                watch(state.door_name, subjects[state.door_name])
-            else:
-                subjects[state.door_name].on_next(state)
+            self._doors.on_state(state.door_name, state)
 
-        self.rmf.door_states.subscribe(on_state)
+        self._subscriptions.append(self.rmf.door_states.subscribe(on_state))
 
     @staticmethod
     def lift_mode_to_health(state: Optional[LiftState]):
@@ -179,53 +341,19 @@ class HealthWatchdog:
             health_message="lift is in an unknown mode",
         )
 
-    async def _watch_lift_health(self):
-        def to_lift_health(id_: str, has_heartbeat: bool):
-            if has_heartbeat:
-                return LiftHealth(id_=id_, health_status=HealthStatus.HEALTHY)
-            return LiftHealth(
-                id_=id_,
-                health_status=HealthStatus.DEAD,
-                health_message="heartbeat failed",
-            )
-
-        def watch(id_: str, obs: Observable):
-            lift_mode_health = obs.pipe(
-                ops.map(cast(Any, self.lift_mode_to_health)),
-                ops.distinct_until_changed(),
-            )
-            obs.pipe(
-                heartbeat(self.LIVELINESS),
-                ops.map(
-                    cast(Any, lambda has_heartbeat: to_lift_health(id_, has_heartbeat))
-                ),
-                self._combine_most_critical(lift_mode_health),
-            ).subscribe(self.rmf.lift_health.on_next, scheduler=self.scheduler)
-
-        ttm_map = await ttm.BuildingMap.get_or_none()
-        if ttm_map is None:
-            lifts = []
-        else:
-            building_map = BuildingMap.from_tortoise(ttm_map)
-            lifts = building_map.lifts
+    async def _watch_lift_health(self, building_map: Optional[IndexedBuildingMap]):
+        lifts = [] if building_map is None else building_map.lifts
         states_list = [LiftState.from_tortoise(x) for x in await ttm.LiftState.all()]
         lift_states = {state.lift_name: state for state in states_list}
         initial_states = {lift.name: lift_states.get(lift.name, None) for lift in lifts}
 
-        subjects: Dict[str, BehaviorSubject] = {
-            id_: BehaviorSubject(state) for id_, state in initial_states.items()
-        }
-        for id_, subject in subjects.items():
-            watch(id_, subject)
+        for id_, state in initial_states.items():
+            self._lifts.on_state(id_, state)
 
         def on_state(state: LiftState):
-            if state.lift_name not in subjects:
-                subjects[state.lift_name] = BehaviorSubject(state)
-                watch(state.lift_name, subjects[state.lift_name])
-            else:
-                subjects[state.lift_name].on_next(state)
+            self._lifts.on_state(state.lift_name, state)
 
-        self.rmf.lift_states.subscribe(on_state)
+        self._subscriptions.append(self.rmf.lift_states.subscribe(on_state))
 
     @staticmethod
     def dispenser_mode_to_health(state: Optional[DispenserState]):
@@ -252,31 +380,6 @@ class HealthWatchdog:
         )
 
     async def _watch_dispenser_health(self):
-        def to_dispenser_health(id_: str, has_heartbeat: bool):
-            if has_heartbeat:
-                return DispenserHealth(id_=id_, health_status=HealthStatus.HEALTHY)
-            return DispenserHealth(
-                id_=id_,
-                health_status=HealthStatus.DEAD,
-                health_message="heartbeat failed",
-            )
-
-        def watch(id_: str, obs: Observable):
-            dispenser_mode_health = obs.pipe(
-                ops.map(cast(Any, self.dispenser_mode_to_health)),
-                ops.distinct_until_changed(),
-            )
-            obs.pipe(
-                heartbeat(self.LIVELINESS),
-                ops.map(
-                    cast(
-                        Any,
-                        lambda has_heartbeat: to_dispenser_health(id_, has_heartbeat),
-                    )
-                ),
-                self._combine_most_critical(dispenser_mode_health),
-            ).subscribe(self.rmf.dispenser_health.on_next, scheduler=self.scheduler)
-
         states_list = [
             DispenserState.from_tortoise(x) for x in await ttm.DispenserState.all()
         ]
@@ -287,20 +390,13 @@ class HealthWatchdog:
             for dispenser in dispensers
         }
 
-        subjects: Dict[str, BehaviorSubject] = {
-            id_: BehaviorSubject(state) for id_, state in initial_states.items()
-        }
-        for id_, subject in subjects.items():
-            watch(id_, subject)
+        for id_, state in initial_states.items():
+            self._dispensers.on_state(id_, state)
 
         def on_state(state: DispenserState):
-            if state.guid not in subjects:
-                subjects[state.guid] = BehaviorSubject(state)
-                watch(state.guid, subjects[state.guid])
-            else:
-                subjects[state.guid].on_next(state)
+            self._dispensers.on_state(state.guid, state)
 
-        self.rmf.dispenser_states.subscribe(on_state)
+        self._subscriptions.append(self.rmf.dispenser_states.subscribe(on_state))
 
     @staticmethod
     def ingestor_mode_to_health(state: IngestorState):
@@ -325,31 +421,6 @@ class HealthWatchdog:
         )
 
     async def _watch_ingestor_health(self):
-        def to_ingestor_health(id_: str, has_heartbeat: bool):
-            if has_heartbeat:
-                return IngestorHealth(id_=id_, health_status=HealthStatus.HEALTHY)
-            return IngestorHealth(
-                id_=id_,
-                health_status=HealthStatus.DEAD,
-                health_message="heartbeat failed",
-            )
-
-        def watch(id_: str, obs: Observable):
-            ingestor_mode_health = obs.pipe(
-                ops.map(cast(Any, self.ingestor_mode_to_health)),
-                ops.distinct_until_changed(),
-            )
-            obs.pipe(
-                heartbeat(self.LIVELINESS),
-                ops.map(
-                    cast(
-                        Any,
-                        lambda has_heartbeat: to_ingestor_health(id_, has_heartbeat),
-                    )
-                ),
-                self._combine_most_critical(ingestor_mode_health),
-            ).subscribe(self.rmf.ingestor_health.on_next, scheduler=self.scheduler)
-
         states_list = [
             IngestorState.from_tortoise(x) for x in await ttm.IngestorState.all()
         ]
@@ -360,20 +431,13 @@ class HealthWatchdog:
             for ingestor in ingestors
         }
 
-        subjects: Dict[str, BehaviorSubject] = {
-            id_: BehaviorSubject(state) for id_, state in initial_states.items()
-        }
-        for id_, subject in subjects.items():
-            watch(id_, subject)
+        for id_, state in initial_states.items():
+            self._ingestors.on_state(id_, state)
 
         def on_state(state: IngestorState):
-            if state.guid not in subjects:
-                subjects[state.guid] = BehaviorSubject(state)
-                watch(state.guid, subjects[state.guid])
-            else:
-                subjects[state.guid].on_next(state)
+            self._ingestors.on_state(state.guid, state)
 
-        self.rmf.ingestor_states.subscribe(on_state)
+        self._subscriptions.append(self.rmf.ingestor_states.subscribe(on_state))
 
     @staticmethod
     def robot_mode_to_health(id_: Optional[str], state: Optional[RobotState]):
@@ -412,55 +476,20 @@ class HealthWatchdog:
         )
 
     async def _watch_robot_health(self):
-        def to_robot_health(id_: str, has_heartbeat: bool):
-            if has_heartbeat:
-                return RobotHealth(
-                    id_=id_,
-                    health_status=HealthStatus.HEALTHY,
-                )
-            return RobotHealth(
-                id_=id_,
-                health_status=HealthStatus.DEAD,
-                health_message="heartbeat failed",
-            )
-
-        def watch(id_: str, obs: Observable):
-            """
-            :param obs: Observable[RobotState]
-            """
-            robot_mode_health = obs.pipe(
-                ops.map(cast(Any, lambda state: self.robot_mode_to_health(id_, state))),
-                ops.distinct_until_changed(),
-            )
-            obs.pipe(
-                heartbeat(self.LIVELINESS),
-                ops.map(cast(Any, lambda x: to_robot_health(id_, x))),
-                self._combine_most_critical(robot_mode_health),
-            ).subscribe(self.rmf.robot_health.on_next, scheduler=self.scheduler)
-
         fleet_states = [FleetState.from_tortoise(x) for x in await ttm.FleetState.all()]
         initial_states = {s.name: s for s in fleet_states}
 
-        subjects: Dict[str, BehaviorSubject] = {}
         for fleet_state in initial_states.values():
             fleet_state: FleetState
             for robot_state in fleet_state.robots:
                 robot_state: RobotState
                 robot_id = f"{fleet_state.name}/{robot_state.name}"
-                subjects[robot_id] = BehaviorSubject(None)
-
-        for id_, subject in subjects.items():
-            watch(id_, subject)
+                self._robots.on_state(robot_id, None)
 
         def on_state(fleet_state: FleetState):
             for robot_state in fleet_state.robots:
                 robot_state: RobotState
                 robot_id = f"{fleet_state.name}/{robot_state.name}"
+                self._robots.on_state(robot_id, robot_state)
 
-                if robot_id not in subjects:
-                    subjects[robot_id] = BehaviorSubject(robot_state)
-                    watch(robot_id, subjects[robot_id])
-                else:
-                    subjects[robot_id].on_next(robot_state)
-
-        self.rmf.fleet_states.subscribe(on_state)
+        self._subscriptions.append(self.rmf.fleet_states.subscribe(on_state))
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from rx import operators as ops
+from rx.core.observable.observable import Observable
+from rx.core.typing import Disposable
+from rx.scheduler.eventloop.asyncioscheduler import AsyncIOScheduler
+from rx.scheduler.scheduler import Scheduler
+from rx.subject.subject import Subject
+
+from .bridge import LoopBridge, OverflowPolicy
+from .events import RmfEvents
+from .operators import CoalesceStats, coalesce
+from .topics import topics
+
+
+class RmfIngest:
+    """
+    Sits between the gateway and `RmfEvents`. The gateway publishes to `raw_events` from
+    any thread, the events are passed to the event loop through a `LoopBridge` so that all
+    further processing happens on the loop thread.
+    States are coalesced by their entity id and forwarded to `rmf_events` at most at the
+    configured rate, intermediate states are dropped. Topics without a rate are forwarded
+    as is.
+    """
+
+    KEY_MAPPERS: Dict[str, Callable[[Any], str]] = {
+        topics.door_states: lambda x: x.door_name,
+        topics.lift_states: lambda x: x.lift_name,
+        topics.dispenser_states: lambda x: x.guid,
+        topics.ingestor_states: lambda x: x.guid,
+        topics.fleet_states: lambda x: x.name,
+    }
+
+    TOPICS = [
+        topics.door_states,
+        topics.lift_states,
+        topics.dispenser_states,
+        topics.ingestor_states,
+        topics.fleet_states,
+        topics.task_summaries,
+        topics.building_map,
+    ]
+
+    def __init__(
+        self,
+        rmf_events: RmfEvents,
+        max_rates: Dict[str, Optional[float]],
+        *,
+        queue_size: int = 1000,
+        overflow_policy: str = OverflowPolicy.DROP_OLDEST,
+        scheduler: Optional[Scheduler] = None,
+        logger: logging.Logger = None,
+    ):
+        """
+        :param max_rates: Max rate (in hz) that each topic is forwarded at, keyed by the
+            topic name. A rate of `None` or a topic that is not in the dict is not
+            coalesced.
+        :param queue_size: Size of the queue between the gateway and the event loop.
+        :param overflow_policy: See `LoopBridge`.
+        :param scheduler: Scheduler used to forward the coalesced states, defaults to an
+            `AsyncIOScheduler` on the current loop.
+        """
+        self.rmf = rmf_events
+        self.raw_events = RmfEvents()
+        self.max_rates = max_rates
+        self.queue_size = queue_size
+        self.overflow_policy = overflow_policy
+        self.scheduler = scheduler
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self.stats: Dict[str, CoalesceStats] = {}
+        self.bridge: Optional[LoopBridge] = None
+        self._bridged: Dict[str, Subject] = {}
+        self._subscriptions: List[Disposable] = []
+
+    async def start(self):
+        loop = asyncio.get_event_loop()
+        scheduler = self.scheduler or AsyncIOScheduler(loop)
+        bridge = LoopBridge(
+            loop,
+            lambda topic, x: self._bridged[topic].on_next(x),
+            maxsize=self.queue_size,
+            overflow_policy=self.overflow_policy,
+            logger=self.logger.getChild("LoopBridge"),
+        )
+        self.bridge = bridge
+
+        for topic in self.TOPICS:
+            self._bridged[topic] = Subject()
+            key_mapper = self.KEY_MAPPERS.get(topic)
+            raw: Observable = getattr(self.raw_events, topic)
+            if topic == topics.building_map:
+                # `building_map` is a `BehaviorSubject`, skip the initial `None`.
+                raw = raw.pipe(ops.filter(lambda x: x is not None))
+            self._subscriptions.append(
+                raw.subscribe(self._make_put(bridge, topic, key_mapper))
+            )
+
+            source: Observable = self._bridged[topic]
+            target = getattr(self.rmf, topic)
+            rate = self.max_rates.get(topic)
+            if rate and key_mapper:
+                self.stats[topic] = CoalesceStats()
+                source = source.pipe(coalesce(key_mapper, 1 / rate, self.stats[topic]))
+                self.logger.info(f"coalescing {topic} at {rate} hz")
+            self._subscriptions.append(
+                source.subscribe(target.on_next, scheduler=scheduler)
+            )
+
+    def stop(self):
+        if self.bridge is not None:
+            self.bridge.close()
+            self.bridge = None
+        for sub in self._subscriptions:
+            sub.dispose()
+        self._subscriptions.clear()
+
+    @staticmethod
+    def _make_put(
+        bridge: LoopBridge, topic: str, key_mapper: Optional[Callable[[Any], str]]
+    ):
+        if key_mapper is None:
+            return lambda x: bridge.put(topic, x)
+        return lambda x: bridge.put(topic, x, key_mapper(x))
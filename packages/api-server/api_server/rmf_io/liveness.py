@@ -0,0 +1,119 @@
+import math
+import threading
+from typing import Callable, Dict, Hashable, Optional, Set
+
+from rx.core.typing import Disposable
+from rx.scheduler import TimeoutScheduler
+from rx.scheduler.periodicscheduler import PeriodicScheduler
+
+
+class LivenessTracker:
+    """
+    Tracks if entities are alive, an entity is alive when it is seen within `timeout`
+    seconds. Instead of a timer for each entity, the deadlines are kept in a hashed timer
+    wheel with slots of `resolution` seconds that is advanced by a single periodic tick. An
+    entity is declared dead between `timeout` and `timeout + resolution` seconds after it
+    was last seen.
+
+    `on_change(key, alive)` is called when an entity is first seen and whenever it changes
+    between alive and dead.
+    """
+
+    def __init__(
+        self,
+        timeout: float,
+        on_change: Callable[[Hashable, bool], None],
+        *,
+        resolution: float = 1,
+        scheduler: Optional[PeriodicScheduler] = None,
+        lock: Optional[threading.RLock] = None,
+    ):
+        """
+        :param lock: Share a lock between trackers whose `on_change` use each other.
+        """
+        self.timeout = timeout
+        self.resolution = resolution
+        self.on_change = on_change
+        self.scheduler = scheduler or TimeoutScheduler.singleton()
+        # the slot of the deadline of each entity, entities that are dead have no deadline
+        self._deadlines: Dict[Hashable, Optional[int]] = {}
+        # slot -> entities that may expire in the slot, entries are not removed when an
+        # entity is seen again, they are skipped if the deadline of the entity has moved.
+        self._wheel: Dict[int, Set[Hashable]] = {}
+        self._next_slot = self._slot(self._now())
+        # on_change is called while holding the lock so that the changes of an entity are
+        # always delivered in order, hold it to update the entities consistently with
+        # their liveness.
+        self.lock = lock or threading.RLock()
+        self._ticker: Optional[Disposable] = None
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def __contains__(self, key: Hashable):
+        return key in self._deadlines
+
+    def _now(self) -> float:
+        return self.scheduler.to_seconds(self.scheduler.now)
+
+    def _slot(self, t: float) -> int:
+        return math.floor(t / self.resolution)
+
+    def is_alive(self, key: Hashable) -> Optional[bool]:
+        """
+        Returns None if the entity is not tracked.
+        """
+        if key not in self._deadlines:
+            return None
+        return self._deadlines[key] is not None
+
+    def touch(self, key: Hashable) -> None:
+        """
+        Marks an entity as seen now.
+        """
+        slot = math.ceil((self._now() + self.timeout) / self.resolution)
+        with self.lock:
+            prev = self._deadlines.get(key, None)
+            if prev == slot:
+                return
+            was_alive = prev is not None
+            self._deadlines[key] = slot
+            self._wheel.setdefault(slot, set()).add(key)
+            if not was_alive:
+                self.on_change(key, True)
+
+    def remove(self, key: Hashable) -> None:
+        """
+        Stops tracking an entity, `on_change` is not called.
+        """
+        with self.lock:
+            self._deadlines.pop(key, None)
+
+    def tick(self) -> None:
+        """
+        Declares the entities whose deadline has passed as dead. This is called
+        periodically after `start`.
+        """
+        due = self._slot(self._now())
+        with self.lock:
+            if due - self._next_slot > len(self._wheel):
+                # skip the empty slots after a long pause
+                slots = sorted(s for s in self._wheel if s <= due)
+            else:
+                slots = range(self._next_slot, due + 1)
+            self._next_slot = due + 1
+            for slot in slots:
+                for key in self._wheel.pop(slot, ()):
+                    if self._deadlines.get(key, None) == slot:
+                        self._deadlines[key] = None
+                        self.on_change(key, False)
+
+    def start(self):
+        self._ticker = self.scheduler.schedule_periodic(
+            self.resolution, lambda _: self.tick()
+        )
+
+    def stop(self):
+        if self._ticker is not None:
+            self._ticker.dispose()
+            self._ticker = None
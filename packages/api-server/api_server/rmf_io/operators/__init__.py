@@ -1,3 +1,4 @@
+from .coalesce import CoalesceStats, coalesce
 from .grouped_sample import grouped_sample
 from .health import most_critical
 from .heartbeat import heartbeat
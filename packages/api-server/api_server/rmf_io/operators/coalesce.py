@@ -0,0 +1,68 @@
+import threading
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional, Union
+
+from rx.core.observable.observable import Observable
+from rx.core.typing import Observer, Scheduler
+from rx.disposable import CompositeDisposable
+from rx.scheduler import TimeoutScheduler
+
+
+@dataclass
+class CoalesceStats:
+    received: int = 0
+    forwarded: int = 0
+    dropped: int = 0
+
+
+def coalesce(
+    key_mapper: Callable[[Any], str],
+    interval: Union[timedelta, float],
+    stats: CoalesceStats,
+) -> Callable[[Observable], Observable]:
+    """
+    Keeps the latest item of each key and forwards them every `interval`, in the order
+    that their keys were first received. An item is dropped when it is replaced by a
+    newer item with the same key before it is forwarded, and stats of the items
+    received, forwarded and dropped are kept in `stats`.
+
+    There is one periodic timer for all the keys, and a key is forgotten once its item
+    is forwarded, so keys that are no longer received do not cost anything.
+    """
+
+    def _coalesce(source: Observable) -> Observable:
+        def subscribe(observer: Observer, scheduler: Optional[Scheduler] = None):
+            _scheduler = scheduler or TimeoutScheduler.singleton()
+            lock = threading.RLock()
+            latest: Dict[str, Any] = {}
+
+            def on_next(x):
+                key = key_mapper(x)
+                with lock:
+                    stats.received += 1
+                    if key in latest:
+                        stats.dropped += 1
+                    latest[key] = x
+
+            def flush(_state=None):
+                with lock:
+                    values = list(latest.values())
+                    latest.clear()
+                    stats.forwarded += len(values)
+                for x in values:
+                    observer.on_next(x)
+
+            def on_completed():
+                flush()
+                observer.on_completed()
+
+            periodic = _scheduler.schedule_periodic(interval, flush)
+            subscription = source.subscribe_(
+                on_next, observer.on_error, on_completed, scheduler
+            )
+            return CompositeDisposable(periodic, subscription)
+
+        return Observable(subscribe)
+
+    return _coalesce
@@ -0,0 +1,71 @@
+import unittest
+
+from rx.scheduler.historicalscheduler import HistoricalScheduler
+from rx.subject.subject import Subject
+
+from .coalesce import CoalesceStats, coalesce
+
+
+class TestCoalesce(unittest.TestCase):
+    def test_coalesce(self):
+        subject = Subject()
+
+        result = []
+        stats = CoalesceStats()
+        scheduler = HistoricalScheduler()
+        subject.pipe(coalesce(lambda x: x[0], 10, stats)).subscribe(
+            result.append, scheduler=scheduler
+        )
+
+        subject.on_next(("key", "first"))
+        subject.on_next(("key_2", "first_2"))
+        scheduler.advance_by(5)
+        subject.on_next(("key", "second"))
+        scheduler.advance_by(5)
+
+        # check that only the latest of each key is returned
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result[0][1], "second")
+        self.assertEqual(result[1][1], "first_2")
+        self.assertEqual(stats.received, 3)
+        self.assertEqual(stats.forwarded, 2)
+        self.assertEqual(stats.dropped, 1)
+
+        # a key that was sampled is no longer pending
+        subject.on_next(("key", "third"))
+        scheduler.advance_by(10)
+        self.assertEqual(len(result), 3)
+        self.assertEqual(result[2][1], "third")
+        self.assertEqual(stats.dropped, 1)
+
+    def test_one_timer_for_all_keys(self):
+        subject = Subject()
+        result = []
+        scheduler = HistoricalScheduler()
+        subject.pipe(coalesce(lambda x: x[0], 10, CoalesceStats())).subscribe(
+            result.append, scheduler=scheduler
+        )
+        for i in range(100):
+            subject.on_next((f"key_{i}", i))
+        # pylint: disable=protected-access
+        self.assertEqual(len(scheduler._queue), 1)
+        scheduler.advance_by(10)
+        self.assertEqual([x[1] for x in result], list(range(100)))
+        # forwarded keys are forgotten, nothing is forwarded again
+        scheduler.advance_by(10)
+        self.assertEqual(len(result), 100)
+
+    def test_forwards_pending_items_on_completion(self):
+        subject = Subject()
+        result = []
+        completed = []
+        scheduler = HistoricalScheduler()
+        subject.pipe(coalesce(lambda x: x[0], 10, CoalesceStats())).subscribe(
+            result.append,
+            on_completed=lambda: completed.append(True),
+            scheduler=scheduler,
+        )
+        subject.on_next(("key", "first"))
+        subject.on_completed()
+        self.assertEqual(result, [("key", "first")])
+        self.assertEqual(completed, [True])
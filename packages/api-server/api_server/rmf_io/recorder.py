@@ -0,0 +1,110 @@
+import gzip
+import json
+import logging
+import threading
+import time
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+from rx.core.typing import Disposable
+
+from api_server.models import (
+    BuildingMap,
+    DispenserState,
+    DoorState,
+    FleetState,
+    IngestorState,
+    LiftState,
+    TaskSummary,
+)
+
+from .events import RmfEvents
+from .topics import topics
+
+RECORDED_TOPICS: Dict[str, Type[BaseModel]] = {
+    topics.door_states: DoorState,
+    topics.lift_states: LiftState,
+    topics.dispenser_states: DispenserState,
+    topics.ingestor_states: IngestorState,
+    topics.fleet_states: FleetState,
+    topics.task_summaries: TaskSummary,
+    topics.building_map: BuildingMap,
+}
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")  # type: ignore
+    return open(path, mode, encoding="utf-8")
+
+
+def read_recording(path: str) -> Iterator[Tuple[float, str, BaseModel]]:
+    """
+    Reads a recording made by `RmfRecorder`.
+
+    :return: Iterator of (timestamp, topic, model)
+    """
+    with _open(path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            timestamp, topic, data = json.loads(line)
+            yield timestamp, topic, RECORDED_TOPICS[topic].parse_obj(data)
+
+
+class RmfRecorder:
+    """
+    Records the states, task summaries and building map that flow through `RmfEvents` to
+    an append-only file. Each line of the file is a json array of
+    `[timestamp, topic, data]`, the file is gzipped if the path ends with ".gz".
+    Events can be published from any thread.
+    """
+
+    def __init__(
+        self,
+        rmf_events: RmfEvents,
+        path: str,
+        *,
+        logger: logging.Logger = None,
+    ):
+        self.rmf = rmf_events
+        self.path = path
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self.recorded = 0
+        self._file: Optional[IO[str]] = None
+        self._lock = threading.Lock()
+        self._subscriptions: List[Disposable] = []
+
+    def start(self):
+        self._file = _open(self.path, "a")
+        for topic in RECORDED_TOPICS:
+            self._subscriptions.append(
+                getattr(self.rmf, topic).subscribe(self._make_record(topic))
+            )
+        self.logger.info(f'recording to "{self.path}"')
+
+    def stop(self):
+        for sub in self._subscriptions:
+            sub.dispose()
+        self._subscriptions.clear()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        self.logger.info(f'recorded {self.recorded} events to "{self.path}"')
+
+    def _make_record(self, topic: str):
+        def record(model: Any):
+            if model is None:
+                return
+            line = json.dumps(
+                [round(time.time(), 6), topic, model.dict()], separators=(",", ":")
+            )
+            with self._lock:
+                if self._file is None:
+                    return
+                self._file.write(line)
+                self._file.write("\n")
+                self.recorded += 1
+
+        return record
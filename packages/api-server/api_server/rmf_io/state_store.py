@@ -0,0 +1,157 @@
+import secrets
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from rx.core.typing import Disposable
+
+from api_server.fast_io import EncodedJson
+from api_server.logger import dumps
+
+from .building_map_cache import BuildingMapCache
+from .events import RmfEvents
+from .topics import topics
+
+
+class RmfStateStore:
+    """
+    Keeps the latest state and health of each entity in memory, fed by `RmfEvents`. It is
+    warmed up by the states that the app loads from the database on startup, so reads can
+    be served without querying the database. The building map is kept parsed and indexed
+    in `building_map`.
+
+    Each entity and each topic has a version that increases whenever a value of it is
+    stored, it can be used as an ETag.
+
+    The json encoding of the latest value of each entity is cached, so a value is only
+    encoded once no matter how many clients it is sent to.
+    """
+
+    KEY_MAPPERS: Dict[str, Callable[[Any], str]] = {
+        topics.door_states: lambda x: x.door_name,
+        topics.door_health: lambda x: x.id_,
+        topics.lift_states: lambda x: x.lift_name,
+        topics.lift_health: lambda x: x.id_,
+        topics.dispenser_states: lambda x: x.guid,
+        topics.dispenser_health: lambda x: x.id_,
+        topics.ingestor_states: lambda x: x.guid,
+        topics.ingestor_health: lambda x: x.id_,
+        topics.fleet_states: lambda x: x.name,
+        topics.robot_health: lambda x: x.id_,
+    }
+
+    def __init__(self, rmf_events: RmfEvents):
+        self.rmf = rmf_events
+        self._stores: Dict[str, Dict[str, Any]] = {
+            topic: {} for topic in self.KEY_MAPPERS
+        }
+        self.building_map = BuildingMapCache(rmf_events)
+        self._subscriptions: List[Disposable] = []
+        # versions are only comparable within a process, the epoch makes sure that the
+        # etags from before a restart do not match.
+        self._epoch = secrets.token_hex(4)
+        self._version = 0
+        self._versions: Dict[str, Dict[str, int]] = {
+            topic: {} for topic in self.KEY_MAPPERS
+        }
+        self._topic_versions: Dict[str, int] = {topic: 0 for topic in self.KEY_MAPPERS}
+        self._encoded: Dict[str, Dict[str, Tuple[Any, EncodedJson]]] = {
+            topic: {} for topic in self.KEY_MAPPERS
+        }
+
+    def start(self):
+        self.building_map.start()
+        for topic, key_mapper in self.KEY_MAPPERS.items():
+            self._subscriptions.append(
+                getattr(self.rmf, topic).subscribe(self._make_put(topic, key_mapper))
+            )
+
+    def stop(self):
+        self.building_map.stop()
+        for sub in self._subscriptions:
+            sub.dispose()
+        self._subscriptions.clear()
+
+    def _make_put(self, topic: str, key_mapper: Callable[[Any], str]):
+        store = self._stores[topic]
+
+        def put(x):
+            key = key_mapper(x)
+            store[key] = x
+            self._bump(topic, key)
+
+        return put
+
+    def _bump(self, topic: str, key: str):
+        self._version += 1
+        self._versions[topic][key] = self._version
+        self._topic_versions[topic] = self._version
+
+    def get(self, topic: str, key: str) -> Optional[Any]:
+        return self._stores[topic].get(key, None)
+
+    def put_if_absent(self, topic: str, value: Any) -> Any:
+        """
+        Stores a value that is read from somewhere else, e.g. the database, unless there is
+        already a (newer) value for the entity. Returns the value in the store.
+        """
+        key = self.KEY_MAPPERS[topic](value)
+        store = self._stores[topic]
+        if key not in store:
+            store[key] = value
+            self._bump(topic, key)
+        return store[key]
+
+    def remove(self, topic: str, key: str) -> Optional[Any]:
+        """
+        Forgets an entity, e.g. when it is removed from the database. Returns the value
+        that was stored, None if there was none.
+        """
+        value = self._stores[topic].pop(key, None)
+        self._encoded[topic].pop(key, None)
+        if self._versions[topic].pop(key, None) is not None:
+            # the etag of the topic must change when one of its entities is removed
+            self._version += 1
+            self._topic_versions[topic] = self._version
+        return value
+
+    def keys(self, topic: str) -> List[str]:
+        return list(self._stores[topic])
+
+    def values(self, topic: str) -> List[Any]:
+        return list(self._stores[topic].values())
+
+    def version(self, topic: str, key: Optional[str] = None) -> int:
+        """
+        The version of an entity, or of the topic if `key` is None. 0 if nothing is
+        stored.
+        """
+        if key is None:
+            return self._topic_versions[topic]
+        return self._versions[topic].get(key, 0)
+
+    def etag(self, topic: str, key: Optional[str] = None) -> Optional[str]:
+        version = self.version(topic, key)
+        if version == 0:
+            return None
+        return f'"{self._epoch}-{version}"'
+
+    def encode(self, topic: str, value: Any) -> EncodedJson:
+        """
+        Encodes a value of a topic to json. The encoding is cached until a different
+        value of the same entity is encoded.
+        """
+        key = self.KEY_MAPPERS[topic](value)
+        cache = self._encoded[topic]
+        cached = cache.get(key)
+        # values are never modified after they are published, so the identity of a value
+        # is enough to tell if the encoding is up to date.
+        if cached is not None and cached[0] is value:
+            return cached[1]
+        encoded = EncodedJson(dumps(value.dict()))
+        cache[key] = (value, encoded)
+        return encoded
+
+    def get_encoded(self, topic: str, key: str) -> Optional[EncodedJson]:
+        value = self.get(topic, key)
+        if value is None:
+            return None
+        return self.encode(topic, value)
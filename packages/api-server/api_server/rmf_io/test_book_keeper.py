@@ -17,6 +17,7 @@ from api_server.models import (
     LiftHealth,
     LiftState,
     RobotHealth,
+    RobotState,
     TaskSummary,
 )
 from api_server.models import tortoise_models as ttm
@@ -263,6 +264,36 @@ class TestRmfBookKeeper(unittest.IsolatedAsyncioTestCase):
         self.assertIsNotNone(result)
         self.assertEqual(len(result.robots), 0)
 
+    async def test_write_robot_states(self):
+        state = test_data.make_fleet_state("test_fleet")
+        state.robots = [
+            test_data.make_robot_state("test_robot"),
+            test_data.make_robot_state("test_robot_2"),
+        ]
+        self.rmf.fleet_states.on_next(state)
+
+        async def get():
+            return await ttm.RobotState.filter(fleet_name="test_fleet").count()
+
+        result = await async_try_until(get, lambda x: x == 2, 1, 0.02)
+        self.assertEqual(result, 2)
+
+        state.robots[0].battery_percent = 50.0
+        self.rmf.fleet_states.on_next(state)
+
+        async def get_robot():
+            return RobotState.from_tortoise(
+                await ttm.RobotState.get(
+                    fleet_name="test_fleet", robot_name="test_robot"
+                )
+            )
+
+        robot = await async_try_until(
+            get_robot, lambda x: x.battery_percent == 50.0, 1, 0.02
+        )
+        self.assertEqual(robot.battery_percent, 50.0)
+        self.assertEqual(await get(), 2)
+
     async def test_write_robot_health(self):
         self.rmf.robot_health.on_next(
             RobotHealth(
@@ -312,3 +343,151 @@ class TestRmfBookKeeper(unittest.IsolatedAsyncioTestCase):
         )
         self.assertIsNotNone(result)
         self.assertEqual(result.status, "test_status_2")
+
+
+class TestRmfBookKeeperWriteBehind(TestRmfBookKeeper):
+    """
+    Runs the same tests with write behind enabled.
+    """
+
+    async def asyncSetUp(self):
+        await init_db()
+
+        self.rmf = RmfEvents()
+        logger = logging.Logger("test", level="CRITICAL")
+        self.book_keeper = RmfBookKeeper(self.rmf, flush_interval=0.01, logger=logger)
+        await self.book_keeper.start()
+
+
+class TestRmfBookKeeperSaturated(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await init_db()
+
+        self.rmf = RmfEvents()
+        logger = logging.Logger("test", level="CRITICAL")
+        self.book_keeper = RmfBookKeeper(
+            self.rmf, high_water_mark=2, low_water_mark=1, logger=logger
+        )
+        await self.book_keeper.start()
+
+    async def asyncTearDown(self):
+        await self.book_keeper.stop()
+        await Tortoise.close_connections()
+
+    async def test_building_map_and_task_summary_are_not_dropped(self):
+        # the writes are queued synchronously, the queue cannot drain in between
+        for i in range(3):
+            self.rmf.door_states.on_next(test_data.make_door_state(f"door_{i}"))
+        self.assertTrue(self.book_keeper.write_queue.saturated)
+        self.rmf.building_map.on_next(test_data.make_building_map())
+        self.rmf.task_summaries.on_next(test_data.make_task_summary("test_task"))
+        self.assertEqual(self.book_keeper.write_queue.stats.dropped, 1)
+
+        async def get_map():
+            return await ttm.BuildingMap.get_or_none(id_="test_name")
+
+        async def get_task():
+            return await ttm.TaskSummary.get_or_none(id_="test_task")
+
+        self.assertIsNotNone(
+            await async_try_until(get_map, lambda x: x is not None, 1, 0.02)
+        )
+        self.assertIsNotNone(
+            await async_try_until(get_task, lambda x: x is not None, 1, 0.02)
+        )
+
+
+class TestRmfBookKeeperSkipUnchanged(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await init_db()
+
+        self.rmf = RmfEvents()
+        logger = logging.Logger("test", level="CRITICAL")
+        self.book_keeper = RmfBookKeeper(
+            self.rmf, skip_unchanged={"door_states": ["door_time"]}, logger=logger
+        )
+        await self.book_keeper.start()
+
+    async def asyncTearDown(self):
+        await self.book_keeper.stop()
+        await Tortoise.close_connections()
+
+    async def test_skip_unchanged_door_state(self):
+        state = test_data.make_door_state("test_door")
+        self.rmf.door_states.on_next(state)
+        state = test_data.make_door_state("test_door")
+        state.door_time.sec = 1
+        self.rmf.door_states.on_next(state)
+        stats = self.book_keeper.persist_stats["door_states"]
+        self.assertEqual(stats.written, 1)
+        self.assertEqual(stats.skipped, 1)
+
+        state = test_data.make_door_state("test_door", DoorMode.MODE_OPEN)
+        self.rmf.door_states.on_next(state)
+        self.assertEqual(stats.written, 2)
+
+        async def get():
+            return DoorState.from_tortoise(await ttm.DoorState.get(id_="test_door"))
+
+        result = await async_try_until(
+            get, lambda x: x.current_mode.value == DoorMode.MODE_OPEN, 1, 0.02
+        )
+        self.assertEqual(result.current_mode.value, DoorMode.MODE_OPEN)
+
+
+class TestRmfBookKeeperLogPolicies(unittest.IsolatedAsyncioTestCase):
+    class _Records(logging.Handler):
+        def __init__(self):
+            super().__init__()
+            self.records = []
+
+        def emit(self, record):
+            self.records.append(record)
+
+    async def asyncSetUp(self):
+        await init_db()
+
+        self.rmf = RmfEvents()
+        # a logger of its own, the child loggers of "test" are shared with the other
+        # tests, which disable them.
+        self.logger = logging.getLogger(f"test_log_policies.{self._testMethodName}")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        self.records = self._Records()
+        self.logger.addHandler(self.records)
+        self.book_keeper = RmfBookKeeper(
+            self.rmf,
+            skip_unchanged={"door_states": ["door_time"]},
+            log_policies={"door_states": "on_change", "lift_states": "sample:3600"},
+            logger=self.logger,
+        )
+        await self.book_keeper.start()
+
+    async def asyncTearDown(self):
+        await self.book_keeper.stop()
+        await Tortoise.close_connections()
+        self.logger.removeHandler(self.records)
+
+    def logged(self, name: str):
+        return [r for r in self.records.records if r.name.endswith(name)]
+
+    async def test_log_on_change(self):
+        state = test_data.make_door_state("test_door")
+        self.rmf.door_states.on_next(state)
+        state = test_data.make_door_state("test_door")
+        state.door_time.sec = 1
+        self.rmf.door_states.on_next(state)
+        self.assertEqual(len(self.logged("door_state")), 1)
+        self.rmf.door_states.on_next(
+            test_data.make_door_state("test_door", DoorMode.MODE_OPEN)
+        )
+        self.assertEqual(len(self.logged("door_state")), 2)
+
+    async def test_log_sampled(self):
+        for floor in ("L1", "L2"):
+            state = test_data.make_lift_state("test_lift")
+            state.current_floor = floor
+            self.rmf.lift_states.on_next(state)
+        self.assertEqual(len(self.logged("lift_state")), 1)
+        self.rmf.lift_states.on_next(test_data.make_lift_state("test_lift_2"))
+        self.assertEqual(len(self.logged("lift_state")), 2)
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import threading
+import unittest
+
+from .bridge import LoopBridge, OverflowPolicy
+
+
+class TestLoopBridge(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.loop = asyncio.get_event_loop()
+        self.result = []
+
+    def handler(self, topic, item):
+        self.result.append((topic, item))
+
+    async def test_delivers_in_batches(self):
+        bridge = LoopBridge(self.loop, self.handler)
+        for i in range(10):
+            bridge.put("topic", i)
+        self.assertEqual(bridge.depth, 10)
+        await asyncio.sleep(0)
+        self.assertEqual(self.result, [("topic", i) for i in range(10)])
+        self.assertEqual(bridge.depth, 0)
+        self.assertEqual(bridge.stats.batches, 1)
+        self.assertEqual(bridge.stats.delivered, 10)
+
+    async def test_drop_oldest(self):
+        bridge = LoopBridge(
+            self.loop,
+            self.handler,
+            maxsize=2,
+            overflow_policy=OverflowPolicy.DROP_OLDEST,
+        )
+        bridge.put("topic", "a1", "a")
+        bridge.put("topic", "b1", "b")
+        # replaces the queued item with the same key
+        bridge.put("topic", "b2", "b")
+        # no queued item with the same key, drops the oldest item
+        bridge.put("topic", "c1", "c")
+        await asyncio.sleep(0)
+        self.assertEqual(self.result, [("topic", "b2"), ("topic", "c1")])
+        self.assertEqual(bridge.stats.replaced, 1)
+        self.assertEqual(bridge.stats.dropped, 1)
+
+    async def test_drop_oldest_keeps_items_without_key(self):
+        bridge = LoopBridge(
+            self.loop,
+            self.handler,
+            maxsize=2,
+            overflow_policy=OverflowPolicy.DROP_OLDEST,
+        )
+        bridge.put("building_map", "map1")
+        bridge.put("topic", "a1", "a")
+        # drops the oldest keyed item, not the older item without a key
+        bridge.put("topic", "b1", "b")
+        await asyncio.sleep(0)
+        self.assertEqual(self.result, [("building_map", "map1"), ("topic", "b1")])
+        self.assertEqual(bridge.stats.dropped, 1)
+
+        self.result.clear()
+        bridge.put("building_map", "map2")
+        bridge.put("task_summaries", "task1")
+        # no keyed item to drop, the new keyed item is dropped
+        bridge.put("topic", "c1", "c")
+        await asyncio.sleep(0)
+        self.assertEqual(
+            self.result, [("building_map", "map2"), ("task_summaries", "task1")]
+        )
+        self.assertEqual(bridge.stats.dropped, 2)
+
+    async def test_drop_oldest_blocks_items_without_key(self):
+        bridge = LoopBridge(
+            self.loop,
+            self.handler,
+            maxsize=2,
+            overflow_policy=OverflowPolicy.DROP_OLDEST,
+        )
+
+        def produce():
+            for i in range(5):
+                bridge.put("task_summaries", i)
+
+        thread = threading.Thread(target=produce)
+        thread.start()
+        while thread.is_alive() or bridge.depth > 0:
+            await asyncio.sleep(0.01)
+        thread.join()
+        self.assertEqual(self.result, [("task_summaries", i) for i in range(5)])
+        self.assertEqual(bridge.stats.dropped, 0)
+        self.assertGreater(bridge.stats.blocked, 0)
+
+    async def test_drop_newest(self):
+        bridge = LoopBridge(
+            self.loop,
+            self.handler,
+            maxsize=2,
+            overflow_policy=OverflowPolicy.DROP_NEWEST,
+        )
+        bridge.put("topic", 1)
+        bridge.put("topic", 2)
+        bridge.put("topic", 3)
+        await asyncio.sleep(0)
+        self.assertEqual(self.result, [("topic", 1), ("topic", 2)])
+        self.assertEqual(bridge.stats.dropped, 1)
+
+    async def test_block(self):
+        bridge = LoopBridge(
+            self.loop,
+            self.handler,
+            maxsize=2,
+            overflow_policy=OverflowPolicy.BLOCK,
+        )
+
+        def produce():
+            for i in range(5):
+                bridge.put("topic", i)
+
+        thread = threading.Thread(target=produce)
+        thread.start()
+        while thread.is_alive() or bridge.depth > 0:
+            await asyncio.sleep(0.01)
+        thread.join()
+        self.assertEqual(self.result, [("topic", i) for i in range(5)])
+        self.assertGreater(bridge.stats.blocked, 0)
+
+    async def test_handler_error(self):
+        def handler(topic, item):
+            if item == 1:
+                raise Exception("test")
+            self.result.append((topic, item))
+
+        bridge = LoopBridge(
+            self.loop, handler, logger=logging.Logger("test", level="CRITICAL")
+        )
+        for i in range(3):
+            bridge.put("topic", i)
+        await asyncio.sleep(0)
+        self.assertEqual(self.result, [("topic", 0), ("topic", 2)])
+        self.assertEqual(bridge.stats.delivered, 3)
+
+    async def test_put_after_close(self):
+        bridge = LoopBridge(self.loop, self.handler)
+        bridge.close()
+        bridge.put("topic", 1)
+        await asyncio.sleep(0)
+        self.assertEqual(self.result, [])
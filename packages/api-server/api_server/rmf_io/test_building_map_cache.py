@@ -0,0 +1,56 @@
+import unittest
+
+from tortoise import Tortoise
+
+from api_server.models.ros_pydantic.rmf_building_map_msgs import Graph, GraphNode
+from api_server.test import init_db, test_data
+
+from .building_map_cache import BuildingMapCache
+from .events import RmfEvents
+
+
+class TestBuildingMapCache(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await init_db()
+        self.rmf = RmfEvents()
+        self.cache = BuildingMapCache(self.rmf)
+        self.cache.start()
+
+    async def asyncTearDown(self):
+        self.cache.stop()
+        await Tortoise.close_connections()
+
+    async def test_indexes(self):
+        building_map = test_data.make_building_map()
+        building_map.levels[0].nav_graphs = [
+            Graph(name="0", vertices=[GraphNode(name="charger"), GraphNode()])
+        ]
+        self.rmf.building_map.on_next(building_map)
+        indexed = self.cache.current
+        self.assertIsNotNone(indexed)
+        self.assertEqual([d.name for d in indexed.doors], ["test_door"])
+        self.assertIn("test_door", indexed.doors_by_name)
+        self.assertEqual(len(indexed.doors_by_level["L1"]), 1)
+        self.assertIn("test_lift", indexed.lifts_by_name)
+        self.assertEqual(list(indexed.waypoints_by_name), ["charger"])
+        self.assertEqual(indexed.waypoints_by_name["charger"].level_name, "L1")
+
+    async def test_replaced_only_when_content_changes(self):
+        self.rmf.building_map.on_next(test_data.make_building_map())
+        first = self.cache.current
+        self.rmf.building_map.on_next(test_data.make_building_map())
+        self.assertIs(self.cache.current, first)
+
+        changed = test_data.make_building_map()
+        changed.lifts = []
+        self.rmf.building_map.on_next(changed)
+        self.assertIsNot(self.cache.current, first)
+        self.assertNotEqual(self.cache.current.version, first.version)
+        self.assertEqual(self.cache.current.lifts, [])
+
+    async def test_loads_from_db(self):
+        self.assertIsNone(await self.cache.get())
+        await test_data.make_building_map().save()
+        indexed = await self.cache.get()
+        self.assertIsNotNone(indexed)
+        self.assertIs(await self.cache.get(), indexed)
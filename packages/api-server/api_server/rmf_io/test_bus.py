@@ -0,0 +1,78 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+from typing import Any, List
+
+from api_server.models import DoorHealth, HealthStatus
+from api_server.test import test_data
+
+from .bus import RmfBusPublisher, RmfBusSubscriber, decode_event, encode_event
+from .events import RmfEvents
+from .state_store import RmfStateStore
+
+
+class TestRmfBus(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.path = os.path.join(self.tmpdir, "bus.sock")
+        self.rmf = RmfEvents()
+        self.store = RmfStateStore(self.rmf)
+        self.store.start()
+        self.publisher = RmfBusPublisher(self.rmf, self.path, state_store=self.store)
+        self.worker_rmf = RmfEvents()
+        self.subscriber = RmfBusSubscriber(
+            self.worker_rmf, self.path, reconnect_interval=0.01
+        )
+        self.received: List[Any] = []
+        self.worker_rmf.door_states.subscribe(self.received.append)
+        self.worker_rmf.door_health.subscribe(self.received.append)
+
+    async def asyncTearDown(self):
+        await self.subscriber.stop()
+        await self.publisher.stop()
+        self.store.stop()
+
+    async def wait_for(self, count: int):
+        for _ in range(100):
+            if len(self.received) >= count:
+                return
+            await asyncio.sleep(0.01)
+        self.fail(f"received {len(self.received)} events, expected {count}")
+
+    def test_encode_decode(self):
+        state = test_data.make_door_state("test_door")
+        self.assertEqual(
+            decode_event(encode_event("door_states", state)), ("door_states", state)
+        )
+
+    async def test_snapshot_and_events(self):
+        self.rmf.door_states.on_next(test_data.make_door_state("door_1"))
+        await self.publisher.start()
+        self.subscriber.start()
+        await self.wait_for(1)
+        self.assertEqual(self.received[0], test_data.make_door_state("door_1"))
+
+        health = DoorHealth(id_="door_2", health_status=HealthStatus.HEALTHY)
+        self.rmf.door_states.on_next(test_data.make_door_state("door_2"))
+        self.rmf.door_health.on_next(health)
+        await self.wait_for(3)
+        self.assertEqual(self.received[1], test_data.make_door_state("door_2"))
+        self.assertEqual(self.received[2], health)
+
+    async def test_reconnects(self):
+        # the subscriber starts before the publisher
+        self.subscriber.start()
+        await asyncio.sleep(0.02)
+        await self.publisher.start()
+        self.rmf.door_states.on_next(test_data.make_door_state("door_1"))
+        await self.wait_for(1)
+
+        await self.publisher.stop()
+        self.rmf.door_states.on_next(test_data.make_door_state("door_2"))
+        await self.publisher.start()
+        # door_2 is in the snapshot
+        await self.wait_for(3)
+        self.assertEqual(self.received[-1], test_data.make_door_state("door_2"))
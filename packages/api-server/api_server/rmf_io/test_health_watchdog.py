@@ -1,4 +1,6 @@
+import asyncio
 import logging
+import threading
 import unittest
 from typing import Any, Callable, Optional, cast
 
@@ -20,11 +22,14 @@ from api_server.models import (
     LiftHealth,
     RobotHealth,
 )
+from api_server.models import tortoise_models as ttm
 from api_server.models.health import BaseBasicHealth
 from api_server.test import init_db, test_data
 
 from .events import RmfEvents
 from .health_watchdog import HealthWatchdog
+from .state_store import RmfStateStore
+from .topics import topics
 
 
 class BaseFixture(unittest.IsolatedAsyncioTestCase):
@@ -359,3 +364,83 @@ class TestHealthWatchdog_RobotHealth(BaseFixture):
             self.assertIsNotNone(health)
             health = cast(RobotHealth, health)
             self.assertEqual(health.health_status, test[1])
+
+
+class TestHealthWatchdog_Eviction(BaseFixture):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.state_store = RmfStateStore(self.rmf)
+        self.state_store.start()
+        self.addCleanup(self.state_store.stop)
+        self.health_watchdog = HealthWatchdog(
+            self.rmf,
+            eviction_ttl=30,
+            remove_evicted_health=True,
+            state_store=self.state_store,
+            scheduler=self.scheduler,
+            logger=self.logger,
+        )
+
+    async def test_evicts_stale_entities(self):
+        await self.health_watchdog.start()
+        self.rmf.door_states.on_next(test_data.make_door_state("stale_door"))
+        self.rmf.door_states.on_next(test_data.make_door_state("live_door"))
+        await DoorHealth(
+            id_="stale_door", health_status=HealthStatus.DEAD, health_message=None
+        ).save()
+        self.assertEqual(self.health_watchdog.watched, 2)
+
+        for _ in range(4):
+            self.scheduler.advance_by(10)
+            self.rmf.door_states.on_next(test_data.make_door_state("live_door"))
+        self.assertEqual(self.health_watchdog.watched, 1)
+        self.assertIsNone(self.state_store.get(topics.door_health, "stale_door"))
+        self.assertIsNotNone(self.state_store.get(topics.door_health, "live_door"))
+
+        await self.health_watchdog.stop()
+        self.assertEqual(self.health_watchdog.watched, 0)
+        self.assertIsNone(await ttm.DoorHealth.get_or_none(id_="stale_door"))
+
+    async def test_stop(self):
+        await self.health_watchdog.start()
+        await self.health_watchdog.stop()
+
+        health = []
+        self.rmf.door_health.subscribe(health.append)
+        self.rmf.door_states.on_next(test_data.make_door_state("test_door"))
+        self.scheduler.advance_by(HealthWatchdog.LIVELINESS)
+        self.assertEqual(health, [])
+        self.assertEqual(self.health_watchdog.watched, 0)
+
+
+class TestHealthWatchdog_LoopScheduler(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await init_db()
+
+    async def asyncTearDown(self):
+        await Tortoise().close_connections()
+
+    async def test_dead_health_is_published_on_loop_thread(self):
+        class FastWatchdog(HealthWatchdog):
+            LIVELINESS = 0.1
+
+        rmf = RmfEvents()
+        logger = logging.Logger("test")
+        logger.setLevel("CRITICAL")
+        # no scheduler, it defaults to the loop
+        health_watchdog = FastWatchdog(rmf, logger=logger)
+        await health_watchdog.start()
+
+        dead = asyncio.Event()
+        threads = []
+
+        def on_health(health: DoorHealth):
+            threads.append(threading.current_thread())
+            if health.health_status == HealthStatus.DEAD:
+                dead.set()
+
+        rmf.door_health.subscribe(on_health)
+        rmf.door_states.on_next(test_data.make_door_state("test_door"))
+        await asyncio.wait_for(dead.wait(), 5)
+        await health_watchdog.stop()
+        self.assertEqual(threads, [threading.current_thread()] * len(threads))
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import unittest
+
+from rx.scheduler.historicalscheduler import HistoricalScheduler
+
+from api_server.test import test_data
+
+from .events import RmfEvents
+from .ingest import RmfIngest
+
+
+class TestRmfIngest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.rmf = RmfEvents()
+        self.scheduler = HistoricalScheduler()
+        self.ingest = RmfIngest(
+            self.rmf,
+            {"door_states": 1},
+            scheduler=self.scheduler,
+        )
+        await self.ingest.start()
+
+    async def asyncTearDown(self):
+        self.ingest.stop()
+
+    async def test_coalesce_states(self):
+        result = []
+        self.rmf.door_states.subscribe(result.append)
+
+        for _ in range(10):
+            self.ingest.raw_events.door_states.on_next(
+                test_data.make_door_state("test_door")
+            )
+        self.ingest.raw_events.door_states.on_next(
+            test_data.make_door_state("test_door_2")
+        )
+        await asyncio.sleep(0)
+        self.assertEqual(len(result), 0)
+        self.scheduler.advance_by(1)
+        self.assertEqual(len(result), 2)
+
+        stats = self.ingest.stats["door_states"]
+        self.assertEqual(stats.received, 11)
+        self.assertEqual(stats.forwarded, 2)
+        self.assertEqual(stats.dropped, 9)
+
+    async def test_forward_topics_without_rate(self):
+        result = []
+        self.rmf.lift_states.subscribe(result.append)
+        self.ingest.raw_events.lift_states.on_next(test_data.make_lift_state())
+        self.ingest.raw_events.lift_states.on_next(test_data.make_lift_state())
+        await asyncio.sleep(0)
+        self.assertEqual(len(result), 2)
+        self.assertNotIn("lift_states", self.ingest.stats)
+
+    async def test_skip_initial_building_map(self):
+        result = []
+        self.rmf.building_map.subscribe(result.append)
+        self.assertEqual(result, [None])
+        self.ingest.raw_events.building_map.on_next(test_data.make_building_map())
+        await asyncio.sleep(0)
+        self.assertEqual(len(result), 2)
+
+    async def test_events_are_delivered_on_loop_thread(self):
+        result = []
+        self.rmf.lift_states.subscribe(lambda _: result.append(threading.get_ident()))
+        thread = threading.Thread(
+            target=lambda: self.ingest.raw_events.lift_states.on_next(
+                test_data.make_lift_state()
+            )
+        )
+        thread.start()
+        thread.join()
+        await asyncio.sleep(0)
+        self.assertEqual(result, [threading.get_ident()])
+
+    async def test_stop_before_start(self):
+        ingest = RmfIngest(RmfEvents(), {})
+        ingest.stop()
+
+    async def test_stop_twice(self):
+        self.ingest.stop()
+        self.ingest.stop()
@@ -0,0 +1,67 @@
+import unittest
+
+from rx.scheduler.historicalscheduler import HistoricalScheduler
+
+from .liveness import LivenessTracker
+
+
+class TestLivenessTracker(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = HistoricalScheduler()
+        self.changes = []
+        self.tracker = LivenessTracker(
+            10,
+            lambda key, alive: self.changes.append((key, alive)),
+            scheduler=self.scheduler,
+        )
+        self.tracker.start()
+
+    def tearDown(self):
+        self.tracker.stop()
+
+    def test_dead_after_timeout(self):
+        self.tracker.touch("a")
+        self.assertEqual(self.changes, [("a", True)])
+        self.assertTrue(self.tracker.is_alive("a"))
+
+        self.scheduler.advance_by(9)
+        self.assertEqual(self.changes, [("a", True)])
+        self.scheduler.advance_by(1)
+        self.assertEqual(self.changes, [("a", True), ("a", False)])
+        self.assertFalse(self.tracker.is_alive("a"))
+
+        # stays dead without emitting again
+        self.scheduler.advance_by(20)
+        self.assertEqual(len(self.changes), 2)
+
+        self.tracker.touch("a")
+        self.assertEqual(self.changes[-1], ("a", True))
+
+    def test_touch_extends_deadline(self):
+        self.tracker.touch("a")
+        for _ in range(5):
+            self.scheduler.advance_by(5)
+            self.tracker.touch("a")
+        self.assertEqual(self.changes, [("a", True)])
+        self.scheduler.advance_by(10)
+        self.assertEqual(self.changes, [("a", True), ("a", False)])
+
+    def test_many_entities(self):
+        for i in range(100):
+            self.tracker.touch(i)
+        self.scheduler.advance_by(5)
+        # only the even entities are seen again
+        for i in range(0, 100, 2):
+            self.tracker.touch(i)
+        self.scheduler.advance_by(5)
+        dead = {key for key, alive in self.changes if not alive}
+        self.assertEqual(dead, set(range(1, 100, 2)))
+        self.assertEqual(len(self.tracker), 100)
+
+    def test_remove(self):
+        self.tracker.touch("a")
+        self.tracker.remove("a")
+        self.assertIsNone(self.tracker.is_alive("a"))
+        self.scheduler.advance_by(20)
+        self.assertEqual(self.changes, [("a", True)])
+        self.assertEqual(len(self.tracker), 0)
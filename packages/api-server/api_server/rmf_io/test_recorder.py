@@ -0,0 +1,49 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from api_server.test import test_data
+
+from .events import RmfEvents
+from .recorder import RmfRecorder, read_recording
+
+
+class TestRmfRecorder(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.rmf = RmfEvents()
+
+    def record_and_read(self, filename: str):
+        path = os.path.join(self.tmpdir, filename)
+        recorder = RmfRecorder(self.rmf, path)
+        recorder.start()
+        self.rmf.door_states.on_next(test_data.make_door_state("test_door"))
+        self.rmf.lift_states.on_next(test_data.make_lift_state("test_lift"))
+        self.rmf.fleet_states.on_next(test_data.make_fleet_state("test_fleet"))
+        self.rmf.building_map.on_next(test_data.make_building_map())
+        recorder.stop()
+        # events after stopping are not recorded
+        self.rmf.door_states.on_next(test_data.make_door_state("test_door_2"))
+        self.assertEqual(recorder.recorded, 4)
+        return list(read_recording(path))
+
+    def check_recording(self, recording):
+        self.assertEqual(len(recording), 4)
+        timestamps = [x[0] for x in recording]
+        self.assertEqual(timestamps, sorted(timestamps))
+        self.assertEqual(
+            [x[1] for x in recording],
+            ["door_states", "lift_states", "fleet_states", "building_map"],
+        )
+        self.assertEqual(recording[0][2], test_data.make_door_state("test_door"))
+        self.assertEqual(recording[1][2], test_data.make_lift_state("test_lift"))
+        self.assertEqual(recording[2][2], test_data.make_fleet_state("test_fleet"))
+        self.assertEqual(recording[3][2], test_data.make_building_map())
+
+    def test_record_and_read(self):
+        self.check_recording(self.record_and_read("recording.jsonl"))
+
+    def test_record_and_read_gzip(self):
+        self.check_recording(self.record_and_read("recording.jsonl.gz"))
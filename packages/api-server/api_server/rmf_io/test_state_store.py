@@ -0,0 +1,79 @@
+import json
+import unittest
+
+from api_server.test import test_data
+
+from .events import RmfEvents
+from .state_store import RmfStateStore
+from .topics import topics
+
+
+class TestRmfStateStore(unittest.TestCase):
+    def setUp(self):
+        self.rmf = RmfEvents()
+        self.store = RmfStateStore(self.rmf)
+        self.store.start()
+
+    def tearDown(self):
+        self.store.stop()
+
+    def test_keeps_latest_state(self):
+        first = test_data.make_door_state("test_door")
+        second = test_data.make_door_state("test_door")
+        self.rmf.door_states.on_next(first)
+        self.rmf.door_states.on_next(second)
+        self.rmf.door_states.on_next(test_data.make_door_state("other_door"))
+        self.assertIs(self.store.get(topics.door_states, "test_door"), second)
+        self.assertEqual(
+            sorted(self.store.keys(topics.door_states)), ["other_door", "test_door"]
+        )
+        self.assertIsNone(self.store.get(topics.lift_states, "test_door"))
+
+    def test_put_if_absent(self):
+        newer = test_data.make_dispenser_state("test_dispenser")
+        self.rmf.dispenser_states.on_next(newer)
+        older = test_data.make_dispenser_state("test_dispenser")
+        self.assertIs(self.store.put_if_absent(topics.dispenser_states, older), newer)
+
+    def test_versions(self):
+        self.assertIsNone(self.store.etag(topics.door_states, "test_door"))
+        self.rmf.door_states.on_next(test_data.make_door_state("test_door"))
+        version = self.store.version(topics.door_states, "test_door")
+        etag = self.store.etag(topics.door_states)
+        self.rmf.door_states.on_next(test_data.make_door_state("other_door"))
+        # other entities do not change the version of an entity, only of the topic
+        self.assertEqual(self.store.version(topics.door_states, "test_door"), version)
+        self.assertNotEqual(self.store.etag(topics.door_states), etag)
+        self.rmf.door_states.on_next(test_data.make_door_state("test_door"))
+        self.assertGreater(self.store.version(topics.door_states, "test_door"), version)
+
+    def test_stop(self):
+        self.store.stop()
+        self.rmf.door_states.on_next(test_data.make_door_state("test_door"))
+        self.assertIsNone(self.store.get(topics.door_states, "test_door"))
+
+    def test_remove(self):
+        state = test_data.make_door_state("test_door")
+        self.rmf.door_states.on_next(state)
+        etag = self.store.etag(topics.door_states)
+        self.store.encode(topics.door_states, state)
+        self.assertIs(self.store.remove(topics.door_states, "test_door"), state)
+        self.assertIsNone(self.store.get(topics.door_states, "test_door"))
+        self.assertIsNone(self.store.get_encoded(topics.door_states, "test_door"))
+        self.assertIsNone(self.store.etag(topics.door_states, "test_door"))
+        self.assertNotEqual(self.store.etag(topics.door_states), etag)
+        self.assertIsNone(self.store.remove(topics.door_states, "test_door"))
+
+    def test_encode(self):
+        first = test_data.make_door_state("test_door")
+        self.rmf.door_states.on_next(first)
+        encoded = self.store.encode(topics.door_states, first)
+        self.assertEqual(json.loads(encoded.json), json.loads(first.json()))
+        # the encoding is reused for the same value
+        self.assertIs(self.store.encode(topics.door_states, first), encoded)
+        self.assertIs(self.store.get_encoded(topics.door_states, "test_door"), encoded)
+
+        second = test_data.make_door_state("test_door")
+        self.rmf.door_states.on_next(second)
+        self.assertIsNot(self.store.encode(topics.door_states, second), encoded)
+        self.assertIsNone(self.store.get_encoded(topics.door_states, "other_door"))
@@ -0,0 +1,59 @@
+import unittest
+
+from tortoise import Tortoise
+
+from api_server.models import tortoise_models as ttm
+from api_server.test import init_db
+
+from .write_behind import WriteBehind
+
+
+class TestWriteBehind(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await init_db()
+        # long interval so that rows are only written on explicit flushes
+        self.write_behind = WriteBehind(3600)
+        await self.write_behind.start()
+
+    async def asyncTearDown(self):
+        await self.write_behind.stop()
+        await Tortoise.close_connections()
+
+    async def test_keeps_latest_row(self):
+        self.write_behind.put(ttm.DoorState, {"id_": "test_door", "data": {"v": 1}})
+        self.write_behind.put(ttm.DoorState, {"id_": "test_door", "data": {"v": 2}})
+        self.write_behind.put(ttm.DoorState, {"id_": "test_door_2", "data": {"v": 1}})
+        self.assertEqual(self.write_behind.pending, 2)
+        self.assertEqual(await ttm.DoorState.all().count(), 0)
+
+        await self.write_behind.flush()
+        self.assertEqual(self.write_behind.pending, 0)
+        door = await ttm.DoorState.get(id_="test_door")
+        self.assertEqual(door.data, {"v": 2})
+        self.assertEqual(await ttm.DoorState.all().count(), 2)
+        self.assertEqual(self.write_behind.stats.flushes, 1)
+        self.assertEqual(self.write_behind.stats.rows_written, 2)
+        self.assertEqual(self.write_behind.stats.last_batch_size, 2)
+
+    async def test_updates_existing_rows(self):
+        await ttm.RobotState.create(
+            fleet_name="test_fleet", robot_name="test_robot", data={"v": 1}
+        )
+        for robot_name, data in (("test_robot", {"v": 2}), ("test_robot_2", {"v": 1})):
+            self.write_behind.put(
+                ttm.RobotState,
+                {"fleet_name": "test_fleet", "robot_name": robot_name, "data": data},
+                ("fleet_name", "robot_name"),
+            )
+        await self.write_behind.flush()
+        robot = await ttm.RobotState.get(
+            fleet_name="test_fleet", robot_name="test_robot"
+        )
+        self.assertEqual(robot.data, {"v": 2})
+        self.assertEqual(await ttm.RobotState.all().count(), 2)
+
+    async def test_flush_on_stop(self):
+        self.write_behind.put(ttm.LiftState, {"id_": "test_lift", "data": {"v": 1}})
+        await self.write_behind.stop()
+        lift = await ttm.LiftState.get(id_="test_lift")
+        self.assertEqual(lift.data, {"v": 1})
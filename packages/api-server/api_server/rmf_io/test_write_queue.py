@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import unittest
+
+from .write_queue import WriteQueue
+
+
+class TestWriteQueue(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.queue = WriteQueue(
+            high_water_mark=3,
+            low_water_mark=1,
+            logger=logging.Logger("test", level="CRITICAL"),
+        )
+        await self.queue.start()
+        self.written = []
+        self.blocker = asyncio.Event()
+
+    async def asyncTearDown(self):
+        self.blocker.set()
+        await self.queue.stop()
+
+    def make_write(self, value):
+        async def write():
+            await self.blocker.wait()
+            self.written.append(value)
+
+        return write
+
+    async def test_latest_write_wins(self):
+        self.queue.put("a", self.make_write("a1"))
+        self.queue.put("a", self.make_write("a2"))
+        self.queue.put("b", self.make_write("b1"))
+        self.blocker.set()
+        await self.queue.stop()
+        self.assertEqual(self.written, ["a2", "b1"])
+        self.assertEqual(self.queue.stats.queued, 2)
+        self.assertEqual(self.queue.stats.replaced, 1)
+        self.assertEqual(self.queue.stats.written, 2)
+
+    async def test_water_marks(self):
+        for key in ("a", "b", "c"):
+            self.assertTrue(self.queue.put(key, self.make_write(key)))
+        self.assertTrue(self.queue.saturated)
+        self.assertFalse(self.queue.put("d", self.make_write("d")))
+        # replacing a pending write is allowed
+        self.assertTrue(self.queue.put("c", self.make_write("c2")))
+        self.assertEqual(self.queue.stats.dropped, 1)
+
+        self.blocker.set()
+        await self.queue.stop()
+        self.assertFalse(self.queue.saturated)
+        self.assertEqual(self.written, ["a", "b", "c2"])
+
+    async def test_not_droppable(self):
+        for key in ("a", "b", "c"):
+            self.queue.put(key, self.make_write(key))
+        self.assertTrue(self.queue.saturated)
+        self.assertTrue(self.queue.put("d", self.make_write("d"), droppable=False))
+        self.assertEqual(self.queue.stats.dropped, 0)
+
+        self.blocker.set()
+        await self.queue.stop()
+        self.assertEqual(self.written, ["a", "b", "c", "d"])
+
+    async def test_failed_write(self):
+        async def fail():
+            raise Exception("test")
+
+        self.queue.put("a", fail)
+        self.queue.put("b", self.make_write("b"))
+        self.blocker.set()
+        await self.queue.stop()
+        self.assertEqual(self.queue.stats.failed, 1)
+        self.assertEqual(self.written, ["b"])
+
+    async def test_stop_timeout(self):
+        self.queue.put("a", self.make_write("a"))
+        self.queue.put("b", self.make_write("b"))
+        await self.queue.stop(0.01)
+        self.assertEqual(self.written, [])
+        self.assertEqual(self.queue.stats.dropped, 1)
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple, Type
+
+import tortoise.transactions
+from tortoise.models import Model
+
+from api_server.models import tortoise_models as ttm
+
+
+@dataclass
+class WriteBehindStats:
+    flushes: int = 0
+    failed_flushes: int = 0
+    rows_written: int = 0
+    last_batch_size: int = 0
+    max_batch_size: int = 0
+    # in seconds
+    last_flush_latency: float = 0
+    max_flush_latency: float = 0
+
+
+class WriteBehind:
+    """
+    Keeps the latest pending row of each entity in memory and periodically writes all of
+    them in one transaction with bulk upserts. Older rows of an entity that are not yet
+    written are replaced by newer rows.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float,
+        *,
+        logger: logging.Logger = None,
+    ):
+        """
+        :param flush_interval: Seconds between each flush.
+        """
+        self.flush_interval = flush_interval
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self.stats = WriteBehindStats()
+        self._pending: Dict[
+            Tuple[Type[Model], Tuple[str, ...], Hashable], Dict[str, Any]
+        ] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._stopping: asyncio.Event
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def put(
+        self,
+        model: Type[Model],
+        row: Dict[str, Any],
+        conflict_fields: Sequence[str] = ("id_",),
+    ) -> None:
+        """
+        Queues a row to be upserted on the next flush, see `ttm.bulk_upsert`.
+        """
+        conflict_fields = tuple(conflict_fields)
+        key = tuple(row[f] for f in conflict_fields)
+        self._pending[(model, conflict_fields, key)] = row
+
+    async def start(self):
+        self._stopping = asyncio.Event()
+        self._flush_task = asyncio.get_event_loop().create_task(self._flush_loop())
+
+    async def stop(self):
+        """
+        Stops the periodic flush and writes all pending rows.
+        """
+        if self._flush_task is None:
+            await self.flush()
+            return
+        self._stopping.set()
+        await self._flush_task
+        self._flush_task = None
+
+    async def _flush_loop(self):
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    async def flush(self) -> None:
+        """
+        Writes all pending rows. If the write fails, the rows are pending again unless
+        there are newer rows for the same entities.
+        """
+        if not self._pending:
+            return
+        batch = self._pending
+        self._pending = {}
+        groups: Dict[Tuple[Type[Model], Tuple[str, ...]], List[Dict[str, Any]]] = {}
+        for (model, conflict_fields, _), row in batch.items():
+            groups.setdefault((model, conflict_fields), []).append(row)
+
+        start = time.perf_counter()
+        try:
+            async with tortoise.transactions.in_transaction() as conn:
+                for (model, conflict_fields), rows in groups.items():
+                    await ttm.bulk_upsert(model, rows, conflict_fields, using_db=conn)
+        except Exception:  # pylint: disable=broad-except
+            self.stats.failed_flushes += 1
+            self.logger.exception(f"failed to write {len(batch)} rows")
+            for k, row in batch.items():
+                self._pending.setdefault(k, row)
+            return
+        latency = time.perf_counter() - start
+
+        self.stats.flushes += 1
+        self.stats.rows_written += len(batch)
+        self.stats.last_batch_size = len(batch)
+        self.stats.max_batch_size = max(self.stats.max_batch_size, len(batch))
+        self.stats.last_flush_latency = latency
+        self.stats.max_flush_latency = max(self.stats.max_flush_latency, latency)
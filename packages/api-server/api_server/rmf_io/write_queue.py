@@ -0,0 +1,127 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Hashable, Optional
+
+
+@dataclass
+class WriteQueueStats:
+    queued: int = 0
+    replaced: int = 0
+    dropped: int = 0
+    failed: int = 0
+    written: int = 0
+    max_depth: int = 0
+
+
+class WriteQueue:
+    """
+    Bounded queue of pending writes that are run one at a time by a worker task. There is
+    at most one pending write per key, queueing a write for a key that is already pending
+    replaces the older write, keeping its position in the queue.
+
+    When the number of pending writes reaches `high_water_mark`, writes for new keys are
+    dropped until the queue drains down to `low_water_mark`, writes that replace a
+    pending write are still accepted. This keeps memory bounded when the database is
+    slower than the incoming events. Writes that are not `droppable`, e.g. ones that
+    cannot be recovered from a later event, are always accepted.
+    """
+
+    def __init__(
+        self,
+        *,
+        high_water_mark: int = 1000,
+        low_water_mark: int = 800,
+        logger: logging.Logger = None,
+    ):
+        if low_water_mark > high_water_mark:
+            raise ValueError("low_water_mark must not be more than high_water_mark")
+        self.high_water_mark = high_water_mark
+        self.low_water_mark = low_water_mark
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self.stats = WriteQueueStats()
+        self.saturated = False
+        self._queue: "OrderedDict[Hashable, Callable[[], Awaitable]]" = OrderedDict()
+        # created on start so that they are bound to the running loop
+        self._not_empty: asyncio.Event
+        self._idle: asyncio.Event
+        self._worker: Optional[asyncio.Task] = None
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def put(
+        self, key: Hashable, write: Callable[[], Awaitable], *, droppable: bool = True
+    ) -> bool:
+        """
+        Queues a write, must be called from the loop thread after `start`.
+
+        :param droppable: When `False`, the write is queued even if the queue is
+            saturated.
+        :return: `False` if the write is dropped.
+        """
+        if key in self._queue:
+            self._queue[key] = write
+            self.stats.replaced += 1
+            return True
+        if self.saturated and droppable:
+            self.stats.dropped += 1
+            return False
+        self._queue[key] = write
+        self.stats.queued += 1
+        self.stats.max_depth = max(self.stats.max_depth, len(self._queue))
+        if len(self._queue) >= self.high_water_mark:
+            self.saturated = True
+            self.logger.warning(
+                f"{len(self._queue)} writes pending, dropping new writes until there are "
+                f"{self.low_water_mark} or less"
+            )
+        self._idle.clear()
+        self._not_empty.set()
+        return True
+
+    async def start(self):
+        self._not_empty = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._worker = asyncio.get_event_loop().create_task(self._work())
+
+    async def stop(self, timeout: Optional[float] = None):
+        """
+        Waits for the pending writes to finish, writes that are still pending after
+        `timeout` seconds are dropped.
+        """
+        if self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning(f"dropped {len(self._queue)} pending writes")
+            self.stats.dropped += len(self._queue)
+            self._queue.clear()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def _work(self):
+        while True:
+            if not self._queue:
+                self._not_empty.clear()
+                self._idle.set()
+                await self._not_empty.wait()
+                continue
+            key, write = self._queue.popitem(last=False)
+            if self.saturated and len(self._queue) <= self.low_water_mark:
+                self.saturated = False
+                self.logger.info("write queue drained, accepting new writes")
+            try:
+                await write()
+                self.stats.written += 1
+            except Exception:  # pylint: disable=broad-except
+                self.stats.failed += 1
+                self.logger.exception(f"failed to write {key}")
@@ -1,6 +1,6 @@
-from typing import Any, cast
+from typing import cast
 
-from fastapi import Depends
+from fastapi import Depends, Request, Response
 from rx import operators as rxops
 
 from api_server.base_app import BaseApp
@@ -8,7 +8,7 @@ from api_server.fast_io import FastIORouter, WatchRequest
 from api_server.models import BuildingMap
 from api_server.repositories.rmf import RmfRepository
 
-from .utils import rx_watcher
+from .utils import json_response, not_modified
 
 
 class BuildingMapRouter(FastIORouter):
@@ -16,18 +16,34 @@ class BuildingMapRouter(FastIORouter):
         super().__init__(tags=["Building"])
 
         @self.get("", response_model=BuildingMap)
-        async def get_building_map(rmf_repo: RmfRepository = Depends(app.rmf_repo)):
+        async def get_building_map(
+            request: Request,
+            response: Response,
+            rmf_repo: RmfRepository = Depends(app.rmf_repo),
+        ):
             """
             Available in socket.io
             """
-            return await rmf_repo.get_bulding_map()
+            etag = app.rmf_state_store().building_map.etag()
+            unchanged = not_modified(request, response, etag)
+            if unchanged is not None:
+                return unchanged
+            building_map = await rmf_repo.get_bulding_map()
+            if building_map is None:
+                return None
+            return json_response(
+                app.rmf_state_store().building_map.encode(building_map), response
+            )
 
         @self.watch("")
         async def watch_building_map(req: WatchRequest):
-            rx_watcher(
-                req,
-                app.rmf_events().building_map.pipe(
-                    rxops.filter(lambda x: x is not None),
-                    rxops.map(cast(Any, lambda x: cast(BuildingMap, x).dict())),
-                ),
-            )
+            indexed = await app.rmf_state_store().building_map.get()
+            if indexed is not None:
+                await req.emit(indexed.encoded)
+
+        self.broadcast(
+            "",
+            app.rmf_events().building_map.pipe(rxops.filter(lambda x: x is not None)),
+            lambda _: {},
+            lambda x: app.rmf_state_store().building_map.encode(cast(BuildingMap, x)),
+        )
@@ -1,14 +1,14 @@
-from typing import Any, List, cast
+from typing import List, cast
 
-from fastapi import Depends
-from rx import operators as rxops
+from fastapi import Depends, Request, Response
 
 from api_server.base_app import BaseApp
 from api_server.fast_io import FastIORouter, WatchRequest
 from api_server.models import Dispenser, DispenserHealth, DispenserState
 from api_server.repositories import RmfRepository
+from api_server.rmf_io import topics
 
-from .utils import rx_watcher
+from .utils import json_response, not_modified
 
 
 class DispensersRouter(FastIORouter):
@@ -16,30 +16,53 @@ class DispensersRouter(FastIORouter):
         super().__init__(tags=["Dispensers"])
 
         @self.get("", response_model=List[Dispenser])
-        async def get_dispensers(rmf_repo: RmfRepository = Depends(app.rmf_repo)):
+        async def get_dispensers(
+            request: Request,
+            response: Response,
+            rmf_repo: RmfRepository = Depends(app.rmf_repo),
+        ):
+            etag = app.rmf_state_store().etag(topics.dispenser_states)
+            unchanged = not_modified(request, response, etag)
+            if unchanged is not None:
+                return unchanged
             return await rmf_repo.get_dispensers()
 
         @self.get("/{guid}/state", response_model=DispenserState)
         async def get_dispenser_state(
-            guid: str, rmf_repo: RmfRepository = Depends(app.rmf_repo)
+            guid: str,
+            request: Request,
+            response: Response,
+            rmf_repo: RmfRepository = Depends(app.rmf_repo),
         ):
             """
             Available in socket.io
             """
-            return await rmf_repo.get_dispenser_state(guid)
+            etag = app.rmf_state_store().etag(topics.dispenser_states, guid)
+            unchanged = not_modified(request, response, etag)
+            if unchanged is not None:
+                return unchanged
+            state = await rmf_repo.get_dispenser_state(guid)
+            if state is None:
+                return None
+            return json_response(
+                app.rmf_state_store().encode(topics.dispenser_states, state), response
+            )
 
         @self.watch("/{guid}/state")
         async def watch_dispenser_state(req: WatchRequest, guid: str):
-            dispenser_state = await get_dispenser_state(guid, RmfRepository(req.user))
+            store = app.rmf_state_store()
+            rmf_repo = app.rmf_snapshot_repo(req.user)
+            dispenser_state = await rmf_repo.get_dispenser_state(guid)
             if dispenser_state is not None:
-                await req.emit(dispenser_state.dict())
-            rx_watcher(
-                req,
-                app.rmf_events().dispenser_states.pipe(
-                    rxops.filter(lambda x: cast(DispenserState, x).guid == guid),
-                    rxops.map(cast(Any, lambda x: cast(DispenserState, x).dict())),
-                ),
-            )
+                await req.emit(store.encode(topics.dispenser_states, dispenser_state))
+
+        self.broadcast(
+            "/{guid}/state",
+            app.rmf_events().dispenser_states,
+            lambda x: {"guid": cast(DispenserState, x).guid},
+            lambda x: app.rmf_state_store().encode(topics.dispenser_states, x),
+            lambda: app.rmf_state_store().values(topics.dispenser_states),
+        )
 
         @self.get("/{guid}/health", response_model=DispenserHealth)
         async def get_dispenser_health(
@@ -52,13 +75,15 @@ class DispensersRouter(FastIORouter):
 
         @self.watch("/{guid}/health")
         async def watch_dispenser_health(req: WatchRequest, guid: str):
-            health = await get_dispenser_health(guid, RmfRepository(req.user))
+            store = app.rmf_state_store()
+            health = await get_dispenser_health(guid, app.rmf_snapshot_repo(req.user))
             if health is not None:
-                await req.emit(health.dict())
-            rx_watcher(
-                req,
-                app.rmf_events().dispenser_health.pipe(
-                    rxops.filter(lambda x: cast(DispenserHealth, x).id_ == guid),
-                    rxops.map(cast(Any, lambda x: cast(DispenserHealth, x).dict())),
-                ),
-            )
+                await req.emit(store.encode(topics.dispenser_health, health))
+
+        self.broadcast(
+            "/{guid}/health",
+            app.rmf_events().dispenser_health,
+            lambda x: {"guid": cast(DispenserHealth, x).id_},
+            lambda x: app.rmf_state_store().encode(topics.dispenser_health, x),
+            lambda: app.rmf_state_store().values(topics.dispenser_health),
+        )
@@ -1,14 +1,14 @@
-from typing import Any, List, cast
+from typing import List, cast
 
-from fastapi import Depends
-from rx import operators as rxops
+from fastapi import Depends, Request, Response
 
 from api_server.base_app import BaseApp
 from api_server.fast_io import FastIORouter, WatchRequest
 from api_server.models import Door, DoorHealth, DoorRequest, DoorState
 from api_server.repositories import RmfRepository
+from api_server.rmf_io import topics
 
-from .utils import rx_watcher
+from .utils import json_response, not_modified
 
 
 class DoorsRouter(FastIORouter):
@@ -16,30 +16,52 @@ class DoorsRouter(FastIORouter):
         super().__init__(tags=["Doors"])
 
         @self.get("", response_model=List[Door])
-        async def get_doors(rmf_repo: RmfRepository = Depends(app.rmf_repo)):
+        async def get_doors(
+            request: Request,
+            response: Response,
+            rmf_repo: RmfRepository = Depends(app.rmf_repo),
+        ):
+            etag = app.rmf_state_store().building_map.etag()
+            unchanged = not_modified(request, response, etag)
+            if unchanged is not None:
+                return unchanged
             return await rmf_repo.get_doors()
 
         @self.get("/{door_name}/state", response_model=DoorState)
         async def get_door_state(
-            door_name: str, rmf_repo: RmfRepository = Depends(app.rmf_repo)
+            door_name: str,
+            request: Request,
+            response: Response,
+            rmf_repo: RmfRepository = Depends(app.rmf_repo),
         ):
             """
             Available in socket.io
             """
-            return await rmf_repo.get_door_state(door_name)
+            etag = app.rmf_state_store().etag(topics.door_states, door_name)
+            unchanged = not_modified(request, response, etag)
+            if unchanged is not None:
+                return unchanged
+            state = await rmf_repo.get_door_state(door_name)
+            if state is None:
+                return None
+            return json_response(
+                app.rmf_state_store().encode(topics.door_states, state), response
+            )
 
         @self.watch("/{door_name}/state")
         async def watch_door_state(req: WatchRequest, door_name: str):
-            door_state = await get_door_state(door_name, RmfRepository(req.user))
+            store = app.rmf_state_store()
+            door_state = await app.rmf_snapshot_repo(req.user).get_door_state(door_name)
             if door_state:
-                await req.emit(door_state.dict())
-            rx_watcher(
-                req,
-                app.rmf_events().door_states.pipe(
-                    rxops.filter(lambda x: cast(DoorState, x).door_name == door_name),
-                    rxops.map(cast(Any, lambda x: cast(DoorState, x).dict())),
-                ),
-            )
+                await req.emit(store.encode(topics.door_states, door_state))
+
+        self.broadcast(
+            "/{door_name}/state",
+            app.rmf_events().door_states,
+            lambda x: {"door_name": cast(DoorState, x).door_name},
+            lambda x: app.rmf_state_store().encode(topics.door_states, x),
+            lambda: app.rmf_state_store().values(topics.door_states),
+        )
 
         @self.get("/{door_name}/health", response_model=DoorHealth)
         async def get_door_health(
@@ -52,16 +74,18 @@ class DoorsRouter(FastIORouter):
 
         @self.watch("/{door_name}/health")
         async def watch_door_health(req: WatchRequest, door_name: str):
-            health = await get_door_health(door_name, RmfRepository(req.user))
+            store = app.rmf_state_store()
+            health = await get_door_health(door_name, app.rmf_snapshot_repo(req.user))
             if health is not None:
-                await req.emit(health.dict())
-            rx_watcher(
-                req,
-                app.rmf_events().door_health.pipe(
-                    rxops.filter(lambda x: cast(DoorHealth, x).id_ == door_name),
-                    rxops.map(cast(Any, lambda x: cast(DoorHealth, x).dict())),
-                ),
-            )
+                await req.emit(store.encode(topics.door_health, health))
+
+        self.broadcast(
+            "/{door_name}/health",
+            app.rmf_events().door_health,
+            lambda x: {"door_name": cast(DoorHealth, x).id_},
+            lambda x: app.rmf_state_store().encode(topics.door_health, x),
+            lambda: app.rmf_state_store().values(topics.door_health),
+        )
 
         @self.post("/{door_name}/request")
         def post_door_request(
@@ -1,16 +1,16 @@
-from typing import Any, List, Optional, cast
+from typing import List, Optional, cast
 
-from fastapi import Depends, Query
-from rx import operators as rxops
+from fastapi import Depends, Query, Request, Response
 
 from api_server.base_app import BaseApp
 from api_server.dependencies import pagination_query
 from api_server.fast_io import FastIORouter, WatchRequest
 from api_server.models import Fleet, FleetState, Pagination, Robot, RobotHealth, Task
 from api_server.repositories import RmfRepository
+from api_server.rmf_io import topics
 
 from .tasks.utils import get_task_progress
-from .utils import rx_watcher
+from .utils import json_response, not_modified
 
 
 class FleetsRouter(FastIORouter):
@@ -20,12 +20,18 @@ class FleetsRouter(FastIORouter):
 
         @self.get("", response_model=List[Fleet])
         async def get_fleets(
+            request: Request,
+            response: Response,
             rmf_repo: RmfRepository = Depends(app.rmf_repo),
             pagination: Pagination = Depends(pagination_query),
             fleet_name: Optional[str] = Query(
                 None, description="comma separated list of fleet names"
             ),
         ):
+            etag = app.rmf_state_store().etag(topics.fleet_states)
+            unchanged = not_modified(request, response, etag)
+            if unchanged is not None:
+                return unchanged
             return await rmf_repo.query_fleets(pagination, fleet_name=fleet_name)
 
         @self.get("/robots", response_model=List[Robot])
@@ -89,25 +95,39 @@ class FleetsRouter(FastIORouter):
 
         @self.get("/{name}/state", response_model=FleetState)
         async def get_fleet_state(
-            name: str, rmf_repo: RmfRepository = Depends(app.rmf_repo)
+            name: str,
+            request: Request,
+            response: Response,
+            rmf_repo: RmfRepository = Depends(app.rmf_repo),
         ):
             """
             Available in socket.io
             """
-            return await rmf_repo.get_fleet_state(name)
+            etag = app.rmf_state_store().etag(topics.fleet_states, name)
+            unchanged = not_modified(request, response, etag)
+            if unchanged is not None:
+                return unchanged
+            state = await rmf_repo.get_fleet_state(name)
+            if state is None:
+                return None
+            return json_response(
+                app.rmf_state_store().encode(topics.fleet_states, state), response
+            )
 
         @self.watch("/{name}/state")
         async def watch_fleet_state(req: WatchRequest, name: str):
-            fleet_state = await get_fleet_state(name, RmfRepository(req.user))
+            store = app.rmf_state_store()
+            fleet_state = await app.rmf_snapshot_repo(req.user).get_fleet_state(name)
             if fleet_state is not None:
-                await req.emit(fleet_state.dict())
-            rx_watcher(
-                req,
-                app.rmf_events().fleet_states.pipe(
-                    rxops.filter(lambda x: cast(FleetState, x).name == name),
-                    rxops.map(cast(Any, lambda x: cast(FleetState, x).dict())),
-                ),
-            )
+                await req.emit(store.encode(topics.fleet_states, fleet_state))
+
+        self.broadcast(
+            "/{name}/state",
+            app.rmf_events().fleet_states,
+            lambda x: {"name": cast(FleetState, x).name},
+            lambda x: app.rmf_state_store().encode(topics.fleet_states, x),
+            lambda: app.rmf_state_store().values(topics.fleet_states),
+        )
 
         @self.get("/{fleet}/{robot}/health", response_model=RobotHealth)
         async def get_robot_health(
@@ -120,15 +140,20 @@ class FleetsRouter(FastIORouter):
 
         @self.watch("/{fleet}/{robot}/health")
         async def watch_robot_health(req: WatchRequest, fleet: str, robot: str):
-            health = await get_robot_health(fleet, robot, RmfRepository(req.user))
+            store = app.rmf_state_store()
+            rmf_repo = app.rmf_snapshot_repo(req.user)
+            health = await get_robot_health(fleet, robot, rmf_repo)
             if health is not None:
-                await req.emit(health.dict())
-            rx_watcher(
-                req,
-                app.rmf_events().robot_health.pipe(
-                    rxops.filter(
-                        lambda x: cast(RobotHealth, x).id_ == f"{fleet}/{robot}"
-                    ),
-                    rxops.map(cast(Any, lambda x: cast(RobotHealth, x).dict())),
-                ),
-            )
+                await req.emit(store.encode(topics.robot_health, health))
+
+        def robot_health_params(health: RobotHealth):
+            fleet, robot = health.id_.split("/", 1)
+            return {"fleet": fleet, "robot": robot}
+
+        self.broadcast(
+            "/{fleet}/{robot}/health",
+            app.rmf_events().robot_health,
+            robot_health_params,
+            lambda x: app.rmf_state_store().encode(topics.robot_health, x),
+            lambda: app.rmf_state_store().values(topics.robot_health),
+        )
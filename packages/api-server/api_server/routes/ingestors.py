@@ -1,14 +1,14 @@
-from typing import Any, List, cast
+from typing import List, cast
 
-from fastapi import Depends
-from rx import operators as rxops
+from fastapi import Depends, Request, Response
 
 from api_server.base_app import BaseApp
 from api_server.fast_io import FastIORouter, WatchRequest
 from api_server.models import Ingestor, IngestorHealth, IngestorState
 from api_server.repositories import RmfRepository
+from api_server.rmf_io import topics
 
-from .utils import rx_watcher
+from .utils import json_response, not_modified
 
 
 class IngestorsRouter(FastIORouter):
@@ -16,30 +16,53 @@ class IngestorsRouter(FastIORouter):
         super().__init__(tags=["Ingestors"])
 
         @self.get("", response_model=List[Ingestor])
-        async def get_ingestors(rmf_repo: RmfRepository = Depends(app.rmf_repo)):
+        async def get_ingestors(
+            request: Request,
+            response: Response,
+            rmf_repo: RmfRepository = Depends(app.rmf_repo),
+        ):
+            etag = app.rmf_state_store().etag(topics.ingestor_states)
+            unchanged = not_modified(request, response, etag)
+            if unchanged is not None:
+                return unchanged
             return await rmf_repo.get_ingestors()
 
         @self.get("/{guid}/state", response_model=IngestorState)
         async def get_ingestor_state(
-            guid: str, rmf_repo: RmfRepository = Depends(app.rmf_repo)
+            guid: str,
+            request: Request,
+            response: Response,
+            rmf_repo: RmfRepository = Depends(app.rmf_repo),
         ):
             """
             Available in socket.io
             """
-            return await rmf_repo.get_ingestor_state(guid)
+            etag = app.rmf_state_store().etag(topics.ingestor_states, guid)
+            unchanged = not_modified(request, response, etag)
+            if unchanged is not None:
+                return unchanged
+            state = await rmf_repo.get_ingestor_state(guid)
+            if state is None:
+                return None
+            return json_response(
+                app.rmf_state_store().encode(topics.ingestor_states, state), response
+            )
 
         @self.watch("/{guid}/state")
         async def watch_ingestor_state(req: WatchRequest, guid: str):
-            ingestor_state = await get_ingestor_state(guid, RmfRepository(req.user))
+            store = app.rmf_state_store()
+            rmf_repo = app.rmf_snapshot_repo(req.user)
+            ingestor_state = await rmf_repo.get_ingestor_state(guid)
             if ingestor_state is not None:
-                await req.emit(ingestor_state.dict())
-            rx_watcher(
-                req,
-                app.rmf_events().ingestor_states.pipe(
-                    rxops.filter(lambda x: cast(IngestorState, x).guid == guid),
-                    rxops.map(cast(Any, lambda x: cast(IngestorState, x).dict())),
-                ),
-            )
+                await req.emit(store.encode(topics.ingestor_states, ingestor_state))
+
+        self.broadcast(
+            "/{guid}/state",
+            app.rmf_events().ingestor_states,
+            lambda x: {"guid": cast(IngestorState, x).guid},
+            lambda x: app.rmf_state_store().encode(topics.ingestor_states, x),
+            lambda: app.rmf_state_store().values(topics.ingestor_states),
+        )
 
         @self.get("/{guid}/health", response_model=IngestorHealth)
         async def get_ingestor_health(
@@ -52,13 +75,15 @@ class IngestorsRouter(FastIORouter):
 
         @self.watch("/{guid}/health")
         async def watch_ingestor_health(req: WatchRequest, guid: str):
-            health = await get_ingestor_health(guid, RmfRepository(req.user))
+            store = app.rmf_state_store()
+            health = await get_ingestor_health(guid, app.rmf_snapshot_repo(req.user))
             if health is not None:
-                await req.emit(health.dict())
-            rx_watcher(
-                req,
-                app.rmf_events().ingestor_health.pipe(
-                    rxops.filter(lambda x: cast(IngestorHealth, x).id_ == guid),
-                    rxops.map(cast(Any, lambda x: cast(IngestorHealth, x).dict())),
-                ),
-            )
+                await req.emit(store.encode(topics.ingestor_health, health))
+
+        self.broadcast(
+            "/{guid}/health",
+            app.rmf_events().ingestor_health,
+            lambda x: {"guid": cast(IngestorHealth, x).id_},
+            lambda x: app.rmf_state_store().encode(topics.ingestor_health, x),
+            lambda: app.rmf_state_store().values(topics.ingestor_health),
+        )
@@ -1,14 +1,14 @@
-from typing import Any, List, cast
+from typing import List, cast
 
-from fastapi import Depends
-from rx import operators as rxops
+from fastapi import Depends, Request, Response
 
 from api_server.base_app import BaseApp
 from api_server.fast_io import FastIORouter, WatchRequest
 from api_server.models import Lift, LiftHealth, LiftRequest, LiftState
 from api_server.repositories import RmfRepository
+from api_server.rmf_io import topics
 
-from .utils import rx_watcher
+from .utils import json_response, not_modified
 
 
 class LiftsRouter(FastIORouter):
@@ -16,30 +16,52 @@ class LiftsRouter(FastIORouter):
         super().__init__(tags=["Lifts"])
 
         @self.get("", response_model=List[Lift])
-        async def get_lifts(rmf_repo: RmfRepository = Depends(app.rmf_repo)):
+        async def get_lifts(
+            request: Request,
+            response: Response,
+            rmf_repo: RmfRepository = Depends(app.rmf_repo),
+        ):
+            etag = app.rmf_state_store().building_map.etag()
+            unchanged = not_modified(request, response, etag)
+            if unchanged is not None:
+                return unchanged
             return await rmf_repo.get_lifts()
 
         @self.get("/{lift_name}/state", response_model=LiftState)
         async def get_lift_state(
-            lift_name: str, rmf_repo: RmfRepository = Depends(app.rmf_repo)
+            lift_name: str,
+            request: Request,
+            response: Response,
+            rmf_repo: RmfRepository = Depends(app.rmf_repo),
         ):
             """
             Available in socket.io
             """
-            return await rmf_repo.get_lift_state(lift_name)
+            etag = app.rmf_state_store().etag(topics.lift_states, lift_name)
+            unchanged = not_modified(request, response, etag)
+            if unchanged is not None:
+                return unchanged
+            state = await rmf_repo.get_lift_state(lift_name)
+            if state is None:
+                return None
+            return json_response(
+                app.rmf_state_store().encode(topics.lift_states, state), response
+            )
 
         @self.watch("/{lift_name}/state")
         async def watch_lift_state(req: WatchRequest, lift_name: str):
-            lift_state = await get_lift_state(lift_name, RmfRepository(req.user))
+            store = app.rmf_state_store()
+            lift_state = await app.rmf_snapshot_repo(req.user).get_lift_state(lift_name)
             if lift_state is not None:
-                await req.emit(lift_state.dict())
-            rx_watcher(
-                req,
-                app.rmf_events().lift_states.pipe(
-                    rxops.filter(lambda x: cast(LiftState, x).lift_name == lift_name),
-                    rxops.map(cast(Any, lambda x: cast(LiftState, x).dict())),
-                ),
-            )
+                await req.emit(store.encode(topics.lift_states, lift_state))
+
+        self.broadcast(
+            "/{lift_name}/state",
+            app.rmf_events().lift_states,
+            lambda x: {"lift_name": cast(LiftState, x).lift_name},
+            lambda x: app.rmf_state_store().encode(topics.lift_states, x),
+            lambda: app.rmf_state_store().values(topics.lift_states),
+        )
 
         @self.get("/{lift_name}/health", response_model=LiftHealth)
         async def get_lift_health(
@@ -52,16 +74,18 @@ class LiftsRouter(FastIORouter):
 
         @self.watch("/{lift_name}/health")
         async def watch_lift_health(req: WatchRequest, lift_name: str):
-            health = await get_lift_health(lift_name, RmfRepository(req.user))
+            store = app.rmf_state_store()
+            health = await get_lift_health(lift_name, app.rmf_snapshot_repo(req.user))
             if health is not None:
-                await req.emit(health.dict())
-            rx_watcher(
-                req,
-                app.rmf_events().lift_health.pipe(
-                    rxops.filter(lambda x: cast(LiftHealth, x).id_ == lift_name),
-                    rxops.map(cast(Any, lambda x: cast(LiftHealth, x).dict())),
-                ),
-            )
+                await req.emit(store.encode(topics.lift_health, health))
+
+        self.broadcast(
+            "/{lift_name}/health",
+            app.rmf_events().lift_health,
+            lambda x: {"lift_name": cast(LiftHealth, x).id_},
+            lambda x: app.rmf_state_store().encode(topics.lift_health, x),
+            lambda: app.rmf_state_store().values(topics.lift_health),
+        )
 
         @self.post("/{lift_name}/request")
         def _post_lift_request(
@@ -53,7 +53,8 @@ class TasksRouter(FastIORouter):
         @self.watch("/{task_id}/summary")
         async def watch_task_summary(req: WatchRequest, task_id: str):
             try:
-                await req.emit(await get_task_summary(RmfRepository(req.user), task_id))
+                rmf_repo = app.rmf_snapshot_repo(req.user)
+                await req.emit(await get_task_summary(rmf_repo, task_id))
             except HTTPException:
                 pass
             rx_watcher(
@@ -10,3 +10,12 @@ class TestBuildingMapRoute(AppFixture):
         self.assertEqual(200, resp.status_code)
         result_map = resp.json()
         self.assertEqual(building_map.name, result_map["name"])
+
+    def test_get_building_map_not_modified(self):
+        self.app.rmf_events().building_map.on_next(make_building_map())
+        resp = self.session.get("/building_map")
+        etag = resp.headers["ETag"]
+        # same content, same version
+        self.app.rmf_events().building_map.on_next(make_building_map())
+        resp = self.session.get("/building_map", headers={"If-None-Match": etag})
+        self.assertEqual(304, resp.status_code)
@@ -27,6 +27,22 @@ class TestDoorsRoute(AppFixture):
         state = resp.json()
         self.assertEqual("test_door", state["door_name"])
 
+    def test_get_door_state_not_modified(self):
+        self.app.rmf_events().door_states.on_next(make_door_state("etag_door"))
+        resp = self.session.get("/doors/etag_door/state")
+        self.assertEqual(200, resp.status_code)
+        etag = resp.headers["ETag"]
+        headers = {"If-None-Match": etag}
+
+        resp = self.session.get("/doors/etag_door/state", headers=headers)
+        self.assertEqual(304, resp.status_code)
+        self.assertEqual(b"", resp.content)
+
+        self.app.rmf_events().door_states.on_next(make_door_state("etag_door"))
+        resp = self.session.get("/doors/etag_door/state", headers=headers)
+        self.assertEqual(200, resp.status_code)
+        self.assertNotEqual(etag, resp.headers["ETag"])
+
     def test_watch_door_state(self):
         door_state = make_door_state("test_door")
         door_state.door_time.sec = 1
@@ -40,6 +56,18 @@ class TestDoorsRoute(AppFixture):
         result = fut.result(0)
         self.assertEqual(1, result["door_time"]["sec"])
 
+    def test_watch_door_state_collection(self):
+        fut = self.subscribe_sio("/doors/*/state")
+
+        def wait():
+            self.app.rmf_events().door_states.on_next(
+                make_door_state("collection_door")
+            )
+            return fut.done()
+
+        try_until(wait, lambda x: x)
+        self.assertIn("door_name", fut.result(0))
+
     def test_post_door_request(self):
         resp = self.session.post(
             "/doors/test_door/request", json={"mode": RmfDoorMode.MODE_OPEN}
@@ -1,10 +1,12 @@
 import asyncio
+from typing import Optional
 
+from fastapi import Request, Response
 from rx import operators as rxops
 from rx.core.observable.observable import Observable
 from rx.scheduler.eventloop.asyncioscheduler import AsyncIOScheduler
 
-from api_server.fast_io import WatchRequest
+from api_server.fast_io import EncodedJson, WatchRequest
 
 
 def rx_watcher(req: WatchRequest, target: Observable):
@@ -17,3 +19,35 @@ def rx_watcher(req: WatchRequest, target: Observable):
     loop = asyncio.get_event_loop()
     sub = target.pipe(rxops.observe_on(AsyncIOScheduler(loop))).subscribe(handle)
     req.on_unsubscribe(sub.dispose)
+
+
+def not_modified(
+    request: Request, response: Response, etag: Optional[str]
+) -> Optional[Response]:
+    """
+    Sets the `ETag` of a response. Returns a "304 Not Modified" response if the client
+    already has the same version (sent in `If-None-Match`), else None.
+    """
+    if etag is None:
+        return None
+    response.headers["ETag"] = etag
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return None
+    # weak comparison, https://tools.ietf.org/html/rfc7232#section-3.2
+    tags = [t.strip() for t in if_none_match.split(",")]
+    if "*" in tags or etag in [t[2:] if t.startswith("W/") else t for t in tags]:
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+
+def json_response(encoded: EncodedJson, response: Response) -> Response:
+    """
+    Returns json that is already encoded as is, keeping the `ETag` set on `response`.
+    """
+    etag = response.headers.get("etag")
+    return Response(
+        content=encoded.json,
+        media_type="application/json",
+        headers={"ETag": etag} if etag is not None else None,
+    )
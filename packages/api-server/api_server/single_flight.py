@@ -0,0 +1,70 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class SingleFlightStats:
+    loads: int = 0
+    shared: int = 0
+    hits: int = 0
+
+
+class SingleFlight(Generic[T]):
+    """
+    Concurrent reads of the same key share one in-flight load, and the result is kept
+    for `ttl` seconds, so a burst of reads, e.g. every client re-subscribing after a
+    restart, costs one load per key. Failed loads and `None` results, e.g. an entity
+    that does not exist yet, are not kept. The results are shared, they must not be
+    modified.
+
+    A load keeps running if the read that started it is cancelled, the other reads of
+    the key still get its result.
+    """
+
+    def __init__(self, ttl: float = 1, maxsize: int = 10000):
+        """
+        :param ttl: Seconds that a result is kept for, 0 only shares in-flight loads.
+        :param maxsize: Max number of results kept, the oldest is dropped when full.
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.stats = SingleFlightStats()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        # (expires at, result)
+        self._results: Dict[Hashable, Tuple[float, T]] = {}
+
+    async def get(self, key: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+        loop = asyncio.get_event_loop()
+        cached = self._results.get(key)
+        if cached is not None:
+            if cached[0] > loop.time():
+                self.stats.hits += 1
+                return cached[1]
+            del self._results[key]
+        fut = self._inflight.get(key)
+        if fut is None:
+            self.stats.loads += 1
+            fut = asyncio.ensure_future(load())
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda f: self._on_done(key, f))
+        else:
+            self.stats.shared += 1
+        return await asyncio.shield(fut)
+
+    def invalidate(self, key: Hashable):
+        self._results.pop(key, None)
+
+    def _on_done(self, key: Hashable, fut: asyncio.Future):
+        if self._inflight.get(key) is fut:
+            del self._inflight[key]
+        # retrieves the exception so that it is not reported when nobody is waiting
+        if fut.cancelled() or fut.exception() is not None or self.ttl <= 0:
+            return
+        if fut.result() is None:
+            return
+        if len(self._results) >= self.maxsize:
+            del self._results[next(iter(self._results))]
+        self._results[key] = (asyncio.get_event_loop().time() + self.ttl, fut.result())
@@ -0,0 +1,94 @@
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from builtin_interfaces.msg import Time as RosTime
+from rmf_task_msgs.srv import CancelTask as RmfCancelTask
+from rmf_task_msgs.srv import SubmitTask as RmfSubmitTask
+
+from .models import TaskSummary
+from .repositories import StaticFilesRepository
+from .rmf_io import RmfEvents
+from .ros_time import py_to_ros_time
+
+
+class _ReadyService:
+    @staticmethod
+    def wait_for_service(_timeout_sec: Optional[float] = None) -> bool:
+        return True
+
+
+class StandInGateway:
+    """
+    Base class for gateways that publish to `RmfEvents` without connecting to RMF, it has
+    the same interface that `App` and the routes use on `RmfGateway`.
+    Events are published from a background thread running `_run` between `subscribe_all`
+    and `unsubscribe_all`, `_run` should return when `_stop` is set.
+    """
+
+    def __init__(
+        self,
+        rmf_events: RmfEvents,
+        static_files: StaticFilesRepository,
+        *,
+        logger: logging.Logger = None,
+    ):
+        self.rmf_events = rmf_events
+        self.static_files = static_files
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self.get_tasks_srv = _ReadyService()
+        self._tasks: Dict[str, TaskSummary] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _run(self):
+        raise NotImplementedError()
+
+    def spin_background(self, _num_threads: int = 1):
+        pass
+
+    def stop_spinning(self):
+        self.unsubscribe_all()
+
+    def subscribe_all(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.start()
+
+    def unsubscribe_all(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    @staticmethod
+    def now() -> RosTime:
+        return py_to_ros_time(datetime.now())
+
+    async def get_tasks(self) -> List[TaskSummary]:
+        return list(self._tasks.values())
+
+    def request_door(self, door_name: str, mode: int) -> None:
+        self.logger.info(f'ignored door request to "{door_name}" ({mode})')
+
+    def request_lift(
+        self, lift_name: str, destination: str, request_type: int, door_mode: int
+    ):
+        self.logger.info(
+            f'ignored lift request to "{lift_name}" ({destination}, {request_type}, {door_mode})'
+        )
+
+    async def submit_task(
+        self, _req_msg: RmfSubmitTask.Request
+    ) -> RmfSubmitTask.Response:
+        return RmfSubmitTask.Response(
+            success=False, message=f"{self.__class__.__name__} does not accept tasks"
+        )
+
+    async def cancel_task(
+        self, _req_msg: RmfCancelTask.Request
+    ) -> RmfCancelTask.Response:
+        return RmfCancelTask.Response(
+            success=False, message=f"{self.__class__.__name__} does not accept tasks"
+        )
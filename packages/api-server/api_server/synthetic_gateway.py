@@ -0,0 +1,527 @@
+import argparse
+import dataclasses
+import logging
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import uvicorn
+from rmf_building_map_msgs.msg import Door as RmfDoor
+from rmf_door_msgs.msg import DoorMode as RmfDoorMode
+from rmf_fleet_msgs.msg import RobotMode as RmfRobotMode
+from rmf_lift_msgs.msg import LiftState as RmfLiftState
+from rmf_task_msgs.msg import TaskSummary as RmfTaskSummary
+from rmf_task_msgs.srv import CancelTask as RmfCancelTask
+from rmf_task_msgs.srv import SubmitTask as RmfSubmitTask
+
+from .models import (
+    BuildingMap,
+    Door,
+    DoorMode,
+    DoorState,
+    FleetState,
+    Level,
+    Lift,
+    LiftState,
+    Location,
+    RobotMode,
+    RobotState,
+    TaskSummary,
+)
+from .models.ros_pydantic import (
+    builtin_interfaces,
+    rmf_building_map_msgs,
+    rmf_task_msgs,
+)
+from .repositories import StaticFilesRepository
+from .rmf_io import RmfEvents
+from .stand_in_gateway import StandInGateway
+
+GridPoint = Tuple[int, int]
+
+
+@dataclass
+class SyntheticSite:
+    """
+    Size and publishing rates (in hz) of a synthetic site, a rate of 0 disables the topic.
+    Each level has a square grid nav graph of `grid_size` x `grid_size` waypoints,
+    `grid_spacing` meters apart.
+    """
+
+    levels: int = 2
+    doors_per_level: int = 20
+    lifts: int = 4
+    fleets: int = 2
+    robots_per_fleet: int = 10
+    grid_size: int = 20
+    grid_spacing: float = 5.0
+    robot_speed: float = 1.0
+    door_rate: float = 1.0
+    lift_rate: float = 1.0
+    fleet_rate: float = 2.0
+    seed: int = 0
+
+
+def _ros_time(t: float) -> builtin_interfaces.Time:
+    return builtin_interfaces.Time.construct(
+        sec=int(t), nanosec=int((t % 1) * 1000000000)
+    )
+
+
+class _Robot:
+    def __init__(self, fleet: str, name: str, level: str, waypoint: GridPoint):
+        self.fleet = fleet
+        self.name = name
+        self.level = level
+        self.waypoint = waypoint
+        self.path: List[GridPoint] = []
+        # distance travelled from `waypoint` towards `path[0]`
+        self.progress = 0.0
+        self.dwell = 0.0
+        self.task_id = ""
+        self.battery = 100.0
+        self.seq = 0
+
+
+class _Lift:
+    def __init__(self, name: str, floors: List[str]):
+        self.name = name
+        self.floors = floors
+        self.current = 0
+        self.destination = 0
+        self.session_id = ""
+
+
+class SyntheticGateway(StandInGateway):
+    """
+    Stand-in for `RmfGateway` that simulates a site of configurable size, for load testing
+    without RMF. Robots wander along the nav graph and submitted tasks are assigned to the
+    idle robots of a fleet, a task completes when its robot reaches a random waypoint.
+    Door and lift requests are applied to the simulated doors and lifts.
+
+    .. code-block::
+        app = App(
+            rmf_gateway_fc=lambda rmf_events, static_files: SyntheticGateway(
+                rmf_events, static_files, SyntheticSite(fleets=50, robots_per_fleet=100)
+            )
+        )
+    """
+
+    def __init__(
+        self,
+        rmf_events: RmfEvents,
+        static_files: StaticFilesRepository,
+        site: Optional[SyntheticSite] = None,
+        *,
+        logger: logging.Logger = None,
+    ):
+        super().__init__(rmf_events, static_files, logger=logger)
+        self.site = site or SyntheticSite()
+        self.published = 0
+        self._random = random.Random(self.site.seed)
+        self._lock = threading.Lock()
+        self._task_count = 0
+        self._queued: Dict[str, List[str]] = {}
+
+        self.building_map = self._make_building_map()
+        self._door_modes: Dict[str, int] = {
+            door.name: RmfDoorMode.MODE_CLOSED
+            for level in self.building_map.levels
+            for door in level.doors
+        }
+        floors = [level.name for level in self.building_map.levels]
+        self._lifts = [_Lift(lift.name, floors) for lift in self.building_map.lifts]
+        self._robots: Dict[str, List[_Robot]] = {}
+        for i in range(self.site.fleets):
+            fleet = f"fleet_{i}"
+            self._queued[fleet] = []
+            self._robots[fleet] = [
+                _Robot(
+                    fleet,
+                    f"{fleet}_robot_{j}",
+                    self._random.choice(floors),
+                    self._random_waypoint(),
+                )
+                for j in range(self.site.robots_per_fleet)
+            ]
+
+    def _random_waypoint(self) -> GridPoint:
+        return (
+            self._random.randrange(self.site.grid_size),
+            self._random.randrange(self.site.grid_size),
+        )
+
+    def _make_building_map(self) -> BuildingMap:
+        size = self.site.grid_size
+        spacing = self.site.grid_spacing
+        levels = []
+        for i in range(self.site.levels):
+            name = f"L{i}"
+            vertices = [
+                rmf_building_map_msgs.GraphNode(
+                    x=x * spacing, y=y * spacing, name=f"{name}_{x}_{y}"
+                )
+                for x in range(size)
+                for y in range(size)
+            ]
+            edges = []
+            for x in range(size):
+                for y in range(size):
+                    if x + 1 < size:
+                        edges.append(
+                            rmf_building_map_msgs.GraphEdge(
+                                v1_idx=x * size + y, v2_idx=(x + 1) * size + y
+                            )
+                        )
+                    if y + 1 < size:
+                        edges.append(
+                            rmf_building_map_msgs.GraphEdge(
+                                v1_idx=x * size + y, v2_idx=x * size + y + 1
+                            )
+                        )
+            doors = []
+            for j in range(self.site.doors_per_level):
+                x, y = self._random_waypoint()
+                door_x = (x + 0.5) * spacing
+                doors.append(
+                    Door(
+                        name=f"{name}_door_{j}",
+                        v1_x=door_x,
+                        v1_y=y * spacing - 0.5,
+                        v2_x=door_x,
+                        v2_y=y * spacing + 0.5,
+                        door_type=RmfDoor.DOOR_TYPE_SINGLE_SLIDING,
+                        motion_range=1.0,
+                        motion_direction=1,
+                    )
+                )
+            levels.append(
+                Level(
+                    name=name,
+                    elevation=i * 4.0,
+                    images=[],
+                    doors=doors,
+                    nav_graphs=[
+                        rmf_building_map_msgs.Graph(
+                            name="0", vertices=vertices, edges=edges
+                        )
+                    ],
+                )
+            )
+        lifts = []
+        for i in range(self.site.lifts):
+            x, y = self._random_waypoint()
+            lifts.append(
+                Lift(
+                    name=f"lift_{i}",
+                    levels=[level.name for level in levels],
+                    doors=[Door(name=f"lift_{i}_door")],
+                    ref_x=x * spacing,
+                    ref_y=y * spacing,
+                    width=2.0,
+                    depth=2.0,
+                )
+            )
+        return BuildingMap(name="synthetic_site", levels=levels, lifts=lifts)
+
+    def _route(self, start: GridPoint) -> List[GridPoint]:
+        """
+        Returns the waypoints from `start` to a random waypoint, moving along x first.
+        """
+        end = self._random_waypoint()
+        while end == start and self.site.grid_size > 1:
+            end = self._random_waypoint()
+        path = []
+        x, y = start
+        while x != end[0]:
+            x += 1 if end[0] > x else -1
+            path.append((x, y))
+        while y != end[1]:
+            y += 1 if end[1] > y else -1
+            path.append((x, y))
+        return path
+
+    def _location(self, level: str, point: GridPoint, t: float) -> Location:
+        spacing = self.site.grid_spacing
+        return Location.construct(
+            t=_ros_time(t),
+            x=point[0] * spacing,
+            y=point[1] * spacing,
+            yaw=0.0,
+            level_name=level,
+            index=point[0] * self.site.grid_size + point[1],
+        )
+
+    def _step(self, dt: float, t: float):
+        for fleet, robots in self._robots.items():
+            queued = self._queued[fleet]
+            for robot in robots:
+                if queued and not robot.task_id:
+                    self._start_task(robot, queued.pop(0), t)
+                self._move(robot, dt, t)
+        for lift in self._lifts:
+            if lift.current != lift.destination:
+                lift.current += 1 if lift.destination > lift.current else -1
+            elif self._random.random() < 0.1:
+                lift.destination = self._random.randrange(len(lift.floors))
+                lift.session_id = ""
+
+    def _move(self, robot: _Robot, dt: float, t: float):
+        robot.battery = max(robot.battery - 0.001 * dt, 0.0)
+        if not robot.path:
+            if robot.dwell > 0:
+                robot.dwell -= dt
+                return
+            robot.path = self._route(robot.waypoint)
+            robot.progress = 0.0
+        distance = self.site.robot_speed * dt
+        while distance > 0 and robot.path:
+            remaining = self.site.grid_spacing - robot.progress
+            if distance < remaining:
+                robot.progress += distance
+                break
+            distance -= remaining
+            robot.waypoint = robot.path.pop(0)
+            robot.progress = 0.0
+            if not robot.path:
+                robot.dwell = self._random.uniform(0, 10)
+                if robot.task_id:
+                    self._finish_task(robot, t)
+
+    def _start_task(self, robot: _Robot, task_id: str, t: float):
+        robot.task_id = task_id
+        robot.dwell = 0.0
+        robot.path = self._route(robot.waypoint)
+        task = self._tasks[task_id].copy()
+        task.state = RmfTaskSummary.STATE_ACTIVE
+        task.robot_name = robot.name
+        task.start_time = _ros_time(t)
+        self._update_task(task)
+
+    def _finish_task(self, robot: _Robot, t: float):
+        task = self._tasks[robot.task_id].copy()
+        task.state = RmfTaskSummary.STATE_COMPLETED
+        task.end_time = _ros_time(t)
+        robot.task_id = ""
+        self._update_task(task)
+
+    def _update_task(self, task: TaskSummary):
+        self._tasks[task.task_id] = task
+        self.rmf_events.task_summaries.on_next(task)
+        self.published += 1
+
+    def _robot_state(self, robot: _Robot, t: float) -> RobotState:
+        spacing = self.site.grid_spacing
+        location = self._location(robot.level, robot.waypoint, t)
+        if robot.path:
+            dx = robot.path[0][0] - robot.waypoint[0]
+            dy = robot.path[0][1] - robot.waypoint[1]
+            location.x += dx * robot.progress
+            location.y += dy * robot.progress
+            location.yaw = math.atan2(dy, dx)
+            mode = RmfRobotMode.MODE_MOVING
+        else:
+            mode = RmfRobotMode.MODE_IDLE
+        robot.seq += 1
+        return RobotState.construct(
+            name=robot.name,
+            model="synthetic_robot",
+            task_id=robot.task_id,
+            seq=robot.seq,
+            mode=RobotMode.construct(mode=mode, mode_request_id=0),
+            battery_percent=robot.battery,
+            location=location,
+            path=[
+                self._location(
+                    robot.level, p, t + (i + 1) * spacing / self.site.robot_speed
+                )
+                for i, p in enumerate(robot.path)
+            ],
+        )
+
+    def _publish_doors(self, t: float):
+        for name, mode in self._door_modes.items():
+            if self._random.random() < 0.05:
+                mode = (
+                    RmfDoorMode.MODE_OPEN
+                    if mode == RmfDoorMode.MODE_CLOSED
+                    else RmfDoorMode.MODE_CLOSED
+                )
+                self._door_modes[name] = mode
+            self.rmf_events.door_states.on_next(
+                DoorState.construct(
+                    door_time=_ros_time(t),
+                    door_name=name,
+                    current_mode=DoorMode.construct(value=mode),
+                )
+            )
+            self.published += 1
+
+    def _publish_lifts(self, t: float):
+        for lift in self._lifts:
+            if lift.current < lift.destination:
+                motion_state = RmfLiftState.MOTION_UP
+            elif lift.current > lift.destination:
+                motion_state = RmfLiftState.MOTION_DOWN
+            else:
+                motion_state = RmfLiftState.MOTION_STOPPED
+            self.rmf_events.lift_states.on_next(
+                LiftState.construct(
+                    lift_time=_ros_time(t),
+                    lift_name=lift.name,
+                    available_floors=lift.floors,
+                    current_floor=lift.floors[lift.current],
+                    destination_floor=lift.floors[lift.destination],
+                    door_state=RmfLiftState.DOOR_CLOSED,
+                    motion_state=motion_state,
+                    available_modes=[RmfLiftState.MODE_AGV],
+                    current_mode=RmfLiftState.MODE_AGV,
+                    session_id=lift.session_id,
+                )
+            )
+            self.published += 1
+
+    def _publish_fleets(self, t: float):
+        for fleet, robots in self._robots.items():
+            self.rmf_events.fleet_states.on_next(
+                FleetState.construct(
+                    name=fleet, robots=[self._robot_state(r, t) for r in robots]
+                )
+            )
+            self.published += 1
+
+    def _run(self):
+        self.logger.info(
+            f"simulating {self.site.fleets * self.site.robots_per_fleet} robots, "
+            f"{len(self._door_modes)} doors and {len(self._lifts)} lifts"
+        )
+        self.rmf_events.building_map.on_next(self.building_map)
+        publishers = [
+            (self._publish_doors, self.site.door_rate),
+            (self._publish_lifts, self.site.lift_rate),
+            (self._publish_fleets, self.site.fleet_rate),
+        ]
+        publishers = [(publish, 1 / rate) for publish, rate in publishers if rate > 0]
+        if not publishers:
+            return
+        last = time.perf_counter()
+        next_due = [last] * len(publishers)
+        while not self._stop.is_set():
+            now = time.perf_counter()
+            t = time.time()
+            with self._lock:
+                self._step(now - last, t)
+                for i, (publish, period) in enumerate(publishers):
+                    if now >= next_due[i]:
+                        publish(t)
+                        # skip the missed periods if publishing falls behind
+                        next_due[i] = max(next_due[i] + period, now)
+            last = now
+            self._stop.wait(max(min(next_due) - time.perf_counter(), 0))
+
+    async def get_tasks(self) -> List[TaskSummary]:
+        with self._lock:
+            return list(self._tasks.values())
+
+    def request_door(self, door_name: str, mode: int) -> None:
+        with self._lock:
+            if door_name in self._door_modes:
+                self._door_modes[door_name] = mode
+
+    def request_lift(
+        self, lift_name: str, destination: str, request_type: int, door_mode: int
+    ):
+        with self._lock:
+            for lift in self._lifts:
+                if lift.name == lift_name and destination in lift.floors:
+                    lift.destination = lift.floors.index(destination)
+                    lift.session_id = "synthetic_gateway"
+
+    async def submit_task(
+        self, req_msg: RmfSubmitTask.Request
+    ) -> RmfSubmitTask.Response:
+        if not self._robots:
+            return RmfSubmitTask.Response(success=False, message="site has no fleets")
+        with self._lock:
+            fleet = list(self._robots)[self._task_count % len(self._robots)]
+            task_id = f"synthetic_task_{self._task_count}"
+            self._task_count += 1
+            submission_time = _ros_time(time.time())
+            task = TaskSummary(
+                fleet_name=fleet,
+                task_id=task_id,
+                task_profile=rmf_task_msgs.TaskProfile(
+                    task_id=task_id,
+                    submission_time=submission_time,
+                    description=rmf_task_msgs.TaskDescription.from_msg(
+                        req_msg.description
+                    ),
+                ),
+                state=RmfTaskSummary.STATE_QUEUED,
+                submission_time=submission_time,
+            )
+            self._queued[fleet].append(task_id)
+            self._update_task(task)
+        return RmfSubmitTask.Response(success=True, task_id=task_id)
+
+    async def cancel_task(
+        self, req_msg: RmfCancelTask.Request
+    ) -> RmfCancelTask.Response:
+        with self._lock:
+            task = self._tasks.get(req_msg.task_id)
+            if task is None or task.state not in (
+                RmfTaskSummary.STATE_QUEUED,
+                RmfTaskSummary.STATE_ACTIVE,
+            ):
+                return RmfCancelTask.Response(
+                    success=False, message=f'task "{req_msg.task_id}" is not active'
+                )
+            if task.task_id in self._queued[task.fleet_name]:
+                self._queued[task.fleet_name].remove(task.task_id)
+            for robot in self._robots[task.fleet_name]:
+                if robot.task_id == task.task_id:
+                    robot.task_id = ""
+            task = task.copy()
+            task.state = RmfTaskSummary.STATE_CANCELED
+            task.end_time = _ros_time(time.time())
+            self._update_task(task)
+        return RmfCancelTask.Response(success=True)
+
+
+def main():
+    # pylint: disable=import-outside-toplevel
+    from .app import App
+
+    parser = argparse.ArgumentParser(
+        description="runs the api server with a synthetic site instead of rmf"
+    )
+    for field in dataclasses.fields(SyntheticSite):
+        parser.add_argument(
+            f"--{field.name.replace('_', '-')}",
+            type=field.type,
+            default=field.default,
+        )
+    args = parser.parse_args()
+    site = SyntheticSite(
+        **{f.name: getattr(args, f.name) for f in dataclasses.fields(SyntheticSite)}
+    )
+
+    app = App(
+        rmf_gateway_fc=lambda rmf_events, static_files: SyntheticGateway(
+            rmf_events, static_files, site
+        )
+    )
+    uvicorn.run(
+        app,
+        host=app.app_config.host,
+        port=app.app_config.port,
+        root_path=app.app_config.public_url.path,
+        log_level=app.app_config.log_level.lower(),
+    )
+
+
+if __name__ == "__main__":
+    main()
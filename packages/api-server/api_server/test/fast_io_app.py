@@ -6,10 +6,10 @@ from rx import operators as rxops
 from rx.core.observable.observable import Observable
 from rx.subject.subject import Subject
 
-from api_server.fast_io import FastIO, FastIORouter, WatchRequest
+from api_server.fast_io import FastIO, FastIORouter, SioJson, WatchRequest
 from api_server.routes.utils import rx_watcher
 
-sio = socketio.AsyncServer(async_mode="asgi")
+sio = socketio.AsyncServer(async_mode="asgi", json=SioJson)
 app = FastIO(sio)
 router = FastIORouter()
 router_with_prefix = FastIORouter(prefix="/router_with_prefix")
@@ -19,6 +19,8 @@ target = Subject()
 target_with_prefix = Subject()
 target_include_with_prefix = Subject()
 target_both_prefix = Subject()
+target_broadcast = Subject()
+store_availability: Dict[str, Dict] = {}
 
 
 class ReturnVideo(pydantic.BaseModel):
@@ -74,6 +76,28 @@ def router_both_prefix_post_return_video(return_video: ReturnVideo):
     target_both_prefix.on_next({"film": return_video.film_title, "available": True})
 
 
+@router_with_prefix.watch("/video_store/{film_title}/available")
+def router_with_prefix_watch_store_availability(
+    req: WatchRequest, film_title: str
+):  # pylint: disable=unused-argument
+    pass
+
+
+router_with_prefix.broadcast(
+    "/video_store/{film_title}/available",
+    target_broadcast,
+    lambda x: {"film_title": cast(Dict, x)["film"]},
+    values=lambda: list(store_availability.values()),
+)
+
+
+@router_with_prefix.post("/video_store/return_video")
+def router_with_prefix_post_store_return_video(return_video: ReturnVideo):
+    availability = {"film": return_video.film_title, "available": True}
+    store_availability[return_video.film_title] = availability
+    target_broadcast.on_next(availability)
+
+
 app.include_router(router)
 app.include_router(router_with_prefix)
 app.include_router(router_include_with_prefix, prefix="/router_include_with_prefix")
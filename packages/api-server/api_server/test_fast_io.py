@@ -75,6 +75,118 @@ class TestFastIO(unittest.TestCase):
     def test_receive_events_router_both_prefix(self):
         self.check_events("/include_prefix/router_both_prefix")
 
+    def test_receive_broadcast_events(self):
+        path = "/router_with_prefix/video_store/aegis rim/available"
+        other_client = socketio.Client()
+        other_client.connect(self.base_url)
+        try:
+            event_futs = []
+            for client in [self.client, other_client]:
+                resp_fut = Future()
+                client.on("subscribe", resp_fut.set_result)
+                client.emit("subscribe", {"path": path})
+                self.assertTrue(resp_fut.result(1)["success"])
+                event_fut = Future()
+                client.on(path, event_fut.set_result)
+                event_futs.append(event_fut)
+
+            resp = requests.post(
+                f"{self.base_url}/router_with_prefix/video_store/return_video",
+                json={"film_title": "aegis rim"},
+            )
+            self.assertEqual(200, resp.status_code)
+            for event_fut in event_futs:
+                event = event_fut.result(1)
+                self.assertEqual(event["film"], "aegis rim")
+        finally:
+            other_client.eio.http.close()
+            other_client.disconnect()
+
+    def test_receive_collection_events(self):
+        path = "/router_with_prefix/video_store/*/available"
+        resp_fut = Future()
+        self.client.on("subscribe", resp_fut.set_result)
+        self.client.emit("subscribe", {"path": path})
+        self.assertTrue(resp_fut.result(1)["success"])
+        films = set()
+        done_fut = Future()
+
+        def on_event(data):
+            films.add(data["film"])
+            if {"aegis rim", "ghost trick"} <= films and not done_fut.done():
+                done_fut.set_result(True)
+
+        self.client.on(path, on_event)
+        for film in ["aegis rim", "ghost trick"]:
+            resp = requests.post(
+                f"{self.base_url}/router_with_prefix/video_store/return_video",
+                json={"film_title": film},
+            )
+            self.assertEqual(200, resp.status_code)
+        self.assertTrue(done_fut.result(1))
+
+    def test_subscribe_not_a_collection(self):
+        resp_fut = Future()
+        self.client.on("subscribe", resp_fut.set_result)
+        self.client.emit("subscribe", {"path": "/video_rental/*/available"})
+        self.assertFalse(resp_fut.result(1)["success"])
+
+    def test_receive_batched_events(self):
+        path = "/router_with_prefix/video_store/aegis rim/available"
+        batch_client = socketio.Client()
+        batch_client.connect(self.base_url, auth={"batch": {"interval_ms": 20}})
+        try:
+            resp_fut = Future()
+            batch_client.on("subscribe", resp_fut.set_result)
+            batch_client.emit("subscribe", {"path": path})
+            self.assertTrue(resp_fut.result(1)["success"])
+            batch_fut = Future()
+            batch_client.on("batch", batch_fut.set_result)
+
+            for _ in range(3):
+                resp = requests.post(
+                    f"{self.base_url}/router_with_prefix/video_store/return_video",
+                    json={"film_title": "aegis rim"},
+                )
+                self.assertEqual(200, resp.status_code)
+            # updates of the same path in a frame are merged
+            frame = batch_fut.result(1)
+            self.assertEqual(frame, [[path, {"film": "aegis rim", "available": True}]])
+        finally:
+            batch_client.eio.http.close()
+            batch_client.disconnect()
+
+    def test_receive_throttled_events(self):
+        path = "/router_with_prefix/video_store/aegis rim/available"
+        resp_fut = Future()
+        self.client.on("subscribe", resp_fut.set_result)
+        self.client.emit("subscribe", {"path": path, "min_interval_ms": 0})
+        self.assertFalse(resp_fut.result(1)["success"])
+
+        resp_fut = Future()
+        self.client.on("subscribe", resp_fut.set_result)
+        self.client.emit("subscribe", {"path": path, "min_interval_ms": 1000})
+        self.assertTrue(resp_fut.result(1)["success"])
+        events = []
+        first_fut = Future()
+
+        def on_event(data):
+            events.append(data)
+            if not first_fut.done():
+                first_fut.set_result(data)
+
+        self.client.on(path, on_event)
+        for _ in range(3):
+            resp = requests.post(
+                f"{self.base_url}/router_with_prefix/video_store/return_video",
+                json={"film_title": "aegis rim"},
+            )
+            self.assertEqual(200, resp.status_code)
+        # the first update is sent right away, the rest are held for the interval
+        self.assertEqual(first_fut.result(1)["film"], "aegis rim")
+        time.sleep(0.5)
+        self.assertEqual(len(events), 1)
+
     def test_unsubscribe(self):
         path = "/video_rental/aegis rim/available"
 
@@ -0,0 +1,47 @@
+import json
+import logging
+import threading
+import unittest
+
+from pydantic import BaseModel
+
+from .logger import JsonMessage, QueueLogging
+
+
+class _Model(BaseModel):
+    name: str
+    value: int
+
+
+class _Records(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+        self.threads = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+        self.threads.append(threading.current_thread())
+
+
+class TestQueueLogging(unittest.TestCase):
+    def test_json_message(self):
+        message = JsonMessage(_Model(name="test", value=1))
+        self.assertEqual(json.loads(str(message)), {"name": "test", "value": 1})
+
+    def test_emits_on_background_thread(self):
+        parent = logging.Logger("test_parent")
+        records = _Records()
+        parent.addHandler(records)
+        logger = parent.getChild("child")
+        logger.parent = parent
+        queue_logging = QueueLogging(logger, [records])
+        queue_logging.start()
+        logger.getChild("topic").warning(JsonMessage(_Model(name="test", value=1)))
+        queue_logging.stop()
+
+        self.assertEqual(len(records.messages), 1)
+        self.assertEqual(json.loads(records.messages[0])["name"], "test")
+        self.assertIsNot(records.threads[0], threading.current_thread())
+        # propagates to the parent handlers again after stopping
+        self.assertTrue(logger.propagate)
@@ -0,0 +1,74 @@
+import asyncio
+import unittest
+
+from .single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.loads = 0
+
+    async def load(self):
+        self.loads += 1
+        await asyncio.sleep(0.01)
+        return self.loads
+
+    async def test_shares_inflight_load(self):
+        single_flight = SingleFlight(ttl=0)
+        results = await asyncio.gather(
+            *(single_flight.get("key", self.load) for _ in range(10))
+        )
+        self.assertEqual(results, [1] * 10)
+        self.assertEqual(self.loads, 1)
+        self.assertEqual(single_flight.stats.shared, 9)
+        # nothing is kept with a ttl of 0
+        self.assertEqual(await single_flight.get("key", self.load), 2)
+
+    async def test_keeps_result_for_ttl(self):
+        single_flight = SingleFlight(ttl=0.05)
+        self.assertEqual(await single_flight.get("key", self.load), 1)
+        self.assertEqual(await single_flight.get("key", self.load), 1)
+        self.assertEqual(await single_flight.get("other", self.load), 2)
+        self.assertEqual(single_flight.stats.hits, 1)
+        await asyncio.sleep(0.06)
+        self.assertEqual(await single_flight.get("key", self.load), 3)
+        single_flight.invalidate("key")
+        self.assertEqual(await single_flight.get("key", self.load), 4)
+
+    async def test_failed_load_is_not_kept(self):
+        single_flight = SingleFlight(ttl=1)
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError()
+
+        results = await asyncio.gather(
+            *(single_flight.get("key", fail) for _ in range(2)), return_exceptions=True
+        )
+        self.assertIsInstance(results[0], ValueError)
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(await single_flight.get("key", self.load), 1)
+
+    async def test_none_is_not_kept(self):
+        single_flight = SingleFlight(ttl=1)
+
+        async def load_none():
+            return None
+
+        self.assertIsNone(await single_flight.get("key", load_none))
+        self.assertEqual(await single_flight.get("key", self.load), 1)
+
+    async def test_cancelled_read_does_not_cancel_load(self):
+        single_flight = SingleFlight(ttl=0)
+        first = asyncio.ensure_future(single_flight.get("key", self.load))
+        second = asyncio.ensure_future(single_flight.get("key", self.load))
+        await asyncio.sleep(0)
+        first.cancel()
+        self.assertEqual(await second, 1)
+
+    async def test_maxsize(self):
+        single_flight = SingleFlight(ttl=1, maxsize=2)
+        for key in ["a", "b", "c"]:
+            await single_flight.get(key, self.load)
+        self.assertEqual(await single_flight.get("a", self.load), 4)
+        self.assertEqual(await single_flight.get("c", self.load), 3)
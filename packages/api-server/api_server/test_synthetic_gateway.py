@@ -0,0 +1,74 @@
+import unittest
+
+from rmf_door_msgs.msg import DoorMode as RmfDoorMode
+from rmf_task_msgs.msg import TaskSummary as RmfTaskSummary
+from rmf_task_msgs.srv import CancelTask as RmfCancelTask
+from rmf_task_msgs.srv import SubmitTask as RmfSubmitTask
+
+from .rmf_io import RmfEvents
+from .synthetic_gateway import SyntheticGateway, SyntheticSite
+
+
+class TestSyntheticGateway(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.rmf = RmfEvents()
+        self.site = SyntheticSite(
+            levels=3,
+            doors_per_level=4,
+            lifts=2,
+            fleets=2,
+            robots_per_fleet=5,
+            grid_size=4,
+        )
+        self.gateway = SyntheticGateway(self.rmf, None, self.site)
+
+    def test_building_map(self):
+        building_map = self.gateway.building_map
+        self.assertEqual(len(building_map.levels), 3)
+        self.assertEqual(len(building_map.lifts), 2)
+        for level in building_map.levels:
+            self.assertEqual(len(level.doors), 4)
+            self.assertEqual(len(level.nav_graphs[0].vertices), 16)
+            self.assertEqual(len(level.nav_graphs[0].edges), 24)
+
+    def test_publish_states(self):
+        fleet_states = []
+        self.rmf.fleet_states.subscribe(fleet_states.append)
+        door_states = []
+        self.rmf.door_states.subscribe(door_states.append)
+
+        self.gateway.request_door("L0_door_0", RmfDoorMode.MODE_OPEN)
+        self.gateway._publish_fleets(0)  # pylint: disable=protected-access
+        self.gateway._publish_doors(0)  # pylint: disable=protected-access
+        self.assertEqual(len(fleet_states), 2)
+        for fleet_state in fleet_states:
+            self.assertEqual(len(fleet_state.robots), 5)
+        self.assertEqual(len(door_states), 12)
+
+    async def test_submit_and_cancel_task(self):
+        summaries = []
+        self.rmf.task_summaries.subscribe(summaries.append)
+
+        resp = await self.gateway.submit_task(RmfSubmitTask.Request())
+        self.assertTrue(resp.success)
+        self.assertEqual(summaries[-1].state, RmfTaskSummary.STATE_QUEUED)
+        self.gateway._step(0, 0)  # pylint: disable=protected-access
+        self.assertEqual(summaries[-1].state, RmfTaskSummary.STATE_ACTIVE)
+        self.assertEqual(len(await self.gateway.get_tasks()), 1)
+
+        req = RmfCancelTask.Request(task_id=resp.task_id)
+        cancel_resp = await self.gateway.cancel_task(req)
+        self.assertTrue(cancel_resp.success)
+        self.assertEqual(summaries[-1].state, RmfTaskSummary.STATE_CANCELED)
+        cancel_resp = await self.gateway.cancel_task(req)
+        self.assertFalse(cancel_resp.success)
+
+    async def test_complete_task(self):
+        summaries = []
+        self.rmf.task_summaries.subscribe(summaries.append)
+
+        resp = await self.gateway.submit_task(RmfSubmitTask.Request())
+        # the grid is small enough to cross in 100s
+        self.gateway._step(100, 0)  # pylint: disable=protected-access
+        self.assertEqual(summaries[-1].task_id, resp.task_id)
+        self.assertEqual(summaries[-1].state, RmfTaskSummary.STATE_COMPLETED)
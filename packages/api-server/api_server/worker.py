@@ -0,0 +1,49 @@
+"""
+An api worker, it serves rest and socket.io clients with the events published by the
+ingestion process (`python -m api_server.ingestion`). Any number of workers can run at
+once, e.g. with uvicorn:
+
+    uvicorn api_server.worker:app --workers 4 --host 127.0.0.1 --port 8000
+
+The ingestion process creates the database schemas, it must be started first.
+"""
+
+import argparse
+
+import uvicorn
+
+from .app import App, AppRole
+from .app_config import app_config_file, load_config
+
+
+def __getattr__(name: str):
+    # `app` is built when uvicorn gets it in a worker process, so that the process that
+    # launches the workers does not build one.
+    if name != "app":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    app = App(role=AppRole.WORKER)
+    globals()["app"] = app
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="runs api workers that serve the events of the ingestion process"
+    )
+    parser.add_argument("--workers", type=int, default=1, help="number of processes")
+    args = parser.parse_args()
+
+    app_config = load_config(app_config_file())
+    # an import string is needed to run more than one worker
+    uvicorn.run(
+        "api_server.worker:app",
+        workers=args.workers,
+        host=app_config.host,
+        port=app_config.port,
+        root_path=app_config.public_url.path,
+        log_level=app_config.log_level.lower(),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Measures how the number of socket.io clients that can be served scales with the number
+of api workers. An ingestion process publishes fleet states on the bus as fast as it
+can, each worker receives them with `RmfBusSubscriber` and encodes the socket.io packet
+of every one of its clients, like the broadcasts of the api server do.
+
+Every worker serves the same number of clients, so with N workers N times the clients
+are served, the scaling is linear if the time to send all the events stays the same.
+Only the work on the server is measured, not the network to the clients. The workers
+should not outnumber the cpu cores minus one for the publisher.
+
+usage: python -m benchmarks.bus_scaling [--workers N [N ...]] [--clients N]
+    [--events N] [--robots N]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+from typing import List
+
+from socketio import packet
+
+from api_server.fast_io import SioJson
+from api_server.models import FleetState, Location, RobotMode, RobotState
+from api_server.rmf_io import (
+    RmfBusPublisher,
+    RmfBusSubscriber,
+    RmfEvents,
+    RmfStateStore,
+    topics,
+)
+
+
+def make_fleet_state(seq: int, robots: int) -> FleetState:
+    return FleetState(
+        name=f"fleet_{seq % 10}",
+        robots=[
+            RobotState(
+                name=f"robot_{i}",
+                model="bench_model",
+                mode=RobotMode(mode=1),
+                battery_percent=50.0,
+                location=Location(x=float(seq), y=float(i), level_name="L1"),
+            )
+            for i in range(robots)
+        ],
+    )
+
+
+async def serve(path: str, clients: int, events: int):
+    rmf = RmfEvents()
+    store = RmfStateStore(rmf)
+    store.start()
+    done = asyncio.Event()
+    received = 0
+
+    def on_fleet_state(state: FleetState):
+        nonlocal received
+        encoded = store.encode(topics.fleet_states, state)
+        event = f"/fleets/{state.name}/state"
+        for _ in range(clients):
+            packet.Packet(packet.EVENT, data=[event, encoded]).encode()
+        received += 1
+        if received == events:
+            done.set()
+
+    rmf.fleet_states.subscribe(on_fleet_state)
+    subscriber = RmfBusSubscriber(rmf, path, reconnect_interval=0.05)
+    subscriber.start()
+    await done.wait()
+    await subscriber.stop()
+    store.stop()
+
+
+def run_worker(path: str, clients: int, events: int, results: multiprocessing.Queue):
+    # the api server encodes the socket.io packets with `SioJson`
+    packet.Packet.json = SioJson
+    asyncio.run(serve(path, clients, events))
+    results.put(os.getpid())
+
+
+async def measure(workers: int, fleet_states: List[FleetState], clients: int) -> float:
+    """
+    Returns the time in seconds until every worker has sent every event.
+    """
+    loop = asyncio.get_event_loop()
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "bus.sock")
+        rmf = RmfEvents()
+        publisher = RmfBusPublisher(rmf, path)
+        await publisher.start()
+        procs = [
+            ctx.Process(
+                target=run_worker, args=(path, clients, len(fleet_states), results)
+            )
+            for _ in range(workers)
+        ]
+        for proc in procs:
+            proc.start()
+        while publisher.stats.subscribers < workers:
+            await asyncio.sleep(0.01)
+
+        start = time.perf_counter()
+        for i, state in enumerate(fleet_states):
+            rmf.fleet_states.on_next(state)
+            if i % 100 == 0:
+                # let the transports write
+                await asyncio.sleep(0)
+        for _ in range(workers):
+            await loop.run_in_executor(None, results.get)
+        elapsed = time.perf_counter() - start
+
+        for proc in procs:
+            proc.join()
+        await publisher.stop()
+    return elapsed
+
+
+async def run(args):
+    fleet_states = [make_fleet_state(i, args.robots) for i in range(args.events)]
+    print(
+        f"{args.events} fleet states with {args.robots} robots, {args.clients} clients "
+        f"per worker, {os.cpu_count()} cpus"
+    )
+    print(f"  {'workers':>7} {'clients':>8} {'sends/s':>12} {'speedup':>8} {'eff':>6}")
+    baseline = None
+    for workers in args.workers:
+        elapsed = await measure(workers, fleet_states, args.clients)
+        rate = workers * args.clients * args.events / elapsed
+        baseline = baseline or rate
+        speedup = rate / baseline
+        print(
+            f"  {workers:>7} {workers * args.clients:>8} {rate:>12.0f} "
+            f"{speedup:>7.2f}x {speedup / workers:>5.0%}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=200, help="clients per worker")
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--robots", type=int, default=20, help="robots per fleet")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Measures the latency of door states received by `RmfGateway` while a large building map is
+being published, with a single threaded executor and with a multi threaded executor.
+
+usage: python -m benchmarks.door_latency_during_map [--threads N] [--levels N] [--image-mb N]
+"""
+
+import argparse
+import array
+import os
+import statistics
+import tempfile
+import time
+from typing import List
+
+import rclpy
+import rclpy.node
+import rclpy.qos
+from rmf_building_map_msgs.msg import AffineImage as RmfAffineImage
+from rmf_building_map_msgs.msg import BuildingMap as RmfBuildingMap
+from rmf_building_map_msgs.msg import Graph as RmfGraph
+from rmf_building_map_msgs.msg import GraphEdge as RmfGraphEdge
+from rmf_building_map_msgs.msg import GraphNode as RmfGraphNode
+from rmf_building_map_msgs.msg import Level as RmfLevel
+from rmf_door_msgs.msg import DoorMode as RmfDoorMode
+from rmf_door_msgs.msg import DoorState as RmfDoorState
+
+from api_server.gateway import RmfGateway
+from api_server.models import DoorState
+from api_server.repositories import StaticFilesRepository
+from api_server.rmf_io import RmfEvents
+
+
+def make_building_map(levels: int, image_mb: int, nodes: int) -> RmfBuildingMap:
+    image_data = array.array("B", os.urandom(image_mb * 1024 * 1024))
+    return RmfBuildingMap(
+        name="bench_map",
+        levels=[
+            RmfLevel(
+                name=f"L{i}",
+                elevation=float(i),
+                images=[
+                    RmfAffineImage(
+                        name=f"image_{i}",
+                        encoding="png",
+                        data=image_data,
+                    )
+                ],
+                nav_graphs=[
+                    RmfGraph(
+                        name="0",
+                        vertices=[
+                            RmfGraphNode(x=float(j), y=float(j), name=f"wp_{j}")
+                            for j in range(nodes)
+                        ],
+                        edges=[
+                            RmfGraphEdge(v1_idx=j, v2_idx=j + 1)
+                            for j in range(nodes - 1)
+                        ],
+                    )
+                ],
+            )
+            for i in range(levels)
+        ],
+    )
+
+
+def percentile(values: List[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def run(threads: int, building_map: RmfBuildingMap, duration: float):
+    rmf_events = RmfEvents()
+    with tempfile.TemporaryDirectory() as static_dir:
+        gateway = RmfGateway(rmf_events, StaticFilesRepository("/static", static_dir))
+        publisher_node = rclpy.node.Node("door_latency_bench")
+        door_pub = publisher_node.create_publisher(RmfDoorState, "door_states", 100)
+        map_pub = publisher_node.create_publisher(
+            RmfBuildingMap,
+            "map",
+            rclpy.qos.QoSProfile(
+                history=rclpy.qos.HistoryPolicy.KEEP_ALL,
+                depth=1,
+                reliability=rclpy.qos.ReliabilityPolicy.RELIABLE,
+                durability=rclpy.qos.DurabilityPolicy.TRANSIENT_LOCAL,
+            ),
+        )
+
+        latencies = {"idle": [], "map": []}
+        phase = "idle"
+
+        def on_door_state(state: DoorState):
+            now = gateway.get_clock().now().nanoseconds
+            sent = state.door_time.sec * 1000000000 + state.door_time.nanosec
+            latencies[phase].append((now - sent) / 1000000)
+
+        rmf_events.door_states.subscribe(on_door_state)
+        gateway.spin_background(threads)
+        gateway.subscribe_all()
+
+        def publish_doors(seconds: float):
+            end = time.time() + seconds
+            while time.time() < end:
+                door_pub.publish(
+                    RmfDoorState(
+                        door_name="bench_door",
+                        door_time=publisher_node.get_clock().now().to_msg(),
+                        current_mode=RmfDoorMode(value=RmfDoorMode.MODE_CLOSED),
+                    )
+                )
+                time.sleep(0.01)
+
+        # let discovery finish
+        time.sleep(1)
+        publish_doors(duration)
+        phase = "map"
+        map_pub.publish(building_map)
+        publish_doors(duration)
+
+        gateway.unsubscribe_all()
+        gateway.stop_spinning()
+        gateway.destroy_node()
+        publisher_node.destroy_node()
+
+    print(f"executor threads: {threads}")
+    for name, values in latencies.items():
+        if not values:
+            print(f"  {name:<5} no door states received")
+            continue
+        print(
+            f"  {name:<5} n={len(values):<5} "
+            f"p50={statistics.median(values):8.2f} ms "
+            f"p99={percentile(values, 0.99):8.2f} ms "
+            f"max={max(values):8.2f} ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--levels", type=int, default=10)
+    parser.add_argument("--image-mb", type=int, default=20)
+    parser.add_argument("--nodes", type=int, default=20000)
+    parser.add_argument("--duration", type=float, default=5)
+    args = parser.parse_args()
+
+    rclpy.init()
+    try:
+        building_map = make_building_map(args.levels, args.image_mb, args.nodes)
+        for threads in (1, args.threads):
+            run(threads, building_map, args.duration)
+    finally:
+        rclpy.shutdown()
+
+
+if __name__ == "__main__":
+    main()
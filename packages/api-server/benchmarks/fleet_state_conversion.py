@@ -0,0 +1,69 @@
+"""
+Compares the cost of converting `FleetState` messages to models using
+`message_to_ordereddict` + pydantic validation, `from_orm` and the generated `from_msg`
+converters.
+
+usage: python -m benchmarks.fleet_state_conversion [--robots N] [--path N] [--iterations N]
+"""
+
+import argparse
+import timeit
+
+from rmf_fleet_msgs.msg import FleetState as RmfFleetState
+from rmf_fleet_msgs.msg import Location as RmfLocation
+from rmf_fleet_msgs.msg import RobotMode as RmfRobotMode
+from rmf_fleet_msgs.msg import RobotState as RmfRobotState
+from rosidl_runtime_py.convert import message_to_ordereddict
+
+from api_server.models import FleetState
+
+
+def make_fleet_state(robots: int, path: int) -> RmfFleetState:
+    return RmfFleetState(
+        name="bench_fleet",
+        robots=[
+            RmfRobotState(
+                name=f"robot_{i}",
+                model="bench_model",
+                task_id=f"task_{i}",
+                seq=i,
+                mode=RmfRobotMode(mode=RmfRobotMode.MODE_MOVING),
+                battery_percent=50.0,
+                location=RmfLocation(x=float(i), y=float(i), level_name="L1"),
+                path=[
+                    RmfLocation(x=float(j), y=float(j), level_name="L1", index=j)
+                    for j in range(path)
+                ],
+            )
+            for i in range(robots)
+        ],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--robots", type=int, default=100)
+    parser.add_argument("--path", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    msg = make_fleet_state(args.robots, args.path)
+    candidates = {
+        "message_to_ordereddict": lambda: FleetState(**message_to_ordereddict(msg)),
+        "from_orm": lambda: FleetState.from_orm(msg),
+        "from_msg": lambda: FleetState.from_msg(msg),
+    }
+
+    print(
+        f"FleetState with {args.robots} robots, {args.path} waypoints per path, "
+        f"{args.iterations} iterations"
+    )
+    baseline = None
+    for name, fn in candidates.items():
+        elapsed = timeit.timeit(fn, number=args.iterations) / args.iterations
+        baseline = baseline or elapsed
+        print(f"  {name:<24} {elapsed * 1000:10.3f} ms/msg  {baseline / elapsed:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Compares the cost of persisting the robots of a `FleetState` with one `update_or_create`
+per robot and with a single bulk upsert.
+
+usage: python -m benchmarks.fleet_state_persistence [--robots N] [--iterations N] [--db-url URL]
+"""
+
+import argparse
+import asyncio
+import time
+
+import tortoise.transactions
+from tortoise import Tortoise
+
+from api_server.models import FleetState, Location, RobotMode, RobotState
+from api_server.models import tortoise_models as ttm
+
+
+def make_fleet_state(robots: int, seq: int) -> FleetState:
+    return FleetState(
+        name="bench_fleet",
+        robots=[
+            RobotState(
+                name=f"robot_{i}",
+                model="bench_model",
+                task_id=f"task_{i}",
+                seq=seq,
+                mode=RobotMode(mode=2),
+                battery_percent=50.0,
+                location=Location(x=float(i), y=float(seq), level_name="L1"),
+                path=[
+                    Location(x=float(i), y=float(j), level_name="L1") for j in range(5)
+                ],
+            )
+            for i in range(robots)
+        ],
+    )
+
+
+async def update_or_create(fleet_state: FleetState):
+    tasks = [
+        ttm.RobotState.update_or_create(
+            {"data": r.dict()}, fleet_name=fleet_state.name, robot_name=r.name
+        )
+        for r in fleet_state.robots
+    ]
+    async with tortoise.transactions.in_transaction():
+        await asyncio.gather(fleet_state.save(), *tasks)
+
+
+async def bulk_upsert(fleet_state: FleetState):
+    async with tortoise.transactions.in_transaction() as conn:
+        await fleet_state.save()
+        await ttm.bulk_upsert(
+            ttm.RobotState,
+            [
+                {"fleet_name": fleet_state.name, "robot_name": r.name, "data": r.dict()}
+                for r in fleet_state.robots
+            ],
+            ("fleet_name", "robot_name"),
+            using_db=conn,
+        )
+
+
+async def run(args):
+    await Tortoise.init(
+        db_url=args.db_url, modules={"models": ["api_server.models.tortoise_models"]}
+    )
+    await Tortoise.generate_schemas()
+    print(
+        f"FleetState with {args.robots} robots, {args.iterations} iterations, "
+        f"{args.db_url}"
+    )
+    baseline = None
+    for name, persist in (
+        ("update_or_create", update_or_create),
+        ("bulk_upsert", bulk_upsert),
+    ):
+        await ttm.RobotState.all().delete()
+        # the first message inserts the rows, measure the updates after it
+        await persist(make_fleet_state(args.robots, 0))
+        states = [make_fleet_state(args.robots, i + 1) for i in range(args.iterations)]
+        start = time.perf_counter()
+        for state in states:
+            await persist(state)
+        elapsed = (time.perf_counter() - start) / args.iterations
+        baseline = baseline or elapsed
+        print(f"  {name:<24} {elapsed * 1000:10.3f} ms/msg  {baseline / elapsed:6.1f}x")
+    await Tortoise.close_connections()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--robots", type=int, default=500)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--db-url", default="sqlite://:memory:")
+    args = parser.parse_args()
+    asyncio.get_event_loop().run_until_complete(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Compares the server cpu time and the bytes on the wire to send the updates of a site
+to dashboards that watch every door, lift and fleet, with one socket.io event per update
+and with batched frames (json and msgpack) sent once per interval.
+
+The states are encoded once by `RmfStateStore` in all cases, only the work per client
+is measured, i.e. encoding the socket.io packets and frames. The bytes include the
+engine.io and websocket framing.
+
+usage: python -m benchmarks.sio_batching [--doors N] [--lifts N] [--fleets N]
+    [--robots N] [--rate HZ] [--seconds N] [--interval-ms N] [--clients N]
+"""
+
+import argparse
+import time
+from typing import Any, Dict, List, Tuple
+
+from socketio import packet
+
+from api_server.fast_io import EncodedJson, FrameEncoding, SioJson, encode_frame
+from api_server.fast_io.encoded_json import msgpack
+from api_server.models import (
+    DoorMode,
+    DoorState,
+    FleetState,
+    LiftState,
+    Location,
+    RobotMode,
+    RobotState,
+)
+from api_server.rmf_io import RmfEvents, RmfStateStore, topics
+
+# (time, path, encoded state)
+Update = Tuple[float, str, EncodedJson]
+
+
+def ws_frame_size(payload: int) -> int:
+    # server to client frames are not masked
+    if payload < 126:
+        return payload + 2
+    if payload < 2 ** 16:
+        return payload + 4
+    return payload + 10
+
+
+def wire_size(encoded_packet: Any) -> int:
+    """
+    Size of a socket.io packet on the wire, binary packets are sent as a text packet
+    followed by the attachments.
+    """
+    if isinstance(encoded_packet, list):
+        return ws_frame_size(len(encoded_packet[0]) + 1) + sum(
+            ws_frame_size(len(x)) for x in encoded_packet[1:]
+        )
+    # "4" is the engine.io message type
+    return ws_frame_size(len(encoded_packet.encode()) + 1)
+
+
+def make_updates(args) -> List[Update]:
+    rmf = RmfEvents()
+    store = RmfStateStore(rmf)
+    store.start()
+    updates: List[Update] = []
+    for tick in range(int(args.seconds * args.rate)):
+        t = tick / args.rate
+        # spread the updates over the period
+        count = args.doors + args.lifts + args.fleets
+        offset = 0
+        for i in range(args.doors):
+            state = DoorState(
+                door_name=f"door_{i}", current_mode=DoorMode(value=tick % 3)
+            )
+            rmf.door_states.on_next(state)
+            updates.append(
+                (
+                    t + offset / count / args.rate,
+                    f"/doors/door_{i}/state",
+                    store.encode(topics.door_states, state),
+                )
+            )
+            offset += 1
+        for i in range(args.lifts):
+            state = LiftState(lift_name=f"lift_{i}", current_floor=f"L{tick % 5}")
+            rmf.lift_states.on_next(state)
+            updates.append(
+                (
+                    t + offset / count / args.rate,
+                    f"/lifts/lift_{i}/state",
+                    store.encode(topics.lift_states, state),
+                )
+            )
+            offset += 1
+        for i in range(args.fleets):
+            state = FleetState(
+                name=f"fleet_{i}",
+                robots=[
+                    RobotState(
+                        name=f"robot_{j}",
+                        model="bench_model",
+                        mode=RobotMode(mode=1),
+                        battery_percent=50.0,
+                        location=Location(x=float(tick), y=float(j), level_name="L1"),
+                    )
+                    for j in range(args.robots)
+                ],
+            )
+            rmf.fleet_states.on_next(state)
+            updates.append(
+                (
+                    t + offset / count / args.rate,
+                    f"/fleets/fleet_{i}/state",
+                    store.encode(topics.fleet_states, state),
+                )
+            )
+            offset += 1
+    store.stop()
+    return updates
+
+
+def send_unbatched(updates: List[Update]) -> int:
+    size = 0
+    for _, path, encoded in updates:
+        size += wire_size(packet.Packet(packet.EVENT, data=[path, encoded]).encode())
+    return size
+
+
+def send_batched(updates: List[Update], interval: float, encoding: str) -> int:
+    def send_frame(pending: Dict[str, EncodedJson]) -> int:
+        frame = encode_frame(pending, encoding)
+        return wire_size(packet.Packet(packet.EVENT, data=["batch", frame]).encode())
+
+    size = 0
+    pending: Dict[str, EncodedJson] = {}
+    flush_at = None
+    for t, path, encoded in updates:
+        if flush_at is not None and t >= flush_at:
+            size += send_frame(pending)
+            pending = {}
+            flush_at = None
+        pending[path] = encoded
+        if flush_at is None:
+            flush_at = t + interval
+    if pending:
+        size += send_frame(pending)
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--doors", type=int, default=150)
+    parser.add_argument("--lifts", type=int, default=20)
+    parser.add_argument("--fleets", type=int, default=10)
+    parser.add_argument("--robots", type=int, default=10, help="robots per fleet")
+    parser.add_argument("--rate", type=float, default=2, help="updates per entity/s")
+    parser.add_argument("--seconds", type=int, default=10)
+    parser.add_argument("--interval-ms", type=int, default=50)
+    parser.add_argument("--clients", type=int, default=100)
+    args = parser.parse_args()
+
+    # the api server encodes the socket.io packets with `SioJson`
+    packet.Packet.json = SioJson
+    updates = make_updates(args)
+    print(
+        f"{args.clients} clients watching {args.doors} doors, {args.lifts} lifts and "
+        f"{args.fleets} fleets, {len(updates) / args.seconds:.0f} updates/s, "
+        f"{args.interval_ms} ms batches"
+    )
+
+    modes = [("unbatched", lambda: send_unbatched(updates))]
+    for encoding in (FrameEncoding.JSON, FrameEncoding.MSGPACK):
+        if encoding == FrameEncoding.MSGPACK and msgpack is None:
+            print("  msgpack is not installed, skipping msgpack frames")
+            continue
+        modes.append(
+            (
+                f"batched {encoding}",
+                lambda encoding=encoding: send_batched(
+                    updates, args.interval_ms / 1000, encoding
+                ),
+            )
+        )
+
+    baseline = None
+    for name, send in modes:
+        start = time.process_time()
+        for _ in range(args.clients):
+            size = send()
+        cpu = time.process_time() - start
+        baseline = baseline or (cpu, size)
+        print(
+            f"  {name:<16} {cpu / args.seconds * 1000:8.1f} ms cpu/s  "
+            f"{baseline[0] / cpu:5.1f}x  "
+            f"{size / args.seconds / 1024:8.1f} KiB/s per client  "
+            f"{baseline[1] / size:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Measures the cpu time to fan out one fleet state event to N socket.io subscribers, when
+each subscriber converts the state to a dict which socket.io encodes again (as the
+watchers did before), and when the state is encoded once by `RmfStateStore` and the
+encoding is embedded in the packet of each subscriber by `SioJson`.
+
+The last column is the encode once case with every subscriber behind, so that each
+event goes through the `OutboundQueues` of the subscriber instead of one emit to the
+room. Subscribers that keep up are sent to with one emit to the room even when the
+outbound queues are enabled, so they cost the same as the encode once case.
+
+Only the work done per event is measured, i.e. the conversion of the state and the
+encoding of the socket.io packets, not the network.
+
+usage: python -m benchmarks.sio_fanout [--robots N] [--events N]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Callable, List, cast
+
+from socketio import packet
+
+from api_server.fast_io import OutboundQueues, SioJson
+from api_server.models import FleetState, Location, RobotMode, RobotState
+from api_server.rmf_io import RmfEvents, RmfStateStore, topics
+
+SUBSCRIBERS = [1, 10, 100, 300, 1000]
+
+
+def make_fleet_state(robots: int) -> FleetState:
+    return FleetState(
+        name="bench_fleet",
+        robots=[
+            RobotState(
+                name=f"robot_{i}",
+                model="bench_model",
+                task_id="",
+                seq=0,
+                mode=RobotMode(mode=1),
+                battery_percent=50.0,
+                location=Location(x=float(i), y=0.0, level_name="L1"),
+                path=[Location(x=float(j), y=0.0, level_name="L1") for j in range(5)],
+            )
+            for i in range(robots)
+        ],
+    )
+
+
+def encode_packet(data: Any) -> str:
+    path = "/fleets/bench_fleet/state"
+    return packet.Packet(packet.EVENT, data=[path, data]).encode()
+
+
+def fanout_dict(_store: RmfStateStore, fleet_state: FleetState, subscribers: int):
+    for _ in range(subscribers):
+        encode_packet(fleet_state.dict())
+
+
+def fanout_encoded(store: RmfStateStore, fleet_state: FleetState, subscribers: int):
+    for _ in range(subscribers):
+        encode_packet(store.encode(topics.fleet_states, fleet_state))
+
+
+class _EncodingSio:
+    """
+    Stands in for the socket.io server of the outbound queues, only encodes the packets.
+    """
+
+    async def emit(self, _event: str, data: Any, to: str):
+        encode_packet(data)
+
+
+def make_fanout_behind(loop: asyncio.AbstractEventLoop, outbound: OutboundQueues):
+    async def fanout(store: RmfStateStore, fleet_state: FleetState, subscribers: int):
+        encoded = store.encode(topics.fleet_states, fleet_state)
+        sent = outbound.stats.sent + subscribers
+        for sid in range(subscribers):
+            outbound.put(str(sid), "/fleets/bench_fleet/state", encoded)
+        while outbound.stats.sent < sent:
+            await asyncio.sleep(0)
+
+    return lambda *args: loop.run_until_complete(fanout(*args))
+
+
+def measure(
+    fanout: Callable[[RmfStateStore, FleetState, int], None],
+    fleet_states: List[FleetState],
+    subscribers: int,
+) -> float:
+    """
+    Returns the cpu time per event in ms.
+    """
+    rmf = RmfEvents()
+    store = RmfStateStore(rmf)
+    store.start()
+    start = time.process_time()
+    for fleet_state in fleet_states:
+        rmf.fleet_states.on_next(fleet_state)
+        fanout(store, fleet_state, subscribers)
+    cpu = time.process_time() - start
+    store.stop()
+    return cpu / len(fleet_states) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--robots", type=int, default=100)
+    parser.add_argument("--events", type=int, default=20)
+    args = parser.parse_args()
+
+    # the api server encodes the socket.io packets with `SioJson`
+    packet.Packet.json = SioJson
+    # a new object per event so that nothing is cached between events
+    fleet_states = [make_fleet_state(args.robots) for _ in range(args.events)]
+    print(
+        f"cpu time per event, fleet state with {args.robots} robots "
+        f"({len(fleet_states[0].json())} bytes)"
+    )
+    print(
+        f"  {'subscribers':>11} {'dict per sub':>14} {'encode once':>14} "
+        f"{'':>7} {'all behind':>14}"
+    )
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    for subscribers in SUBSCRIBERS:
+        per_dict = measure(fanout_dict, fleet_states, subscribers)
+        per_encoded = measure(fanout_encoded, fleet_states, subscribers)
+        outbound = OutboundQueues(cast(Any, _EncodingSio()))
+        per_behind = measure(
+            make_fanout_behind(loop, outbound), fleet_states, subscribers
+        )
+        loop.run_until_complete(outbound.stop())
+        print(
+            f"  {subscribers:>11} {per_dict:11.3f} ms {per_encoded:11.3f} ms  "
+            f"{per_dict / per_encoded:6.1f}x {per_behind:11.3f} ms"
+        )
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Compares the cpu time and memory used to watch the health of many robots with a rx heartbeat
+pipeline per robot and with `HealthWatchdog`, which tracks the liveness of all the robots
+with a single `LivenessTracker`. Time is simulated with a virtual scheduler, each robot
+publishes its state every second and some of the robots stop publishing halfway.
+
+usage: python -m benchmarks.watchdog_liveness [--robots N] [--seconds N] [--silent N]
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from typing import Any, Dict, List, cast
+
+from rx import operators as ops
+from rx.scheduler.historicalscheduler import HistoricalScheduler
+from rx.subject.behaviorsubject import BehaviorSubject
+from tortoise import Tortoise
+
+from api_server.models import (
+    FleetState,
+    HealthStatus,
+    Location,
+    RobotHealth,
+    RobotMode,
+    RobotState,
+)
+from api_server.rmf_io import HealthWatchdog, RmfEvents
+from api_server.rmf_io.operators import heartbeat, most_critical
+
+ROBOTS_PER_FLEET = 100
+
+
+def make_fleet_states(robots: int) -> List[FleetState]:
+    fleets: Dict[str, FleetState] = {}
+    for i in range(robots):
+        fleet_name = f"fleet_{i // ROBOTS_PER_FLEET}"
+        fleet = fleets.setdefault(fleet_name, FleetState(name=fleet_name, robots=[]))
+        fleet.robots.append(
+            RobotState(
+                name=f"robot_{i}",
+                model="bench_model",
+                task_id="",
+                seq=0,
+                mode=RobotMode(mode=1),
+                battery_percent=50.0,
+                location=Location(x=float(i), y=0.0, level_name="L1"),
+                path=[],
+            )
+        )
+    return list(fleets.values())
+
+
+def watch_with_pipelines(rmf: RmfEvents, scheduler: HistoricalScheduler):
+    """
+    The per robot pipelines that `HealthWatchdog` used before `LivenessTracker`.
+    """
+
+    def to_robot_health(id_: str, has_heartbeat: bool):
+        if has_heartbeat:
+            return RobotHealth(id_=id_, health_status=HealthStatus.HEALTHY)
+        return RobotHealth(
+            id_=id_,
+            health_status=HealthStatus.DEAD,
+            health_message="heartbeat failed",
+        )
+
+    def watch(id_: str, obs: BehaviorSubject):
+        robot_mode_health = obs.pipe(
+            ops.map(
+                cast(Any, lambda state: HealthWatchdog.robot_mode_to_health(id_, state))
+            ),
+            ops.distinct_until_changed(),
+        )
+        obs.pipe(
+            heartbeat(HealthWatchdog.LIVELINESS),
+            ops.map(cast(Any, lambda x: to_robot_health(id_, x))),
+            ops.timestamp(),
+            ops.combine_latest(robot_mode_health.pipe(ops.timestamp())),
+            most_critical(),
+        ).subscribe(rmf.robot_health.on_next, scheduler=scheduler)
+
+    subjects: Dict[str, BehaviorSubject] = {}
+
+    def on_state(fleet_state: FleetState):
+        for robot_state in fleet_state.robots:
+            robot_id = f"{fleet_state.name}/{robot_state.name}"
+            if robot_id not in subjects:
+                subjects[robot_id] = BehaviorSubject(robot_state)
+                watch(robot_id, subjects[robot_id])
+            else:
+                subjects[robot_id].on_next(robot_state)
+
+    rmf.fleet_states.subscribe(on_state)
+
+
+async def watch_with_liveness_tracker(rmf: RmfEvents, scheduler: HistoricalScheduler):
+    await HealthWatchdog(rmf, scheduler=scheduler).start()
+
+
+async def run_one(name: str, watch, args, baseline):
+    fleet_states = make_fleet_states(args.robots)
+    # the last fleets stop publishing halfway
+    silent_fleets = len(fleet_states) - args.silent // ROBOTS_PER_FLEET
+    rmf = RmfEvents()
+    scheduler = HistoricalScheduler()
+    dead = 0
+
+    def on_health(health: RobotHealth):
+        nonlocal dead
+        if health.health_status == HealthStatus.DEAD:
+            dead += 1
+
+    rmf.robot_health.subscribe(on_health)
+
+    tracemalloc.start()
+    result = watch(rmf, scheduler)
+    if asyncio.iscoroutine(result):
+        await result
+    for fleet_state in fleet_states:
+        rmf.fleet_states.on_next(fleet_state)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.process_time()
+    for sec in range(args.seconds):
+        scheduler.advance_by(1)
+        for i, fleet_state in enumerate(fleet_states):
+            if sec < args.seconds // 2 or i < silent_fleets:
+                rmf.fleet_states.on_next(fleet_state)
+    cpu = time.process_time() - start
+
+    baseline = baseline or (cpu, memory)
+    print(
+        f"  {name:<18} {cpu:8.3f} s cpu  {baseline[0] / cpu:6.1f}x  "
+        f"{memory / 2 ** 20:8.1f} MiB  {baseline[1] / memory:6.1f}x  {dead} dead"
+    )
+    return baseline
+
+
+async def run(args):
+    # `HealthWatchdog` loads the known entities from the db
+    await Tortoise.init(
+        db_url="sqlite://:memory:",
+        modules={"models": ["api_server.models.tortoise_models"]},
+    )
+    await Tortoise.generate_schemas()
+    print(
+        f"{args.robots} robots, {args.seconds} simulated seconds, "
+        f"{args.silent} robots stop publishing halfway"
+    )
+    baseline = await run_one("rx pipelines", watch_with_pipelines, args, None)
+    await run_one("liveness tracker", watch_with_liveness_tracker, args, baseline)
+    await Tortoise.close_connections()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--robots", type=int, default=10000)
+    parser.add_argument("--seconds", type=int, default=60)
+    parser.add_argument(
+        "--silent", type=int, default=1000, help="rounded down to whole fleets"
+    )
+    args = parser.parse_args()
+    asyncio.get_event_loop().run_until_complete(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -30,10 +30,14 @@ setup(
         "postgres": ["asyncpg~=0.22.0"],
         "mysql": ["aiomysql~=0.0.21"],
         "maria": ["aiomysql~=0.0.21"],
+        "orjson": ["orjson~=3.5"],
+        "msgpack": ["msgpack~=1.0"],
     },
     entry_points={
         "console_scripts": [
             "rmf_api_server=api_server.__main__:main",
+            "rmf_api_server_ingestion=api_server.ingestion:main",
+            "rmf_api_server_worker=api_server.worker:main",
         ],
     },
     license="Apache License, Version 2.0",
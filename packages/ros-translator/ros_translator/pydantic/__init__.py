@@ -59,10 +59,21 @@ DEFAULT_ARRAY_VALUES = {
     "uint8": "bytes()",
 }
 
+# rclpy uses plain lists for these, other primitive arrays are either `array.array` or
+# `numpy.ndarray`.
+LIST_ARRAY_TYPES = ["bool", "string", "wstring"]
+
 
 class PydanticType:
     type: str
     default_value: str
+    # format string of an expression that converts a ros message field to this type,
+    # `{value}` is the field of the message and `{name}` is the name of the field.
+    # Nested messages are converted with the type of the pydantic field, so that
+    # subclasses that redeclare a field with a subclass of the message get instances of
+    # that subclass.
+    converter: str
+    is_nested: bool = False
 
     def __init__(self, ros_type):
         if ros_type.is_array:
@@ -72,9 +83,12 @@ class PydanticType:
         if ros_type.is_primitive_type():
             self.type = PRIMITIVE_TYPES[ros_type.type]
             self.default_value = DEFAULT_VALUES[ros_type.type]
+            self.converter = "{value}"
         else:
             self.type = ros_type.type
             self.default_value = f"{ros_type.type}()"
+            self.converter = 'fields["{name}"].type_.from_msg({value})'
+            self.is_nested = True
 
     def _get_array_type(self, ros_type, elem_type):
         if ros_type.is_upper_bound:
@@ -89,19 +103,31 @@ class PydanticType:
             if ros_type.type in ARRAY_TYPES:
                 self.type = ARRAY_TYPES[ros_type.type]
                 self.default_value = DEFAULT_ARRAY_VALUES[ros_type.type]
+                self.converter = "bytes({value})"
             else:
                 self.type = self._get_array_type(
                     ros_type, PRIMITIVE_TYPES[ros_type.type]
                 )
                 self.default_value = "[]"
+                if ros_type.type in LIST_ARRAY_TYPES:
+                    self.converter = "list({value})"
+                else:
+                    self.converter = "{value}.tolist()"
         else:
             self.type = self._get_array_type(ros_type, ros_type.type)
             self.default_value = "[]"
+            # `type_` of a list field is the type of the items
+            self.converter = '[fields["{name}"].type_.from_msg(x) for x in {value}]'
+            self.is_nested = True
 
 
 def augment_message(msg: Message):
     for field in msg.spec.fields:
         field.pydantic_type = PydanticType(field.type)
+        field.from_msg = field.pydantic_type.converter.format(
+            value=f"msg.{field.name}", name=field.name
+        )
+    msg.has_nested = any(field.pydantic_type.is_nested for field in msg.spec.fields)
     msg.commented_raw = "".join(
         map(lambda x: f"# {x}", msg.raw.splitlines(keepends=True))
     )